@@ -3,6 +3,10 @@ ASGI config for AppDevTFG2024 project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Besides the regular API, it serves the Server-Sent Events stream at /async/eventos/
+(project2024/eventos.py). Events go through the Evento table, which every worker polls while
+it has open streams, so the app can run with any number of workers or replicas.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
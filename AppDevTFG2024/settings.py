@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 import pymysql
 pymysql.install_as_MySQLdb()
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,12 +41,14 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'django_filters',
     'drf_yasg',
     'project2024',
     'corsheaders',
 ]
 
 MIDDLEWARE = [
+    'project2024.metricas.MetricasMiddleware',  # Primero, para medir la petición completa
     "whitenoise.middleware.WhiteNoiseMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -55,10 +58,27 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'project2024.routers.ReplicaMiddleware',
 ]
 
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
+# Configuración de Django REST Framework: todas las listas se paginan por cursor
+
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'project2024.pagination.IdCursorPagination',
+    'PAGE_SIZE': 50,
+    # Filtros por campo (FilterSet de cada ViewSet) y búsqueda indexada con ?search=; ver project2024/filtros.py
+    'DEFAULT_FILTER_BACKENDS': [
+        'django_filters.rest_framework.DjangoFilterBackend',
+        'project2024.filtros.BusquedaIndexadaFilter',
+    ],
+}
+
+# Métricas por ruta en /metrics; con True agrega X-DB-Queries y X-DB-Time a cada respuesta
+
+METRICAS_CABECERAS_DB = DEBUG
+
 # autoriza todos los cors
 
 CORS_ALLOW_ALL_ORIGINS = True
@@ -101,6 +121,75 @@ DATABASES = {
     }
 }
 
+# Réplica de solo lectura opcional (misma configuración que 'default' con otro host)
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Las pruebas usan SQLite local para no depender del MySQL remoto
+if 'test' in sys.argv:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            # Base de pruebas en archivo y no en memoria: las pruebas con varios hilos necesitan
+            # conexiones independientes que esperen el bloqueo en lugar de fallar al instante
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        },
+        # Segunda base SQLite para probar el enrutamiento a la réplica; se activa por prueba
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db_replica.sqlite3',
+        },
+    }
+    # Hash rápido para que crear usuarios de prueba no tarde lo que tarda PBKDF2
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Enrutamiento de lecturas a la réplica (ver project2024/routers.py)
+DATABASE_ROUTERS = ['project2024.routers.ReplicaRouter']
+DATABASE_REPLICA = 'replica' if 'replica' in DATABASES and 'test' not in sys.argv else None
+REPLICA_PIN_SEGUNDOS = 5  # Tras una escritura, el cliente lee de la primaria durante este tiempo
+REPLICA_REINTENTO_SEGUNDOS = 30  # Tiempo sin usar la réplica después de un fallo de conexión
+
+# Caché (memoria local del proceso; no requiere servicios externos)
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# LocMemCache no se comparte entre procesos: la invalidación del catálogo (project2024/cache.py)
+# solo alcanza al proceso que hace la escritura. Con varios workers, o para que los comandos de
+# gestión (recontar_inscritos, generar_datos) invaliden lo que sirve la web, hay que configurar
+# un backend compartido (Redis o Memcached); mientras tanto las entradas de los demás procesos
+# se corrigen al expirar, en CATALOGO_CACHE_TIMEOUT segundos como máximo
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'project2024',
+    }
+}
+
+# Segundos que se conservan las respuestas del catálogo de cursos
+CATALOGO_CACHE_TIMEOUT = 300
+
+# Envío de notificaciones por correo (ver project2024/notificaciones.py y el comando
+# despachar_notificaciones). EMAIL_HOST, EMAIL_PORT, etc. se configuran como de costumbre
+
+DEFAULT_FROM_EMAIL = 'admin@cursos.com'
+NOTIFICACIONES_LOTE = 100  # Notificaciones tomadas y enviadas por transacción
+NOTIFICACIONES_MAX_INTENTOS = 5  # Tras estos fallos la notificación queda en estado 'fallido'
+NOTIFICACIONES_ESPERA_BASE = 60  # Segundos antes del primer reintento; se duplica en cada fallo
+NOTIFICACIONES_ESPERA_MAXIMA = 3600
+RECORDATORIOS_DIAS_ANTES = [7, 3, 1]  # Horizontes de los recordatorios de pago (comando programar_recordatorios)
+
+# Stream SSE /async/eventos/ (ver project2024/eventos.py); requiere servir la app con asgi.py. Los
+# eventos pasan por la tabla Evento, así que cada worker ve lo que escriben los demás
+EVENTOS_HISTORIAL = 1000  # Eventos pendientes como máximo al reanudar con Last-Event-ID o en la cola de una conexión
+EVENTOS_KEEPALIVE_SEGUNDOS = 15  # Comentario de keepalive del stream cuando no hay eventos
+EVENTOS_REANUDAR_SEGUNDOS = 300  # Los eventos se conservan este tiempo para reanudar el stream
+EVENTOS_SONDEO_SEGUNDOS = 1  # Cada cuánto lee la tabla de eventos un proceso con conexiones abiertas
+EVENTOS_ESPERA_HUECO_SEGUNDOS = 5  # Espera por un id de evento aún sin confirmar antes de saltarlo
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -119,6 +208,14 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Índice de credenciales de inicio de sesión (project2024.models.Credencial): PBKDF2-SHA256 con
+# este número de iteraciones, elegido a propósito y no tomado de PASSWORD_HASHERS. El hash se
+# verifica en cada inicio de sesión, así que el factor de trabajo fija el costo de CPU de cada
+# acceso: 100.000 iteraciones son ~60 ms por núcleo (~17 accesos/s por núcleo), frente a ~0,5 s
+# (~2/s) con las 870.000 por defecto de Django 5.1. Las credenciales con otro factor se rehacen
+# en el siguiente acceso correcto. En pruebas se usa un valor bajo, como PASSWORD_HASHERS
+CREDENCIALES_ITERACIONES = 1000 if 'test' in sys.argv else 100_000
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
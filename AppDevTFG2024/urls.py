@@ -22,6 +22,8 @@ from drf_yasg import openapi
 from rest_framework.permissions import AllowAny
 
 from project2024.views import DocenteCursoView, VerificarEstudiante
+from project2024 import async_views
+from project2024.metricas import metricas
 
 # Configura la vista del esquema
 schema_view = get_schema_view(
@@ -41,9 +43,15 @@ schema_view = get_schema_view(
 urlpatterns = [
     path('', lambda request: HttpResponseRedirect('/api/')),  # Redirige la raíz a la API
     path('admin/', admin.site.urls),
+    path('metrics', metricas, name='metricas'),  # Métricas en formato Prometheus
     path('api/', include('project2024.urls')),  # Incluye las URLs de la aplicación
     path('api/docs/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),  # Documentación Swagger
     path('api/docs.json', schema_view.without_ui(cache_timeout=0), name='schema-json'),  # Documentación JSON
     path('estudiante/<int:estudiante_id>/verificar/', VerificarEstudiante.as_view(), name='verificar_estudiante'),
     path('docente/<int:docente_id>/cursos/', DocenteCursoView.as_view(), name='docente_cursos'),
+    # Versiones asíncronas de las lecturas más usadas (servir con el ASGI de AppDevTFG2024/asgi.py)
+    path('async/estudiante/<int:estudiante_id>/verificar/', async_views.verificar_estudiante, name='verificar_estudiante_async'),
+    path('async/docente/<int:docente_id>/cursos/', async_views.docente_cursos, name='docente_cursos_async'),
+    path('async/cursos/', async_views.catalogo_cursos, name='catalogo_cursos_async'),
+    path('async/eventos/', async_views.eventos, name='eventos'),  # Stream SSE de pagos e inscripciones
 ]
@@ -0,0 +1,104 @@
+"""
+Vistas asíncronas para los endpoints de lectura más usados. Usan el ORM asíncrono de Django y
+comparten la consulta y el armado de la respuesta con las vistas síncronas de views.py; bajo
+ASGI (AppDevTFG2024/asgi.py, el que sirve el Procfile) una espera de la base de datos no bloquea
+al worker. Bajo WSGI se ejecutarían con async_to_sync y serían más lentas que las síncronas.
+
+DRF no soporta vistas asíncronas, por lo que estas devuelven JsonResponse directamente.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import NotFound, ValidationError
+
+from . import cache as catalogo_cache
+from . import eventos as canal_eventos
+from . import routers
+from .models import Docente
+from .views import CursoViewSet, DocenteCursoView, VerificarEstudiante
+
+
+async def verificar_estudiante(request, estudiante_id):
+    inscripciones = [i async for i in VerificarEstudiante.get_inscripciones(estudiante_id)]
+
+    # Verifica si el estudiante tiene inscripciones
+    if not inscripciones:
+        return JsonResponse({"detalle": "El estudiante no tiene inscripciones."}, status=404)
+
+    return JsonResponse(VerificarEstudiante.serializar(inscripciones), safe=False)
+
+
+async def docente_cursos(request, docente_id):
+    try:
+        docente = await Docente.objects.aget(id=docente_id)
+    except Docente.DoesNotExist:
+        return JsonResponse({"error": "El docente no existe."}, status=404)
+
+    cursos_data = [
+        DocenteCursoView.serializar_curso(curso, docente) async for curso in DocenteCursoView.get_cursos(docente)
+    ]
+
+    return JsonResponse(cursos_data, safe=False)
+
+
+async def catalogo_cursos(request):
+    """
+    Catálogo de cursos con los mismos filtros (CursoFilter y `?search=`), forma (`?expand=`,
+    `?fields=`) y paginación (IdCursorPagination: `?cursor=` y `?page_size=`) que el listado de
+    CursoViewSet, servido desde la misma caché del catálogo. Como allí, un cliente que acaba de
+    escribir (cookie de routers.COOKIE_PRIMARIA) lee de la primaria sin pasar por la caché.
+    """
+    usar_cache = routers.COOKIE_PRIMARIA not in request.COOKIES
+    ruta = request.get_full_path()
+    if usar_cache:
+        datos = await sync_to_async(catalogo_cache.obtener)(ruta)
+        if datos is not None:
+            return JsonResponse(datos, headers={'X-Cache': 'HIT'})
+
+    try:
+        datos = await sync_to_async(_pagina_del_catalogo)(request)
+    except NotFound as exc:
+        # Cursor inválido
+        return JsonResponse({"error": str(exc.detail)}, status=404)
+    except ValidationError as exc:
+        # Valor de filtro inválido
+        return JsonResponse(exc.detail, status=400, safe=False)
+    if not usar_cache:
+        return JsonResponse(datos)
+    await sync_to_async(catalogo_cache.guardar)(ruta, datos)
+    return JsonResponse(datos, headers={'X-Cache': 'MISS'})
+
+
+def _pagina_del_catalogo(request):
+    # El listado de CursoViewSet (sus backends de filtro, su serializer y su paginación) sin el
+    # despacho de la vista, que devolvería una Response de DRF
+    vista = CursoViewSet(action_map={'get': 'list'}, args=(), kwargs={}, format_kwarg=None, headers={})
+    vista.request = vista.initialize_request(request)
+    pagina = vista.paginate_queryset(vista.filter_queryset(vista.get_queryset()))
+    return vista.get_paginated_response(vista.get_serializer(pagina, many=True).data).data
+
+
+async def eventos(request):
+    """
+    Stream Server-Sent Events con los cambios de pagos, historial de pagos e inscripciones
+    (ver eventos.py), filtrado con `?estudiante=<id>` y `?curso=<id>`. Al reconectarse,
+    EventSource envía la cabecera Last-Event-ID y el stream continúa desde ahí; `?ultimo_id=`
+    hace lo mismo en la primera conexión.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Bajo WSGI la respuesta se acumularía en memoria sin enviarse nunca
+        return JsonResponse({"error": "El stream de eventos solo se sirve bajo ASGI."}, status=501)
+    try:
+        filtros = {
+            f'{campo}_id': int(request.GET[campo]) if request.GET.get(campo) else None
+            for campo in ('estudiante', 'curso')
+        }
+    except ValueError:
+        return JsonResponse({"error": "estudiante y curso deben ser enteros."}, status=400)
+
+    ultimo_id = request.headers.get('Last-Event-ID') or request.GET.get('ultimo_id')
+    return StreamingHttpResponse(
+        canal_eventos.flujo(ultimo_id, **filtros),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
@@ -0,0 +1,62 @@
+"""
+Normalización de texto para el índice de búsqueda (tabla TerminoBusqueda).
+
+Cada texto se pasa a minúsculas sin acentos y se parte en palabras. De cada palabra se
+indexan todos sus prefijos desde LONGITUD_MINIMA letras, de modo que buscar "garc" o
+"0011234" es una igualdad exacta sobre el índice (tipo, termino) en vez de un LIKE '%x%'
+que recorre la tabla. Las palabras de una consulta se normalizan igual y deben aparecer
+todas en el objeto; el puntaje suma el peso del campo donde aparece cada una y vale el
+doble cuando la palabra coincide completa.
+"""
+import re
+import unicodedata
+
+
+LONGITUD_MINIMA = 2
+LONGITUD_MAXIMA = 20  # Las palabras más largas se recortan, igual en el índice y en la consulta
+
+# Campos indexados de cada tipo y su peso en el puntaje
+CAMPOS = {
+    'curso': {'nombre': 3, 'codigo': 3, 'descripcion': 1},
+    'usuario': {'nombre_completo': 3, 'cedula': 3, 'correo': 2},
+}
+
+# Campos que además se indexan sin separadores ("001-1234567-8" se encuentra como "00112345678")
+CAMPOS_COMPACTOS = {'codigo', 'cedula'}
+
+_SEPARADORES = re.compile(r'[\W_]+')
+
+
+def normalizar(texto):
+    texto = unicodedata.normalize('NFKD', str(texto or '').lower())
+    return ''.join(caracter for caracter in texto if not unicodedata.combining(caracter))
+
+
+def palabras(texto):
+    return [palabra[:LONGITUD_MAXIMA] for palabra in _SEPARADORES.split(normalizar(texto)) if palabra]
+
+
+def palabras_consulta(consulta):
+    # Las palabras demasiado cortas no se indexan, así que no se exigen en la consulta
+    return sorted({palabra for palabra in palabras(consulta) if len(palabra) >= LONGITUD_MINIMA})
+
+
+def terminos(tipo, objeto):
+    """Devuelve {termino: peso} con los prefijos de todas las palabras de los campos de `objeto`."""
+    resultado = {}
+    for campo, peso in CAMPOS[tipo].items():
+        valor = getattr(objeto, campo)
+        lista = palabras(valor)
+        if campo in CAMPOS_COMPACTOS and len(lista) > 1:
+            lista.append(''.join(lista)[:LONGITUD_MAXIMA])
+        for palabra in lista:
+            for longitud in range(LONGITUD_MINIMA, len(palabra) + 1):
+                termino = palabra[:longitud]
+                puntos = peso * 2 if longitud == len(palabra) else peso
+                resultado[termino] = max(resultado.get(termino, 0), puntos)
+    return resultado
+
+
+def campos_cambiados(tipo, update_fields):
+    """Indica si un save() con `update_fields` pudo cambiar algún campo indexado."""
+    return update_fields is None or bool(set(update_fields) & set(CAMPOS[tipo]))
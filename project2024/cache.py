@@ -0,0 +1,79 @@
+"""
+Caché del catálogo de cursos. Las respuestas de CursoViewSet (listado y detalle) se guardan
+bajo llaves que incluyen un número de versión; invalidar el catálogo solo incrementa la
+versión, así que las entradas anteriores dejan de leerse y expiran solas. La versión vive en la
+misma caché, de modo que la invalidación llega a todos los procesos que compartan el backend;
+con LocMemCache (el configurado por defecto) solo al proceso actual.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+PREFIJO = 'catalogo_cursos'
+LLAVE_VERSION = f'{PREFIJO}:version'
+LLAVE_ACIERTOS = f'{PREFIJO}:aciertos'
+LLAVE_FALLOS = f'{PREFIJO}:fallos'
+
+
+def timeout():
+    return getattr(settings, 'CATALOGO_CACHE_TIMEOUT', 300)
+
+
+def version():
+    # add() solo escribe si la llave no existe, así dos procesos no se pisan la versión inicial
+    cache.add(LLAVE_VERSION, 1, timeout=None)
+    return cache.get(LLAVE_VERSION, 1)
+
+
+def llave(ruta):
+    return f'{PREFIJO}:v{version()}:{ruta}'
+
+
+def obtener(ruta):
+    """Devuelve los datos guardados para la ruta (o None) y actualiza los contadores."""
+    datos = cache.get(llave(ruta))
+    _incrementar(LLAVE_ACIERTOS if datos is not None else LLAVE_FALLOS)
+    return datos
+
+
+def guardar(ruta, datos):
+    cache.set(llave(ruta), datos, timeout=timeout())
+
+
+def invalidar():
+    """
+    Invalida el catálogo de inmediato y otra vez al confirmar la transacción, para que una
+    lectura concurrente no vuelva a guardar datos previos al commit con la versión nueva.
+    """
+    _incrementar_version()
+    transaction.on_commit(_incrementar_version)
+
+
+def estadisticas():
+    aciertos = cache.get(LLAVE_ACIERTOS, 0)
+    fallos = cache.get(LLAVE_FALLOS, 0)
+    total = aciertos + fallos
+    return {
+        'version': version(),
+        'aciertos': aciertos,
+        'fallos': fallos,
+        'tasa_aciertos': round(aciertos / total, 4) if total else 0.0,
+    }
+
+
+def _incrementar_version():
+    version()
+    try:
+        cache.incr(LLAVE_VERSION)
+    except ValueError:
+        # La llave expiró o fue desalojada entre version() e incr()
+        cache.set(LLAVE_VERSION, 2, timeout=None)
+
+
+def _incrementar(contador):
+    cache.add(contador, 0, timeout=None)
+    try:
+        cache.incr(contador)
+    except ValueError:
+        cache.set(contador, 1, timeout=None)
@@ -0,0 +1,262 @@
+"""
+Eventos de cambios en pagos, historial de pagos e inscripciones para el stream SSE
+(/async/eventos/). Es una bandeja de salida en la base de datos, como la de las notificaciones:
+models.py agrega cada cambio a la tabla Evento al confirmarse su transacción (un INSERT por
+escritura o por lote) y cada proceso que sirve conexiones la sondea por id creciente cada
+EVENTOS_SONDEO_SEGUNDOS, con un solo hilo para todas ellas, y reparte lo nuevo a la cola
+asyncio de cada conexión, ya filtrado por estudiante y curso. Así el stream ve las escrituras de
+todos los workers y réplicas de la API, y también las de los comandos de gestión que pasan por
+los modelos; no las hechas directamente en la base de datos.
+
+El id de cada evento es el de su fila. Un cliente que se reconecta con Last-Event-ID recibe lo
+que se perdió mientras esas filas sigan en la tabla (se borran pasados EVENTOS_REANUDAR_SEGUNDOS);
+si eso no es posible (un id desconocido o ya borrado, demasiados eventos pendientes) recibe un
+evento "reinicio" y debe volver a leer la lista.
+"""
+import asyncio
+import datetime
+import functools
+import json
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+
+def historial():
+    return getattr(settings, 'EVENTOS_HISTORIAL', 1000)
+
+
+def keepalive():
+    return getattr(settings, 'EVENTOS_KEEPALIVE_SEGUNDOS', 15)
+
+
+def reanudar():
+    return getattr(settings, 'EVENTOS_REANUDAR_SEGUNDOS', 300)
+
+
+def sondeo():
+    return getattr(settings, 'EVENTOS_SONDEO_SEGUNDOS', 1)
+
+
+def espera_hueco():
+    return getattr(settings, 'EVENTOS_ESPERA_HUECO_SEGUNDOS', 5)
+
+
+class Suscripcion:
+    """Una conexión SSE: su cola, en el event loop que la atiende, y sus filtros."""
+    def __init__(self, loop, estudiante_id=None, curso_id=None):
+        self.loop = loop
+        self.estudiante_id = estudiante_id
+        self.curso_id = curso_id
+        self.desde = 0  # Id del último evento que ya tiene (Last-Event-ID)
+        self.cola = asyncio.Queue(maxsize=historial())
+
+    def coincide(self, evento):
+        return (
+            evento.id > self.desde
+            and (self.estudiante_id is None or evento.estudiante_id == self.estudiante_id)
+            and (self.curso_id is None or evento.curso_id == self.curso_id)
+        )
+
+    def entregar(self, evento):
+        # Se llama desde el hilo que sondea la tabla; la cola solo se toca desde su loop
+        if self.coincide(evento):
+            self.loop.call_soon_threadsafe(self._encolar, evento)
+
+    def _encolar(self, evento):
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente demasiado lento: se descarta lo acumulado y se le pide releer la lista
+            while not self.cola.empty():
+                self.cola.get_nowait()
+            self.cola.put_nowait(None)
+
+
+class Canal:
+    """
+    Reparto de los eventos entre las conexiones de este proceso. Mientras haya alguna abierta, un
+    hilo sondea la tabla y entrega cada evento nuevo a las suscripciones que coinciden; sin `hilo`
+    (en las pruebas) la tabla se sondea llamando a sondear().
+    """
+    def __init__(self, hilo=True):
+        self.hilo = hilo
+        self._candado = threading.Lock()
+        self._suscripciones = set()
+        self._posicion = None  # Id del último evento repartido; None si no se está sondeando
+        self._hueco = None  # (id que falta, desde cuándo se espera)
+
+    def sondear(self):
+        """Lee los eventos posteriores al último repartido y los entrega; devuelve cuántos."""
+        from .models import Evento  # models importa este módulo
+
+        posicion = self._posicion
+        if posicion is None:
+            return 0
+        nuevos = self._contiguos(posicion, Evento.objects.filter(pk__gt=posicion).order_by('pk')[:historial()])
+        with self._candado:
+            if self._posicion != posicion or not nuevos:
+                return 0
+            self._posicion = nuevos[-1].id
+            suscripciones = list(self._suscripciones)
+        for suscripcion in suscripciones:
+            for evento in nuevos:
+                try:
+                    suscripcion.entregar(evento)
+                except RuntimeError:
+                    # Su event loop ya se cerró sin desuscribirla
+                    self.desuscribir(suscripcion)
+                    break
+        return len(nuevos)
+
+    def _contiguos(self, posicion, eventos):
+        """
+        Los eventos que siguen a `posicion` sin saltos. Un id que falta puede ser una fila que otro
+        proceso insertó antes pero aún no confirma: se espera hasta EVENTOS_ESPERA_HUECO_SEGUNDOS
+        antes de saltarlo (los huecos que deja el autoincremento no se llenan nunca).
+        """
+        contiguos, siguiente = [], posicion + 1
+        for evento in eventos:
+            if evento.id != siguiente and posicion:
+                if self._hueco is None or self._hueco[0] != siguiente:
+                    self._hueco = (siguiente, time.monotonic())
+                if time.monotonic() - self._hueco[1] < espera_hueco():
+                    break
+            contiguos.append(evento)
+            siguiente = evento.id + 1
+        return contiguos
+
+    def suscribir(self, suscripcion, ultimo_id=None):
+        """
+        Registra la suscripción y devuelve `(pendientes, reanudada)`: los eventos posteriores a
+        `ultimo_id` que le corresponden y si se pudo reanudar desde ahí sin perder ninguno.
+        """
+        from .models import Evento
+
+        try:
+            ultimo = int(ultimo_id) if ultimo_id is not None else None
+        except ValueError:
+            ultimo = None
+        with self._candado:
+            if self._posicion is None:
+                # Sin filas se empieza desde 0: el primer evento, tenga el id que tenga, no es un hueco
+                self._posicion = Evento.objects.aggregate(ultimo=Max('pk'))['ultimo'] or 0
+                if self.hilo:
+                    threading.Thread(target=self._sondear_mientras_haya_conexiones, daemon=True).start()
+            # Por el sondeo le llegan los eventos posteriores a `posicion` (o a su último id, si
+            # otro proceso ya le entregó más); los anteriores se leen aquí
+            posicion = self._posicion
+            suscripcion.desde = posicion if ultimo is None else max(ultimo, posicion)
+            self._suscripciones.add(suscripcion)
+        if ultimo_id is None:
+            return [], True
+        limites = Evento.objects.aggregate(primero=Min('pk'), ultimo=Max('pk'))
+        if ultimo is None or limites['primero'] is None or not limites['primero'] - 1 <= ultimo <= limites['ultimo']:
+            suscripcion.desde = posicion
+            return [], False
+        filtros = {
+            campo: valor for campo, valor in
+            (('estudiante_id', suscripcion.estudiante_id), ('curso_id', suscripcion.curso_id)) if valor is not None
+        }
+        pendientes = list(
+            Evento.objects.filter(pk__gt=ultimo, pk__lte=posicion, **filtros).order_by('pk')[:historial() + 1]
+        )
+        if len(pendientes) > historial():
+            return [], False
+        return pendientes, True
+
+    def desuscribir(self, suscripcion):
+        with self._candado:
+            self._suscripciones.discard(suscripcion)
+
+    def _sondear_mientras_haya_conexiones(self):
+        try:
+            while True:
+                time.sleep(sondeo())
+                with self._candado:
+                    if not self._suscripciones:
+                        self._posicion, self._hueco = None, None
+                        return
+                try:
+                    self.sondear()
+                except DatabaseError:
+                    # Base de datos caída: se reintenta en la siguiente ronda
+                    logger.exception('No se pudieron leer los eventos')
+        finally:
+            connections.close_all()
+
+
+canal = Canal()
+_proxima_limpieza = 0.0
+
+
+def publicar(eventos):
+    """
+    Agrega `[(tipo, accion, datos, estudiante_id, curso_id), ...]` a la tabla de eventos cuando
+    se confirme la transacción en curso (de inmediato si no hay una), en un solo INSERT. `eventos`
+    también puede ser una función que devuelva la lista: se llama después del commit, así que las
+    consultas que necesite no alargan la transacción.
+    """
+    if callable(eventos) or eventos:
+        transaction.on_commit(functools.partial(_guardar, eventos), robust=True)
+
+
+def _guardar(eventos):
+    global _proxima_limpieza
+    from .models import Evento
+
+    if callable(eventos):
+        eventos = eventos()
+    if not eventos:
+        return
+    Evento.objects.bulk_create([
+        Evento(tipo=tipo, accion=accion, datos=datos, estudiante_id=estudiante_id, curso_id=curso_id)
+        for tipo, accion, datos, estudiante_id, curso_id in eventos
+    ])
+    # Cada proceso borra, a lo más una vez por EVENTOS_REANUDAR_SEGUNDOS, los eventos vencidos
+    if time.monotonic() >= _proxima_limpieza:
+        _proxima_limpieza = time.monotonic() + reanudar()
+        Evento.objects.filter(fecha__lt=timezone.now() - datetime.timedelta(seconds=reanudar())).delete()
+
+
+def formatear(evento):
+    datos = {'accion': evento.accion, 'estudiante': evento.estudiante_id, 'curso': evento.curso_id, **evento.datos}
+    return f'id: {evento.id}\nevent: {evento.tipo}\ndata: {json.dumps(datos, cls=DjangoJSONEncoder)}\n\n'
+
+
+REINICIO = 'event: reinicio\ndata: {}\n\n'
+
+
+async def flujo(ultimo_id=None, estudiante_id=None, curso_id=None):
+    """
+    Cuerpo del stream text/event-stream. La suscripción se abre al empezar a enviar y se cierra
+    cuando el servidor cancela el generador al desconectarse el cliente. Sin eventos, cada
+    EVENTOS_KEEPALIVE_SEGUNDOS se envía un comentario para que los proxies no corten la conexión.
+    """
+    suscripcion = Suscripcion(asyncio.get_running_loop(), estudiante_id, curso_id)
+    try:
+        pendientes, reanudada = await sync_to_async(canal.suscribir)(suscripcion, ultimo_id)
+        yield 'retry: 3000\n\n'
+        if not reanudada:
+            yield REINICIO
+        for evento in pendientes:
+            yield formatear(evento)
+        while True:
+            try:
+                evento = await asyncio.wait_for(suscripcion.cola.get(), keepalive())
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield REINICIO if evento is None else formatear(evento)
+    finally:
+        canal.desuscribir(suscripcion)
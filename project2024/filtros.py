@@ -0,0 +1,161 @@
+"""
+Filtros de los listados de la API.
+
+Cada ViewSet declara un `filterset_class` de django-filter. Los filtros se traducen en
+igualdades y rangos sobre columnas indexadas: las relaciones se filtran por su columna
+`_id` (sin consultar antes el objeto relacionado) y las fechas de los DateTimeField se
+comparan como rango semiabierto sobre el valor de la columna, nunca con `__date`, que
+envuelve la columna en una función y la deja fuera del índice.
+"""
+import datetime
+
+import django_filters
+from django_filters.constants import EMPTY_VALUES
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import filters
+
+from .models import (
+    Administrativo, Curso, Docente, Estudiante, HistorialPago, Inscripcion, Notificacion, Pago, Reembolso,
+    Reporte, TerminoBusqueda,
+)
+
+
+class BusquedaIndexadaFilter(filters.BaseFilterBackend):
+    """
+    Filtra el listado con `?search=` usando el índice TerminoBusqueda en lugar de LIKE '%x%'.
+    Cada vista declara en `busqueda_campos` qué campo de su modelo apunta a cada tipo indexado,
+    por ejemplo {'curso': 'pk'} o {'curso': 'curso_id', 'usuario': 'estudiante_id'}; basta con
+    que coincida uno de ellos. Los ids se resuelven en una subconsulta, sin traerlos a Python.
+    """
+    parametro = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        consulta = request.query_params.get(self.parametro, '').strip()
+        campos = getattr(view, 'busqueda_campos', None)
+        if not consulta or not campos:
+            return queryset
+
+        resultado = queryset.none()
+        for tipo, campo in campos.items():
+            ids = TerminoBusqueda.coincidencias(tipo, consulta).values('objeto_id')
+            resultado = resultado | queryset.filter(**{f'{campo}__in': ids})
+        return resultado
+
+
+class DiaFilter(django_filters.DateFilter):
+    """
+    Recibe una fecha (AAAA-MM-DD) y filtra un DateTimeField por días completos: con
+    `extremo='desde'` desde el inicio de ese día y con `extremo='hasta'` hasta el final.
+    """
+    def __init__(self, *args, extremo='desde', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.extremo = extremo
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        if self.extremo == 'hasta':
+            return qs.filter(**{f'{self.field_name}__lt': inicio_del_dia(value + datetime.timedelta(days=1))})
+        return qs.filter(**{f'{self.field_name}__gte': inicio_del_dia(value)})
+
+
+def inicio_del_dia(fecha):
+    inicio = datetime.datetime.combine(fecha, datetime.time.min)
+    return timezone.make_aware(inicio) if settings.USE_TZ else inicio
+
+
+class EstudianteFilter(django_filters.FilterSet):
+    desde = DiaFilter(field_name='fecha_registro', extremo='desde')
+    hasta = DiaFilter(field_name='fecha_registro', extremo='hasta')
+
+    class Meta:
+        model = Estudiante
+        fields = ['estado', 'matricula']
+
+
+class DocenteFilter(django_filters.FilterSet):
+    class Meta:
+        model = Docente
+        fields = ['estado', 'estatus', 'codigo', 'campus', 'facultad', 'escuela', 'especialidad', 'codigo_doc']
+
+
+class AdministrativoFilter(django_filters.FilterSet):
+    class Meta:
+        model = Administrativo
+        fields = ['estado', 'departamento', 'cargo', 'acceso', 'codigo_adm']
+
+
+class CursoFilter(django_filters.FilterSet):
+    docente = django_filters.NumberFilter(field_name='docente_id_id')
+    inicio_desde = django_filters.DateFilter(field_name='fecha_inicio', lookup_expr='gte')
+    inicio_hasta = django_filters.DateFilter(field_name='fecha_inicio', lookup_expr='lte')
+
+    class Meta:
+        model = Curso
+        fields = ['tipo', 'estado', 'facultad', 'codigo']
+
+
+class InscripcionFilter(django_filters.FilterSet):
+    curso = django_filters.NumberFilter(field_name='curso_id')
+    estudiante = django_filters.NumberFilter(field_name='estudiante_id')
+    desde = DiaFilter(field_name='fecha_inscripcion', extremo='desde')
+    hasta = DiaFilter(field_name='fecha_inscripcion', extremo='hasta')
+
+    class Meta:
+        model = Inscripcion
+        fields = ['estado']
+
+
+class PagoFilter(django_filters.FilterSet):
+    inscripcion = django_filters.NumberFilter(field_name='inscripcion_id')
+    curso = django_filters.NumberFilter(field_name='inscripcion__curso_id')
+    estudiante = django_filters.NumberFilter(field_name='inscripcion__estudiante_id')
+    desde = DiaFilter(field_name='fecha_pago', extremo='desde')
+    hasta = DiaFilter(field_name='fecha_pago', extremo='hasta')
+    vence_desde = django_filters.DateFilter(field_name='fecha_vencimiento', lookup_expr='gte')
+    vence_hasta = django_filters.DateFilter(field_name='fecha_vencimiento', lookup_expr='lte')
+
+    class Meta:
+        model = Pago
+        fields = ['estado_pago', 'metodo_pago']
+
+
+class HistorialPagoFilter(django_filters.FilterSet):
+    pago = django_filters.NumberFilter(field_name='pago_id')
+    desde = DiaFilter(field_name='fecha_cambio', extremo='desde')
+    hasta = DiaFilter(field_name='fecha_cambio', extremo='hasta')
+
+    class Meta:
+        model = HistorialPago
+        fields = ['estado_pago_anterior', 'estado_pago_nuevo']
+
+
+class ReembolsoFilter(django_filters.FilterSet):
+    usuario = django_filters.NumberFilter(field_name='usuario_id')
+    pago = django_filters.NumberFilter(field_name='pago_id')
+    desde = DiaFilter(field_name='fecha_solicitud', extremo='desde')
+    hasta = DiaFilter(field_name='fecha_solicitud', extremo='hasta')
+
+    class Meta:
+        model = Reembolso
+        fields = ['estado']
+
+
+class NotificacionFilter(django_filters.FilterSet):
+    usuario = django_filters.NumberFilter(field_name='usuario_id')
+    desde = DiaFilter(field_name='fecha_envio', extremo='desde')
+    hasta = DiaFilter(field_name='fecha_envio', extremo='hasta')
+
+    class Meta:
+        model = Notificacion
+        fields = ['estado', 'tipo_notificacion']
+
+
+class ReporteFilter(django_filters.FilterSet):
+    desde = DiaFilter(field_name='fecha_generacion', extremo='desde')
+    hasta = DiaFilter(field_name='fecha_generacion', extremo='hasta')
+
+    class Meta:
+        model = Reporte
+        fields = ['tipo_reporte']
@@ -0,0 +1,192 @@
+"""
+Forma de las respuestas de la API: `?fields=` y `?expand=`.
+
+- `?fields=id,estado,curso.nombre` limita las columnas devueltas. Con un punto se eligen los
+  campos de una relación expandida.
+- `?expand=curso,pagos.inscripcion` reemplaza el id de una relación por el objeto completo
+  (o agrega la lista de objetos relacionados). Cada serializer declara en
+  `Meta.expandibles` qué relaciones se pueden expandir.
+
+El serializer con la forma ya aplicada sabe qué columnas y relaciones necesita, de modo que
+la consulta se arma a su medida: `only()` con las columnas pedidas, `select_related` para las
+relaciones hacia adelante y `prefetch_related` para las listas. Un listado sale siempre en un
+número fijo de consultas, sin importar cuántas filas tenga la página.
+"""
+import sys
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+class Forma:
+    """Campos y expansiones pedidos para un nivel de la respuesta."""
+    def __init__(self):
+        self.campos = None  # None = todos los campos del serializer
+        self.expandir = set()
+        self.hijos = {}
+
+    def hijo(self, nombre):
+        return self.hijos.setdefault(nombre, Forma())
+
+
+def _rutas(valor):
+    return [ruta.split('.') for ruta in (valor or '').replace(' ', '').split(',') if ruta]
+
+
+def parsear_forma(fields=None, expand=None):
+    """Convierte los parámetros `fields` y `expand` en un árbol de Forma."""
+    forma = Forma()
+    for ruta in _rutas(fields):
+        actual = forma
+        for nombre in ruta:
+            if actual.campos is None:
+                actual.campos = set()
+            actual.campos.add(nombre)
+            actual = actual.hijo(nombre)
+    for ruta in _rutas(expand):
+        actual = forma
+        for nombre in ruta:
+            actual.expandir.add(nombre)
+            actual = actual.hijo(nombre)
+    return forma
+
+
+class Expandible:
+    """
+    Relación que `?expand=` puede reemplazar por un serializer anidado. `serializer` puede ser
+    la clase o su nombre dentro del módulo del serializer que la declara; `many=True` indica
+    una relación inversa (por ejemplo `pago_set`), que se precarga con `prefetch_related`.
+    """
+    def __init__(self, serializer, source=None, many=False):
+        self.serializer = serializer
+        self.source = source
+        self.many = many
+
+    def campo(self, nombre, forma, modulo):
+        clase = self.serializer
+        if isinstance(clase, str):
+            clase = getattr(sys.modules[modulo], clase)
+        kwargs = {'read_only': True, 'forma': forma, 'many': self.many}
+        if self.source and self.source != nombre:
+            kwargs['source'] = self.source
+        return clase(**kwargs)
+
+
+class SerializerDinamico(serializers.ModelSerializer):
+    """
+    ModelSerializer que acepta `forma=` (ver `parsear_forma`). Sin forma se comporta como
+    siempre, que es lo que usan las escrituras. Con forma:
+
+    - se quitan los campos que no están en `forma.campos`;
+    - las relaciones de `forma.expandir` se reemplazan por su serializer de `Meta.expandibles`;
+    - una relación anidada por defecto que no se pidió expandir se devuelve como id.
+    """
+    def __init__(self, *args, forma=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.forma = forma
+        if forma is not None:
+            self._aplicar_forma(forma)
+
+    def _aplicar_forma(self, forma):
+        expandibles = getattr(self.Meta, 'expandibles', {})
+        errores = {}
+        if forma.campos is not None:
+            desconocidos = forma.campos - set(self.fields) - set(expandibles)
+            if desconocidos:
+                errores['fields'] = [f'Campo desconocido: {nombre}.' for nombre in sorted(desconocidos)]
+        desconocidos = forma.expandir - set(expandibles)
+        if desconocidos:
+            errores['expand'] = [f'No se puede expandir: {nombre}.' for nombre in sorted(desconocidos)]
+        if errores:
+            raise serializers.ValidationError(errores)
+
+        if forma.campos is not None:
+            for nombre in list(self.fields):
+                if nombre not in forma.campos and nombre not in forma.expandir:
+                    del self.fields[nombre]
+
+        for nombre, expandible in expandibles.items():
+            if nombre in forma.expandir:
+                self.fields[nombre] = expandible.campo(nombre, forma.hijo(nombre), type(self).__module__)
+            elif isinstance(self.fields.get(nombre), serializers.BaseSerializer):
+                fuente = self.fields[nombre].source
+                self.fields[nombre] = serializers.PrimaryKeyRelatedField(
+                    read_only=True, **({'source': fuente} if fuente != nombre else {})
+                )
+
+    def preparar_consulta(self, queryset):
+        """Ajusta `queryset` a los campos y relaciones que este serializer va a leer."""
+        only, selects, prefetches = set(), set(), []
+        completo = _planear(self, '', only, selects, prefetches)
+        if selects:
+            queryset = queryset.select_related(*sorted(selects))
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        if completo:
+            queryset = queryset.only(*sorted(only))
+        return queryset
+
+
+def _planear(serializer, prefijo, only, selects, prefetches):
+    """
+    Recorre los campos de `serializer` y acumula las columnas (`only`), los joins (`selects`)
+    y las precargas (`prefetches`) que necesita, con las rutas relativas a `prefijo`. Devuelve
+    False si algún campo no se puede resolver a columnas (un SerializerMethodField o una
+    propiedad del modelo); en ese caso la consulta se deja sin `only()`.
+    """
+    modelo = serializer.Meta.model
+    completo = True
+    only.add(prefijo + modelo._meta.pk.name)
+    if modelo._meta.pk.name != 'id' and any(f.name == 'id' for f in modelo._meta.concrete_fields):
+        # Herencia multitabla: el cursor de la paginación ordena por `id`
+        only.add(prefijo + 'id')
+
+    for campo in serializer.fields.values():
+        if campo.write_only:
+            continue
+
+        if isinstance(campo, serializers.ListSerializer):
+            hijo = campo.child
+            llave = getattr(modelo, campo.source).field.name
+            h_only, h_selects, h_prefetches = set(), set(), []
+            queryset = hijo.Meta.model.objects.order_by('pk')
+            if _planear(hijo, '', h_only, h_selects, h_prefetches):
+                queryset = queryset.only(*sorted(h_only | {llave}))
+            queryset = queryset.select_related(*sorted(h_selects)).prefetch_related(*h_prefetches)
+            prefetches.append(Prefetch(prefijo + campo.source, queryset=queryset))
+            continue
+
+        if isinstance(campo, serializers.BaseSerializer):
+            ruta = prefijo + campo.source.replace('.', '__')
+            selects.add(ruta)
+            only.add(ruta)
+            completo = _planear(campo, ruta + '__', only, selects, prefetches) and completo
+            continue
+
+        if campo.source == '*':
+            completo = False
+            continue
+
+        actual, ruta = modelo, prefijo
+        partes = campo.source.split('.')
+        for indice, parte in enumerate(partes):
+            try:
+                campo_modelo = actual._meta.get_field(parte)
+            except FieldDoesNotExist:
+                completo = False
+                break
+            if campo_modelo.many_to_many or campo_modelo.one_to_many:
+                prefetches.append(ruta + parte)
+                break
+            if indice == len(partes) - 1:
+                only.add(ruta + parte)
+            elif campo_modelo.is_relation:
+                selects.add(ruta + parte)
+                only.add(ruta + parte)
+                only.add(ruta + parte + '__' + campo_modelo.related_model._meta.pk.name)
+                actual, ruta = campo_modelo.related_model, ruta + parte + '__'
+            else:
+                completo = False
+                break
+    return completo
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from project2024 import cache as catalogo_cache
+from project2024.models import activar_cursos, cursos_por_activar
+
+
+class Command(BaseCommand):
+    """
+    Activa los cursos inactivos que ya llegaron a PORCENTAJE_ACTIVACION de su capacidad y deja
+    el aviso a su docente, igual que una inscripción que cruza el umbral (ver
+    models.activar_cursos). La migración 0017 puso al día los cursos que existían entonces;
+    este comando lo repite después de cambios que no pasan por la inscripción: recontar_inscritos,
+    cargas masivas o una capacidad reducida. Recorre los cursos por lotes de `--lote`, cada uno
+    en su propia transacción.
+    """
+    help = 'Activa los cursos que ya superan el umbral de ocupación.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help='Cursos por transacción.')
+        parser.add_argument(
+            '--dry-run', action='store_true', help='Solo informa cuántos cursos se activarían, sin activarlos.',
+        )
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote debe ser mayor que cero.')
+        if options['dry_run']:
+            self.stdout.write(f'Cursos por activar: {cursos_por_activar().count()}')
+            return
+
+        activados = ultimo = 0
+        while True:
+            ids = list(
+                cursos_por_activar().filter(pk__gt=ultimo).order_by('pk').values_list('pk', flat=True)[:options['lote']]
+            )
+            if not ids:
+                break
+            ultimo = ids[-1]
+            with transaction.atomic():
+                activados += activar_cursos(ids)
+        if activados:
+            catalogo_cache.invalidar()
+        self.stdout.write(self.style.SUCCESS(f'Cursos activados: {activados}'))
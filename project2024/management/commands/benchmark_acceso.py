@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from project2024.models import Credencial, Estudiante
+
+
+class _Revertir(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Mide inicios de sesión por segundo con la búsqueda anterior (filtro por matrícula y
+    contraseña en texto plano sobre el join Estudiante-Usuario) y con el índice Credencial
+    (búsqueda por llave primaria y verificación del hash en Python). Los usuarios de prueba
+    se crean dentro de una transacción que se revierte al terminar.
+    """
+    help = 'Compara el rendimiento de inicio de sesión antes y después del índice de credenciales.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=200, help='Estudiantes de prueba a crear.')
+        parser.add_argument('--intentos', type=int, default=500, help='Inicios de sesión a medir por variante.')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._medir(options['usuarios'], options['intentos'])
+                raise _Revertir
+        except _Revertir:
+            pass
+
+    def _medir(self, cantidad, intentos):
+        estudiantes = [
+            Estudiante.objects.create(
+                nombre_completo=f'Benchmark {n}', cedula=f'BENCH{n:07d}', correo=f'bench{n}@example.com',
+                password=f'clave{n}', matricula=f'BENCH{n:07d}',
+            )
+            for n in range(cantidad)
+        ]
+        logins = [(e.matricula, e.password) for e in estudiantes]
+        logins = (logins * (intentos // len(logins) + 1))[:intentos]
+
+        def anterior():
+            for matricula, password in logins:
+                Estudiante.objects.get(password=password, matricula=matricula)
+
+        def indice_sql():
+            for matricula, _ in logins:
+                Credencial.objects.get(pk=Credencial.construir_clave('estudiante', matricula))
+
+        def indice():
+            for matricula, password in logins:
+                credencial = Credencial.objects.get(pk=Credencial.construir_clave('estudiante', matricula))
+                assert credencial.verificar(password)
+
+        for nombre, funcion in (
+            ('Anterior (join + contraseña en SQL)', anterior),
+            ('Índice Credencial, solo la búsqueda', indice_sql),
+            ('Índice Credencial + verificación del hash', indice),
+        ):
+            inicio = time.perf_counter()
+            funcion()
+            segundos = time.perf_counter() - inicio
+            self.stdout.write(f'{nombre}: {intentos / segundos:,.0f} inicios de sesión/s')
@@ -0,0 +1,99 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client
+
+from project2024.models import Docente, Inscripcion
+
+
+class Command(BaseCommand):
+    """
+    Compara el rendimiento con peticiones concurrentes de las lecturas síncronas servidas por
+    WSGI (un hilo por worker síncrono de gunicorn) y sus versiones asíncronas servidas por ASGI
+    en un solo bucle de eventos. `--latencia-ms` agrega una espera a cada consulta SQL para
+    simular el viaje de ida y vuelta al MySQL remoto. Usa los datos existentes de la base.
+    """
+    help = 'Compara el rendimiento WSGI y ASGI de las lecturas más usadas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--peticiones', type=int, default=200, help='Peticiones por endpoint y despliegue.')
+        parser.add_argument('--concurrencia', type=int, default=20, help='Peticiones simultáneas en ASGI.')
+        parser.add_argument('--workers', type=int, default=1, help='Workers síncronos WSGI simulados.')
+        parser.add_argument('--latencia-ms', type=float, default=0.0, help='Espera agregada a cada consulta SQL.')
+
+    def handle(self, *args, **options):
+        inscripcion = Inscripcion.objects.order_by('id').first()
+        docente = Docente.objects.order_by('id').first()
+        if inscripcion is None or docente is None:
+            raise CommandError('Se necesita al menos una inscripción y un docente en la base de datos.')
+
+        self._simular_latencia(options['latencia_ms'] / 1000)
+        endpoints = [
+            ('verificar estudiante', f'/estudiante/{inscripcion.estudiante_id}/verificar/',
+             f'/async/estudiante/{inscripcion.estudiante_id}/verificar/'),
+            ('cursos del docente', f'/docente/{docente.id}/cursos/', f'/async/docente/{docente.id}/cursos/'),
+            ('catálogo de cursos', '/api/cursos/?page_size=50', '/async/cursos/?page_size=50'),
+        ]
+        for nombre, ruta_wsgi, ruta_asgi in endpoints:
+            wsgi = self._medir_wsgi(ruta_wsgi, options['peticiones'], options['workers'])
+            asgi = asyncio.run(self._medir_asgi(ruta_asgi, options['peticiones'], options['concurrencia']))
+            self.stdout.write(f'{nombre}:')
+            self.stdout.write(f'  WSGI ({options["workers"]} workers): {self._resumen(*wsgi)}')
+            self.stdout.write(f'  ASGI (concurrencia {options["concurrencia"]}): {self._resumen(*asgi)}')
+
+    def _simular_latencia(self, segundos):
+        if not segundos:
+            return
+
+        def latencia(execute, sql, params, many, context):
+            time.sleep(segundos)
+            return execute(sql, params, many, context)
+
+        def instalar(sender, connection, **kwargs):
+            connection.execute_wrappers.append(latencia)
+
+        connection_created.connect(instalar, weak=False)
+        for conexion in connections.all():
+            if conexion.connection is not None:
+                conexion.execute_wrappers.append(latencia)
+
+    def _medir_wsgi(self, ruta, peticiones, workers):
+        def atender(cantidad):
+            cliente = Client()
+            duraciones = []
+            for _ in range(cantidad):
+                inicio = time.perf_counter()
+                cliente.get(ruta)
+                duraciones.append(time.perf_counter() - inicio)
+            connections.close_all()
+            return duraciones
+
+        reparto = [peticiones // workers + (1 if i < peticiones % workers else 0) for i in range(workers)]
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            duraciones = [d for parte in executor.map(atender, reparto) for d in parte]
+        return time.perf_counter() - inicio, duraciones
+
+    async def _medir_asgi(self, ruta, peticiones, concurrencia):
+        cliente = AsyncClient()
+        limite = asyncio.Semaphore(concurrencia)
+        duraciones = []
+
+        async def una():
+            async with limite:
+                inicio = time.perf_counter()
+                await cliente.get(ruta)
+                duraciones.append(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(una() for _ in range(peticiones)))
+        return time.perf_counter() - inicio, duraciones
+
+    def _resumen(self, total, duraciones):
+        p50 = statistics.median(duraciones) * 1000
+        return f'{len(duraciones) / total:,.1f} pet/s, p50 {p50:.1f} ms'
@@ -0,0 +1,125 @@
+import itertools
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count, Q
+
+from project2024.models import Curso, CursoLleno, Estudiante, Inscripcion
+
+
+class Command(BaseCommand):
+    """
+    Prueba de carga de la reserva de cupos: varios hilos, cada uno con su propia conexión,
+    inscriben estudiantes a la vez en pocos cursos de capacidad limitada usando la base de datos
+    configurada (SQLite o MySQL). Al final informa las inscripciones por segundo y comprueba que
+    ningún curso quedó con más inscritos que su capacidad y que el contador coincide con las
+    filas reales. Los cursos y las inscripciones de prueba se confirman (los hilos no comparten
+    transacción) y se borran al terminar.
+    """
+    help = 'Mide inscripciones por segundo con cursos llenos y verifica que no haya sobreventa.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=8, help='Hilos inscribiendo a la vez.')
+        parser.add_argument('--estudiantes', type=int, default=400, help='Estudiantes que intentan inscribirse.')
+        parser.add_argument('--cursos', type=int, default=2, help='Cursos en disputa.')
+        parser.add_argument('--capacidad', type=int, default=50, help='Capacidad de cada curso.')
+        parser.add_argument(
+            '--lista-espera', action='store_true',
+            help='Con el curso lleno, dejar la inscripción en lista de espera en lugar de rechazarla.',
+        )
+
+    def handle(self, *args, **options):
+        if options['hilos'] < 1 or options['cursos'] < 1 or options['capacidad'] < 1:
+            raise CommandError('--hilos, --cursos y --capacidad deben ser mayores que cero.')
+
+        prefijo = f'BI{int(time.time()) % 100000:05d}'
+        with transaction.atomic():
+            cursos = [
+                Curso.objects.create(
+                    nombre=f'Benchmark {n}', tipo='curso', tarifa=100, fecha_inicio='2024-01-01',
+                    fecha_fin='2024-06-30', capacidad=options['capacidad'], modulos=1, horas=10,
+                    codigo=f'{prefijo}{n}', profesor='Benchmark', facultad='Benchmark', telefono='8090000000',
+                )
+                for n in range(options['cursos'])
+            ]
+            # Los estudiantes existentes sirven (los cursos son nuevos); solo se crean los que falten
+            estudiantes = list(Estudiante.objects.order_by('pk').values_list('pk', flat=True)[:options['estudiantes']])
+            creados = [
+                Estudiante.objects.create(
+                    nombre_completo=f'Benchmark {n}', cedula=f'{prefijo}{n:06d}',
+                    correo=f'{prefijo.lower()}.{n}@example.com', password='clave', matricula=f'{prefijo}{n:06d}',
+                ).pk
+                for n in range(options['estudiantes'] - len(estudiantes))
+            ]
+        try:
+            self._medir(cursos, estudiantes + creados, options)
+        finally:
+            Inscripcion.objects.filter(curso__in=cursos).delete()
+            Curso.objects.filter(pk__in=[curso.pk for curso in cursos]).delete()
+            Estudiante.objects.filter(pk__in=creados).delete()
+
+    def _medir(self, cursos, estudiantes, options):
+        # Cada estudiante intenta inscribirse en cada curso; los hilos se reparten los intentos
+        intentos = list(itertools.product(estudiantes, [curso.pk for curso in cursos]))
+        resultados = {'inscritas': 0, 'en_espera': 0, 'rechazadas': 0, 'errores': 0}
+        candado = threading.Lock()
+        barrera = threading.Barrier(options['hilos'])
+
+        def inscribir(porcion):
+            conteo = dict.fromkeys(resultados, 0)
+            barrera.wait()
+            try:
+                for estudiante_id, curso_id in porcion:
+                    try:
+                        Inscripcion.objects.create(estudiante_id=estudiante_id, curso_id=curso_id, estado='inscrito')
+                        conteo['inscritas'] += 1
+                    except CursoLleno:
+                        if options['lista_espera']:
+                            Inscripcion.objects.create(estudiante_id=estudiante_id, curso_id=curso_id, estado='espera')
+                            conteo['en_espera'] += 1
+                        else:
+                            conteo['rechazadas'] += 1
+                    except DatabaseError:
+                        # Por ejemplo "database is locked" en SQLite con muchos escritores
+                        conteo['errores'] += 1
+            finally:
+                connection.close()
+                with candado:
+                    for clave, valor in conteo.items():
+                        resultados[clave] += valor
+
+        hilos = [
+            threading.Thread(target=inscribir, args=(intentos[n::options['hilos']],))
+            for n in range(options['hilos'])
+        ]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        segundos = time.perf_counter() - inicio
+
+        self.stdout.write(
+            f"{connection.vendor}, {options['hilos']} hilos: {len(intentos)} intentos en {segundos:.2f} s, "
+            f"{len(intentos) / segundos:,.0f} intentos/s, {resultados['inscritas'] / segundos:,.0f} inscripciones/s"
+        )
+        self.stdout.write(
+            f"Inscritas: {resultados['inscritas']}, en espera: {resultados['en_espera']}, "
+            f"rechazadas: {resultados['rechazadas']}, errores: {resultados['errores']}"
+        )
+
+        sobreventa = 0
+        for curso in Curso.objects.filter(pk__in=[curso.pk for curso in cursos]).annotate(
+            reales=Count('inscripcion', filter=~Q(inscripcion__estado='espera'))
+        ):
+            if curso.inscritos > curso.capacidad or curso.inscritos != curso.reales:
+                sobreventa += 1
+                self.stderr.write(
+                    f'{curso.codigo}: contador {curso.inscritos}, inscripciones {curso.reales}, '
+                    f'capacidad {curso.capacidad}'
+                )
+        if sobreventa:
+            raise CommandError(f'{sobreventa} cursos con sobreventa o contador desviado.')
+        self.stdout.write(self.style.SUCCESS('Sin sobreventa: ningún curso supera su capacidad.'))
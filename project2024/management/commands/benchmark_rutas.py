@@ -0,0 +1,135 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from project2024.models import Curso, Docente, Inscripcion
+
+
+# Prefijos de rutas que no se miden: el admin de Django requiere sesión y el stream de eventos no termina
+RUTAS_OMITIDAS = ('admin/', 'async/eventos/')
+
+
+class Command(BaseCommand):
+    """
+    Recorre todas las rutas GET de AppDevTFG2024/urls.py y project2024/urls.py (incluidas las
+    acciones de los ViewSets), las llama varias veces con el cliente de pruebas de Django y
+    reporta la latencia p50/p95 y la cantidad de consultas SQL de cada una. Los parámetros de
+    las rutas se completan con registros existentes; conviene ejecutarlo después de
+    `generar_datos`. Con `--salida` guarda el resultado en JSON para comparar entre versiones.
+
+    Se ejecuta con el entorno de pruebas de Django activo: los correos que envíe alguna vista
+    quedan en el backend en memoria y los errores se registran como estado 500 en vez de
+    detener la medición.
+    """
+    help = 'Mide latencia y consultas SQL de todas las rutas GET del proyecto.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=20, help='Llamadas por ruta.')
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados.')
+
+    def handle(self, *args, **options):
+        try:
+            setup_test_environment()
+        except RuntimeError:
+            # Ya activo (por ejemplo, al ejecutarse desde las pruebas)
+            self._medir(options)
+            return
+        try:
+            self._medir(options)
+        finally:
+            teardown_test_environment()
+
+    def _medir(self, options):
+        cliente = Client(raise_request_exception=False)
+        resultados = []
+        omitidas = []
+        for nombre, ruta, url in self._urls(get_resolver()):
+            if url is None:
+                omitidas.append(ruta)
+                continue
+            duraciones, consultas, estado = [], 0, None
+            for _ in range(options['repeticiones']):
+                with CaptureQueriesContext(connection) as capturadas:
+                    inicio = time.perf_counter()
+                    respuesta = cliente.get(url)
+                    duraciones.append(time.perf_counter() - inicio)
+                    if hasattr(respuesta, 'streaming_content'):
+                        for _ in respuesta.streaming_content:
+                            pass
+                consultas = max(consultas, len(capturadas))
+                estado = respuesta.status_code
+            resultados.append({
+                'ruta': ruta,
+                'url': url,
+                'estado': estado,
+                'p50_ms': round(statistics.median(duraciones) * 1000, 2),
+                'p95_ms': round(self._percentil(duraciones, 95) * 1000, 2),
+                'consultas': consultas,
+            })
+
+        ancho = max((len(r['url']) for r in resultados), default=10)
+        self.stdout.write(f'{"URL":<{ancho}}  estado   p50 ms   p95 ms  consultas')
+        for r in resultados:
+            self.stdout.write(
+                f'{r["url"]:<{ancho}}  {r["estado"]:>6}  {r["p50_ms"]:>7.2f}  {r["p95_ms"]:>7.2f}  {r["consultas"]:>9}'
+            )
+        if omitidas:
+            self.stdout.write(f'Omitidas (sin GET o sin datos para sus parámetros): {", ".join(omitidas)}')
+
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump({'resultados': resultados, 'omitidas': omitidas}, archivo, indent=2, ensure_ascii=False)
+
+    def _urls(self, resolver, prefijo='', namespace=None):
+        """Genera (nombre, patrón, url o None si no se puede medir) para cada ruta del proyecto."""
+        for patron in resolver.url_patterns:
+            ruta = prefijo + str(patron.pattern)
+            if ruta.lstrip('^').startswith(RUTAS_OMITIDAS):
+                continue
+            if isinstance(patron, URLResolver):
+                yield from self._urls(patron, ruta, patron.namespace or namespace)
+            elif isinstance(patron, URLPattern) and patron.name:
+                parametros = set(patron.pattern.regex.groupindex)
+                # Las variantes con sufijo de formato (.json, .api) repiten la misma vista
+                if 'format' in parametros:
+                    continue
+                nombre = f'{namespace}:{patron.name}' if namespace else patron.name
+                yield nombre, ruta, self._url(nombre, patron, parametros)
+
+    def _url(self, nombre, patron, parametros):
+        callback = patron.callback
+        acciones = getattr(callback, 'actions', None)
+        clase = getattr(callback, 'cls', None)
+        if acciones is not None and 'get' not in acciones:
+            return None
+        if acciones is None and clase is not None and not hasattr(clase, 'get'):
+            return None
+
+        kwargs = {}
+        for parametro in parametros:
+            valor = self._valor(parametro, clase)
+            if valor is None:
+                return None
+            kwargs[parametro] = valor
+        return reverse(nombre, kwargs=kwargs)
+
+    def _valor(self, parametro, clase):
+        if parametro == 'pk' and clase is not None:
+            return clase.queryset.model.objects.order_by('pk').values_list('pk', flat=True).first()
+        if parametro == 'estudiante_id':
+            return Inscripcion.objects.order_by('id').values_list('estudiante_id', flat=True).first()
+        if parametro == 'docente_id':
+            return (Curso.objects.exclude(docente_id=None).order_by('id').values_list('docente_id', flat=True).first()
+                    or Docente.objects.order_by('id').values_list('id', flat=True).first())
+        return None
+
+    def _percentil(self, valores, percentil):
+        if len(valores) < 2:
+            return valores[0]
+        return statistics.quantiles(valores, n=100, method='inclusive')[percentil - 1]
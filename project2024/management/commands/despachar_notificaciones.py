@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from project2024 import notificaciones
+
+
+class Command(BaseCommand):
+    """
+    Envía por correo las notificaciones pendientes (ver project2024/notificaciones.py). Sin
+    opciones despacha lo que haya vencido y termina; con --continuo queda como proceso de
+    fondo que vuelve a revisar cada --espera segundos. Al final de cada ronda informa cuántas
+    se enviaron y cuántas por segundo.
+    """
+    help = 'Envía por correo las notificaciones pendientes en lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=None, help='Notificaciones por lote (NOTIFICACIONES_LOTE).')
+        parser.add_argument('--max-lotes', type=int, default=None, help='Lotes por ronda como máximo.')
+        parser.add_argument('--continuo', action='store_true', help='No terminar: volver a revisar periódicamente.')
+        parser.add_argument('--espera', type=float, default=5.0, help='Segundos entre rondas con --continuo.')
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                try:
+                    resultado = notificaciones.despachar(options['lote'], options['max_lotes'])
+                except OSError as exc:
+                    # Servidor de correo caído: con --continuo se reintenta en la siguiente ronda
+                    if not options['continuo']:
+                        raise
+                    self.stderr.write(f'No se pudo conectar al servidor de correo: {exc}')
+                else:
+                    if resultado['lotes'] or not options['continuo']:
+                        self.informar(resultado)
+                if not options['continuo']:
+                    return
+                time.sleep(options['espera'])
+        except KeyboardInterrupt:
+            self.stdout.write('Despachador detenido.')
+
+    def informar(self, resultado):
+        self.stdout.write(
+            f"Enviadas: {resultado['enviadas']}, fallidas: {resultado['fallidas']}, "
+            f"lotes: {resultado['lotes']}, {resultado['segundos']} s ({resultado['por_segundo']}/s)"
+        )
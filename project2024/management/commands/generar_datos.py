@@ -0,0 +1,244 @@
+import datetime
+import random
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from project2024 import busqueda
+from project2024.models import (
+    Credencial, Curso, Docente, Estudiante, HistorialPago, IngresoDiario, Inscripcion, Notificacion, Pago,
+    TerminoBusqueda, Usuario, ajustar_inscritos,
+)
+
+
+# Contraseña de todos los usuarios generados
+PASSWORD = 'clave123'
+
+
+class Command(BaseCommand):
+    """
+    Genera datos sintéticos con volúmenes parecidos a producción: docentes, estudiantes,
+    cursos, inscripciones (sin pasar de la capacidad de cada curso), pagos con su historial y
+    notificaciones. Todo se inserta con `bulk_create` por lotes; los contadores Curso.inscritos,
+    el resumen IngresoDiario y los índices Credencial y TerminoBusqueda se actualizan al final. Los usuarios generados usan la contraseña `clave123`.
+    """
+    help = 'Genera datos sintéticos a escala de producción.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--estudiantes', type=int, default=5000)
+        parser.add_argument('--docentes', type=int, default=100)
+        parser.add_argument('--cursos', type=int, default=400)
+        parser.add_argument('--inscripciones-por-estudiante', type=int, default=3)
+        parser.add_argument('--pagos-por-inscripcion', type=int, default=3)
+        parser.add_argument('--notificaciones-por-estudiante', type=int, default=2)
+        parser.add_argument('--semilla', type=int, default=2024, help='Semilla para repetir los mismos datos.')
+        parser.add_argument('--lote', type=int, default=1000, help='Filas por INSERT.')
+
+    def handle(self, *args, **options):
+        self.azar = random.Random(options['semilla'])
+        self.lote = options['lote']
+        # Prefijo único por ejecución para no chocar con cédulas, correos y códigos existentes
+        self.prefijo = f'S{timezone.now():%y%m%d%H%M%S}'
+
+        with transaction.atomic():
+            docentes = self._crear_usuarios(Docente, options['docentes'], self._datos_docente)
+            estudiantes = self._crear_usuarios(Estudiante, options['estudiantes'], self._datos_estudiante)
+            cursos = self._crear_cursos(options['cursos'], docentes)
+            inscripciones = self._crear_inscripciones(estudiantes, cursos, options['inscripciones_por_estudiante'])
+            pagos = self._crear_pagos(inscripciones, cursos, options['pagos_por_inscripcion'])
+            historial = self._crear_historial(pagos)
+            notificaciones = self._crear_notificaciones(estudiantes, options['notificaciones_por_estudiante'])
+
+        for nombre, cantidad in (
+            ('docentes', len(docentes)), ('estudiantes', len(estudiantes)), ('cursos', len(cursos)),
+            ('inscripciones', len(inscripciones)), ('pagos', len(pagos)), ('historial de pagos', historial),
+            ('notificaciones', notificaciones),
+        ):
+            self.stdout.write(f'{nombre}: {cantidad}')
+        self.stdout.write(self.style.SUCCESS('Datos sintéticos generados.'))
+
+    def _crear_usuarios(self, modelo, cantidad, datos_hijo):
+        """
+        bulk_create no admite herencia multitabla: se insertan primero las filas de Usuario y
+        luego las del modelo hijo con un INSERT por lote sobre su tabla.
+        """
+        rol = modelo._meta.model_name
+        usuarios = [
+            Usuario(
+                nombre_completo=f'{rol.capitalize()} {self.prefijo}-{n}',
+                cedula=f'{self.prefijo}{rol[0].upper()}{n}',
+                correo=f'{rol}.{self.prefijo.lower()}.{n}@example.com',
+                celular=f'809{self.azar.randint(1000000, 9999999)}',
+                password=PASSWORD,
+            )
+            for n in range(cantidad)
+        ]
+        ultimo_id = self._ultimo_id(Usuario)
+        Usuario.objects.bulk_create(usuarios, batch_size=self.lote)
+        # MySQL no devuelve los ids de bulk_create, así que se leen de vuelta por cédula
+        ids = dict(Usuario.objects.filter(id__gt=ultimo_id).values_list('cedula', 'id'))
+
+        filas = [dict(datos_hijo(n), usuario_ptr_id=ids[u.cedula]) for n, u in enumerate(usuarios)]
+        self._insertar(modelo, filas)
+
+        campo_login = Credencial.CAMPOS_LOGIN[rol]
+        password_hash = Credencial.hashear(PASSWORD)  # Un solo hash: todos comparten la contraseña
+        Credencial.objects.bulk_create([
+            Credencial(
+                clave=Credencial.construir_clave(rol, fila[campo_login]),
+                usuario_id=fila['usuario_ptr_id'], rol=rol, password_hash=password_hash,
+            )
+            for fila in filas
+        ], batch_size=self.lote)
+        self._indexar('usuario', Usuario.objects.filter(id__gt=ultimo_id))
+        return [fila['usuario_ptr_id'] for fila in filas]
+
+    def _insertar(self, modelo, filas):
+        if not filas:
+            return
+        columnas = list(filas[0])
+        tabla = connection.ops.quote_name(modelo._meta.db_table)
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            tabla, ', '.join(connection.ops.quote_name(c) for c in columnas), ', '.join(['%s'] * len(columnas))
+        )
+        with connection.cursor() as cursor:
+            for inicio in range(0, len(filas), self.lote):
+                cursor.executemany(sql, [[fila[c] for c in columnas] for fila in filas[inicio:inicio + self.lote]])
+
+    def _datos_docente(self, n):
+        return {
+            'especialidad': self.azar.choice(['Matemáticas', 'Programación', 'Contabilidad', 'Derecho', 'Idiomas']),
+            'fecha_contratacion': datetime.date(2010, 1, 1) + datetime.timedelta(days=self.azar.randint(0, 5000)),
+            'facultad': self.azar.choice(['Ciencias', 'Ingeniería', 'Humanidades', 'Negocios']),
+            'escuela': self.azar.choice(['Escuela A', 'Escuela B', 'Escuela C']),
+            'campus': self.azar.choice(['Central', 'Norte', 'Este']),
+            'codigo_doc': f'{self.prefijo}D{n}',
+            'estatus': 'activo',
+            'codigo': self.azar.choice(['invitado', 'oficial']),
+        }
+
+    def _datos_estudiante(self, n):
+        return {'matricula': f'{self.prefijo}M{n}', 'fecha_registro': timezone.now()}
+
+    def _crear_cursos(self, cantidad, docentes):
+        hoy = timezone.localdate()
+        cursos = []
+        for n in range(cantidad):
+            inicio = hoy + datetime.timedelta(days=self.azar.randint(-180, 90))
+            cursos.append(Curso(
+                nombre=f'Curso {self.prefijo}-{n}',
+                descripcion=f'Curso sintético número {n}',
+                tipo=self.azar.choice(['curso', 'diplomado']),
+                tarifa=Decimal(self.azar.randrange(5000, 50000, 500)) / 100,
+                estado=self.azar.choice(['activo', 'activo', 'inactivo']),
+                fecha_inicio=inicio,
+                fecha_fin=inicio + datetime.timedelta(days=self.azar.randint(30, 180)),
+                capacidad=self.azar.randint(20, 60),
+                docente_id_id=self.azar.choice(docentes) if docentes else None,
+                modulos=self.azar.randint(1, 12),
+                horas=self.azar.randint(10, 200),
+                codigo=f'{self.prefijo}C{n}',
+                profesor='Sintético',
+                facultad=self.azar.choice(['Ciencias', 'Ingeniería', 'Humanidades', 'Negocios']),
+                telefono='8090000000',
+            ))
+        ultimo_id = self._ultimo_id(Curso)
+        Curso.objects.bulk_create(cursos, batch_size=self.lote)
+        self._indexar('curso', Curso.objects.filter(id__gt=ultimo_id))
+        return list(Curso.objects.filter(id__gt=ultimo_id).values_list('id', 'tarifa', 'capacidad'))
+
+    def _crear_inscripciones(self, estudiantes, cursos, por_estudiante):
+        # Cada estudiante elige entre los cursos que aún tienen plazas; un curso lleno sale de la lista
+        plazas = {curso_id: capacidad for curso_id, _, capacidad in cursos}
+        libres = [curso_id for curso_id, capacidad in plazas.items() if capacidad > 0]
+        inscripciones = []
+        for estudiante_id in estudiantes:
+            for curso_id in self.azar.sample(libres, min(por_estudiante, len(libres))):
+                inscripciones.append(Inscripcion(
+                    estudiante_id=estudiante_id, curso_id=curso_id,
+                    estado=self.azar.choice(['inscrito', 'inscrito', 'inscrito', 'pendiente']),
+                ))
+                plazas[curso_id] -= 1
+                if not plazas[curso_id]:
+                    libres.remove(curso_id)
+        ultimo_id = self._ultimo_id(Inscripcion)
+        Inscripcion.objects.bulk_create(inscripciones, batch_size=self.lote)
+
+        # bulk_create no pasa por Inscripcion.save: el contador se ajusta en una sola sentencia
+        deltas = {}
+        for inscripcion in inscripciones:
+            deltas[inscripcion.curso_id] = deltas.get(inscripcion.curso_id, 0) + 1
+        ajustar_inscritos(deltas)
+        generadas = Inscripcion.objects.filter(id__gt=ultimo_id)
+        self._repartir_fechas(generadas, 'fecha_inscripcion')
+        return list(generadas.values_list('id', 'curso_id'))
+
+    def _crear_pagos(self, inscripciones, cursos, por_inscripcion):
+        tarifas = {curso_id: tarifa for curso_id, tarifa, _ in cursos}
+        hoy = timezone.localdate()
+        pagos = []
+        for inscripcion_id, curso_id in inscripciones:
+            cuota = (tarifas[curso_id] / por_inscripcion).quantize(Decimal('0.01'))
+            for _ in range(por_inscripcion):
+                pagos.append(Pago(
+                    inscripcion_id=inscripcion_id,
+                    metodo_pago=self.azar.choice(['transferencia', 'Paypal', 'manual']),
+                    monto=cuota,
+                    estado_pago=self.azar.choice(['completado', 'completado', 'pendiente', 'parcial']),
+                    fecha_vencimiento=hoy + datetime.timedelta(days=self.azar.randint(-120, 60)),
+                ))
+        ultimo_id = self._ultimo_id(Pago)
+        Pago.objects.bulk_create(pagos, batch_size=self.lote)
+        generados = Pago.objects.filter(id__gt=ultimo_id)
+        self._repartir_fechas(generados, 'fecha_pago')
+        # bulk_create y el reparto de fechas no pasan por Pago.save: se recalcula el último año del resumen
+        IngresoDiario.reconstruir(desde=hoy - datetime.timedelta(days=366), lote=self.lote)
+        return list(generados.values_list('id', 'estado_pago'))
+
+    def _crear_historial(self, pagos):
+        anteriores = {'completado': 'pendiente', 'parcial': 'pendiente', 'pendiente': 'parcial'}
+        historial = [
+            HistorialPago(pago_id=pago_id, estado_pago_anterior=anteriores[estado], estado_pago_nuevo=estado,
+                          comentario='Cambio generado')
+            for pago_id, estado in pagos
+            if self.azar.random() < 0.5
+        ]
+        HistorialPago.objects.bulk_create(historial, batch_size=self.lote)
+        return len(historial)
+
+    def _crear_notificaciones(self, estudiantes, por_estudiante):
+        notificaciones = [
+            Notificacion(
+                usuario_id=estudiante_id,
+                tipo_notificacion=self.azar.choice(['recordatorio_pago', 'ingreso_registrado']),
+                mensaje='Notificación generada',
+                estado=self.azar.choice(['enviado', 'pendiente']),
+            )
+            for estudiante_id in estudiantes
+            for _ in range(por_estudiante)
+        ]
+        Notificacion.objects.bulk_create(notificaciones, batch_size=self.lote)
+        return len(notificaciones)
+
+    def _indexar(self, tipo, queryset):
+        # bulk_create no emite señales: los términos de búsqueda se generan aquí por lotes
+        objetos = list(queryset.only(*busqueda.CAMPOS[tipo]).order_by('pk'))
+        for inicio in range(0, len(objetos), self.lote):
+            TerminoBusqueda.indexar(tipo, objetos[inicio:inicio + self.lote], batch_size=self.lote)
+
+    def _repartir_fechas(self, queryset, campo, dias=365, tramos=24):
+        """
+        Los campos auto_now_add reciben la hora actual en bulk_create; se reparten en el último
+        año con una sentencia UPDATE por tramo según el id de cada fila.
+        """
+        ahora = timezone.now()
+        for tramo in range(tramos):
+            fecha = ahora - datetime.timedelta(days=dias * tramo / tramos)
+            queryset.annotate(tramo_fecha=F('id') % tramos).filter(tramo_fecha=tramo).update(**{campo: fecha})
+
+    def _ultimo_id(self, modelo):
+        # Las filas nuevas son las de id mayor a este, sin listas IN de miles de ids
+        return modelo.objects.aggregate(ultimo=Max('id'))['ultimo'] or 0
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from project2024.models import Curso, TerminoBusqueda, Usuario
+from project2024 import busqueda
+
+
+class Command(BaseCommand):
+    """
+    Reconstruye el índice de búsqueda (TerminoBusqueda) de cursos y usuarios. Sirve después de
+    cargas con bulk_create o cambios con QuerySet.update, que no pasan por las señales.
+    """
+    help = 'Reconstruye el índice de búsqueda de cursos y usuarios.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Objetos por lote.')
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        for tipo, modelo in (('curso', Curso), ('usuario', Usuario)):
+            total = 0
+            with transaction.atomic():
+                TerminoBusqueda.objects.filter(tipo=tipo).delete()
+                objetos = modelo.objects.only(*busqueda.CAMPOS[tipo]).order_by('pk').iterator(chunk_size=lote)
+                pendientes = []
+                for objeto in objetos:
+                    pendientes.append(objeto)
+                    if len(pendientes) == lote:
+                        TerminoBusqueda.indexar(tipo, pendientes)
+                        total += len(pendientes)
+                        pendientes = []
+                TerminoBusqueda.indexar(tipo, pendientes)
+                total += len(pendientes)
+            self.stdout.write(f'{tipo}: {total} indexados')
+        self.stdout.write(self.style.SUCCESS('Índice de búsqueda reconstruido.'))
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from project2024.models import Administrativo, Credencial, Docente, Estudiante
+
+
+class Command(BaseCommand):
+    """
+    Llena la tabla Credencial a partir de los estudiantes, docentes y administrativos. Se ejecuta
+    después de migrar (la migración 0009 crea la tabla vacía) y sirve también para corregir el
+    índice después de cambios que no pasan por save() (QuerySet.update, cargas directas).
+
+    Recorre los usuarios por lotes de `--lote`, cada uno en su propia transacción, así que no
+    bloquea la tabla durante todo el recorrido y lo ya indexado queda disponible para iniciar
+    sesión. Por defecto solo calcula el hash de los usuarios sin credencial o cuyo identificador
+    cambió; con `--todas` lo recalcula para todos (por ejemplo, tras cambiar contraseñas con
+    QuerySet.update).
+    """
+    help = 'Indexa por lotes las credenciales de inicio de sesión.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help='Usuarios por transacción.')
+        parser.add_argument('--todas', action='store_true', help='Recalcular también las credenciales existentes.')
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote debe ser mayor que cero.')
+        total = 0
+        for modelo in (Administrativo, Estudiante, Docente):
+            rol = modelo._meta.model_name
+            campo = Credencial.CAMPOS_LOGIN[rol]
+            ultimo = 0
+            while True:
+                usuarios = list(
+                    modelo.objects.filter(pk__gt=ultimo).order_by('pk')
+                    .values_list('pk', campo, 'password')[:options['lote']]
+                )
+                if not usuarios:
+                    break
+                ultimo = usuarios[-1][0]
+                total += self._indexar(rol, usuarios, options['todas'])
+        self.stdout.write(self.style.SUCCESS(f'Credenciales indexadas: {total}'))
+
+    def _indexar(self, rol, usuarios, todas):
+        with transaction.atomic():
+            claves = {pk: Credencial.construir_clave(rol, identificador) for pk, identificador, _ in usuarios}
+            if not todas:
+                vigentes = set(
+                    Credencial.objects.filter(usuario_id__in=claves, rol=rol).values_list('usuario_id', 'clave')
+                )
+                usuarios = [fila for fila in usuarios if (fila[0], claves[fila[0]]) not in vigentes]
+            if not usuarios:
+                return 0
+            nuevas = {claves[pk] for pk, _, _ in usuarios}
+            Credencial.objects.filter(
+                Q(usuario_id__in=[pk for pk, _, _ in usuarios], rol=rol) | Q(clave__in=nuevas)
+            ).delete()
+            return len(Credencial.objects.bulk_create([
+                Credencial(clave=claves[pk], usuario_id=pk, rol=rol, password_hash=Credencial.hashear(password))
+                for pk, _, password in usuarios
+            ]))
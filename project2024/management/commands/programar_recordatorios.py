@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from project2024 import notificaciones
+from project2024.models import MarcaRecordatorio
+
+
+class Command(BaseCommand):
+    """
+    Crea los recordatorios de pago de los pagos que entraron en los horizontes configurados
+    (RECORDATORIOS_DIAS_ANTES). Está pensado para correr una vez al día (cron o el programador
+    de la plataforma); el despachador de notificaciones se encarga de enviarlos. Cada corrida
+    continúa desde la marca que dejó la anterior, sin volver a recorrer toda la tabla de pagos.
+    """
+    help = 'Crea los recordatorios de pago por vencimiento.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hoy', help='Fecha de referencia (AAAA-MM-DD); por defecto la fecha actual.')
+        parser.add_argument('--dias', help='Horizontes separados por coma, por ejemplo 7,3,1.')
+        parser.add_argument('--lote', type=int, default=1000, help='Pagos leídos e insertados por bloque.')
+        parser.add_argument(
+            '--reiniciar', action='store_true',
+            help='Borra las marcas y revisa de nuevo los horizontes completos (no duplica recordatorios).',
+        )
+
+    def handle(self, *args, **options):
+        hoy = None
+        if options['hoy']:
+            hoy = parse_date(options['hoy'])
+            if hoy is None:
+                raise CommandError('--hoy debe tener el formato AAAA-MM-DD.')
+        horizontes = None
+        if options['dias']:
+            try:
+                horizontes = [int(dias) for dias in options['dias'].split(',')]
+            except ValueError:
+                raise CommandError('--dias debe ser una lista de enteros separados por coma.')
+
+        if options['reiniciar']:
+            MarcaRecordatorio.objects.all().delete()
+
+        creados = notificaciones.programar_recordatorios(hoy, horizontes, options['lote'])
+        for dias, cantidad in creados.items():
+            self.stdout.write(f'A {dias} días del vencimiento: {cantidad} recordatorios')
+        self.stdout.write(self.style.SUCCESS(f'Recordatorios creados: {sum(creados.values())}'))
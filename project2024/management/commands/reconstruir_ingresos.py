@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from project2024.models import IngresoDiario
+
+
+class Command(BaseCommand):
+    """
+    Recalcula el resumen IngresoDiario a partir de la tabla de pagos. La migración que crea el
+    resumen ya lo llena; este comando solo hace falta si se escribieron pagos sin pasar por el
+    modelo (QuerySet.update, cargas por SQL): los pagos nuevos y los cambios de estado lo
+    mantienen al día por sí solos. Con --desde/--hasta solo se rehacen esos días.
+    """
+    help = 'Recalcula el resumen diario de ingresos por curso, método y estado de pago.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help='Primer día a recalcular (AAAA-MM-DD).')
+        parser.add_argument('--hasta', help='Último día a recalcular (AAAA-MM-DD).')
+        parser.add_argument('--lote', type=int, default=1000, help='Filas por INSERT.')
+
+    def handle(self, *args, **options):
+        fechas = {}
+        for nombre in ('desde', 'hasta'):
+            fechas[nombre] = None
+            if options[nombre]:
+                fechas[nombre] = parse_date(options[nombre])
+                if fechas[nombre] is None:
+                    raise CommandError(f'--{nombre} debe tener el formato AAAA-MM-DD.')
+
+        inicio = time.monotonic()
+        filas = IngresoDiario.reconstruir(fechas['desde'], fechas['hasta'], options['lote'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Resumen de ingresos recalculado: {filas} filas en {time.monotonic() - inicio:.2f} s'
+        ))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from project2024 import cache as catalogo_cache
+from project2024.models import Curso, Inscripcion
+
+
+class Command(BaseCommand):
+    """
+    Recalcula el contador Curso.inscritos a partir de las inscripciones reales (las que están
+    en lista de espera no ocupan cupo). Corrige
+    cualquier desviación (por ejemplo, cambios hechos con QuerySet.update o bulk_create)
+    con una sola sentencia UPDATE con subconsulta, sin recorrer los cursos en Python. Después de
+    corregir invalida el catálogo en caché, que muestra Curso.inscritos (con la caché en memoria
+    local solo alcanza a este proceso; ver CACHES en settings.py).
+    """
+    help = 'Recalcula el contador de inscritos de todos los cursos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Solo informa cuántos cursos tienen el contador desviado, sin corregirlos.',
+        )
+
+    def handle(self, *args, **options):
+        total_real = Coalesce(Subquery(
+            Inscripcion.objects.filter(curso=OuterRef('pk')).exclude(estado='espera').order_by().values('curso').annotate(
+                total=Count('id')
+            ).values('total')
+        ), 0)
+
+        desviados = Curso.objects.annotate(total_real=total_real).exclude(inscritos=F('total_real')).count()
+        if options['dry_run'] or not desviados:
+            self.stdout.write(f'Cursos con contador desviado: {desviados}')
+            return
+
+        Curso.objects.update(inscritos=total_real)
+        catalogo_cache.invalidar()
+        self.stdout.write(self.style.SUCCESS(f'Contador corregido en {desviados} cursos.'))
@@ -0,0 +1,120 @@
+"""
+Métricas por ruta en formato de texto de Prometheus.
+
+`MetricasMiddleware` mide en cada petición la latencia, la cantidad de consultas SQL y el
+tiempo total en la base de datos (con `connection.execute_wrapper`) y los acumula en
+histogramas etiquetados por ruta y método. La vista `metricas` los expone en `/metrics`.
+Los valores viven en la memoria del proceso: con varios workers cada uno publica los suyos.
+"""
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+
+from . import cache as catalogo_cache
+
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (1, 2, 3, 5, 10, 20, 50, 100, 200)
+BUCKETS_TIEMPO_DB = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histograma:
+    def __init__(self, nombre, ayuda, buckets):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.buckets = buckets
+        self.series = {}  # etiquetas -> [conteos por bucket, suma, total]
+        self.lock = threading.Lock()
+
+    def observar(self, etiquetas, valor):
+        with self.lock:
+            conteos, suma, total = self.series.get(etiquetas) or ([0] * len(self.buckets), 0.0, 0)
+            conteos = [c + 1 if valor <= limite else c for c, limite in zip(conteos, self.buckets)]
+            self.series[etiquetas] = (conteos, suma + valor, total + 1)
+
+    def exponer(self):
+        lineas = [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} histogram']
+        with self.lock:
+            series = sorted(self.series.items())
+        for etiquetas, (conteos, suma, total) in series:
+            base = ','.join(f'{clave}="{_escapar(valor)}"' for clave, valor in etiquetas)
+            for limite, conteo in zip(self.buckets, conteos):
+                lineas.append(f'{self.nombre}_bucket{{{base},le="{limite}"}} {conteo}')
+            lineas.append(f'{self.nombre}_bucket{{{base},le="+Inf"}} {total}')
+            lineas.append(f'{self.nombre}_sum{{{base}}} {suma}')
+            lineas.append(f'{self.nombre}_count{{{base}}} {total}')
+        return lineas
+
+    def reiniciar(self):
+        with self.lock:
+            self.series.clear()
+
+
+LATENCIA = Histograma('http_request_duration_seconds', 'Latencia de las peticiones HTTP.', BUCKETS_LATENCIA)
+CONSULTAS = Histograma('http_request_db_queries', 'Consultas SQL ejecutadas por petición.', BUCKETS_CONSULTAS)
+TIEMPO_DB = Histograma('http_request_db_duration_seconds', 'Tiempo en la base de datos por petición.', BUCKETS_TIEMPO_DB)
+HISTOGRAMAS = (LATENCIA, CONSULTAS, TIEMPO_DB)
+
+
+class _ContadorSQL:
+    def __init__(self):
+        self.consultas = 0
+        self.segundos = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.segundos += time.perf_counter() - inicio
+            self.consultas += 1
+
+
+class MetricasMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        contador = _ContadorSQL()
+        inicio = time.perf_counter()
+        with ExitStack() as pila:
+            for alias in connections:
+                pila.enter_context(connections[alias].execute_wrapper(contador))
+            response = self.get_response(request)
+        duracion = time.perf_counter() - inicio
+
+        match = request.resolver_match
+        etiquetas = (('method', request.method), ('route', match.route if match else 'sin_ruta'))
+        LATENCIA.observar(etiquetas, duracion)
+        CONSULTAS.observar(etiquetas, contador.consultas)
+        TIEMPO_DB.observar(etiquetas, contador.segundos)
+
+        if getattr(settings, 'METRICAS_CABECERAS_DB', False):
+            response['X-DB-Queries'] = str(contador.consultas)
+            response['X-DB-Time'] = f'{contador.segundos * 1000:.2f}ms'
+        return response
+
+
+def metricas(request):
+    lineas = []
+    for histograma in HISTOGRAMAS:
+        lineas.extend(histograma.exponer())
+
+    estadisticas = catalogo_cache.estadisticas()
+    lineas += [
+        '# HELP catalogo_cache_hits_total Aciertos de la caché del catálogo de cursos.',
+        '# TYPE catalogo_cache_hits_total counter',
+        f'catalogo_cache_hits_total {estadisticas["aciertos"]}',
+        '# HELP catalogo_cache_misses_total Fallos de la caché del catálogo de cursos.',
+        '# TYPE catalogo_cache_misses_total counter',
+        f'catalogo_cache_misses_total {estadisticas["fallos"]}',
+    ]
+    return HttpResponse('\n'.join(lineas) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
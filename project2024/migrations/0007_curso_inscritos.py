@@ -0,0 +1,30 @@
+# Generated by Django 5.1 on 2026-10-18 19:09
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def contar_inscritos(apps, schema_editor):
+    Curso = apps.get_model('project2024', 'Curso')
+    Inscripcion = apps.get_model('project2024', 'Inscripcion')
+    total = Inscripcion.objects.filter(curso=OuterRef('pk')).order_by().values('curso').annotate(
+        total=Count('id')
+    ).values('total')
+    Curso.objects.update(inscritos=Coalesce(Subquery(total), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project2024', '0006_administrativo_codigo_adm_docente_codigo_doc'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='curso',
+            name='inscritos',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(contar_inscritos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-18 19:11
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project2024', '0007_curso_inscritos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reporte',
+            name='fecha_desde',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reporte',
+            name='fecha_hasta',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reporte',
+            name='resultado',
+            field=models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True),
+        ),
+        migrations.AlterField(
+            model_name='reporte',
+            name='descripcion',
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1 on 2026-10-18 19:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project2024', '0008_reporte_resultado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Credencial',
+            fields=[
+                ('clave', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('rol', models.CharField(choices=[('administrativo', 'Administrativo'), ('estudiante', 'Estudiante'), ('docente', 'Docente')], max_length=15)),
+                ('password_hash', models.CharField(max_length=255)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='project2024.usuario')),
+            ],
+        ),
+        # Las credenciales de los usuarios existentes no se calculan aquí: hashear a cada usuario
+        # dentro de la migración la volvería lenta y bloqueante. Después de migrar se ejecuta
+        # `manage.py indexar_credenciales`, que las crea por lotes
+    ]
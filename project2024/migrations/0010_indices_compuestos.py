@@ -0,0 +1,33 @@
+# Generated by Django 5.1 on 2026-10-18 19:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project2024', '0009_credencial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='historialpago',
+            index=models.Index(fields=['pago', '-fecha_cambio', '-id'], name='historial_pago_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['usuario', 'estado'], name='notif_usuario_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pago',
+            index=models.Index(fields=['inscripcion', 'estado_pago'], name='pago_inscripcion_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pago',
+            index=models.Index(fields=['estado_pago', 'fecha_vencimiento'], name='pago_estado_vencimiento_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pago',
+            index=models.Index(fields=['estado_pago', 'fecha_pago'], name='pago_estado_fecha_idx'),
+        ),
+    ]
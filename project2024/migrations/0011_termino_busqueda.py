@@ -0,0 +1,79 @@
+# Generated by Django 5.1 on 2026-10-18 19:32
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+# Copia del tokenizador de project2024/busqueda.py tal como era al crear el índice: la migración
+# no debe cambiar si el módulo cambia o se mueve después
+LONGITUD_MINIMA = 2
+LONGITUD_MAXIMA = 20
+CAMPOS = {
+    'curso': {'nombre': 3, 'codigo': 3, 'descripcion': 1},
+    'usuario': {'nombre_completo': 3, 'cedula': 3, 'correo': 2},
+}
+CAMPOS_COMPACTOS = {'codigo', 'cedula'}
+SEPARADORES = re.compile(r'[\W_]+')
+
+
+def palabras(texto):
+    texto = unicodedata.normalize('NFKD', str(texto or '').lower())
+    texto = ''.join(caracter for caracter in texto if not unicodedata.combining(caracter))
+    return [palabra[:LONGITUD_MAXIMA] for palabra in SEPARADORES.split(texto) if palabra]
+
+
+def terminos(tipo, objeto):
+    resultado = {}
+    for campo, peso in CAMPOS[tipo].items():
+        lista = palabras(getattr(objeto, campo))
+        if campo in CAMPOS_COMPACTOS and len(lista) > 1:
+            lista.append(''.join(lista)[:LONGITUD_MAXIMA])
+        for palabra in lista:
+            for longitud in range(LONGITUD_MINIMA, len(palabra) + 1):
+                termino = palabra[:longitud]
+                puntos = peso * 2 if longitud == len(palabra) else peso
+                resultado[termino] = max(resultado.get(termino, 0), puntos)
+    return resultado
+
+
+def indexar(apps, schema_editor):
+    TerminoBusqueda = apps.get_model('project2024', 'TerminoBusqueda')
+    for tipo, modelo in (('curso', 'Curso'), ('usuario', 'Usuario')):
+        objetos = apps.get_model('project2024', modelo).objects.only(*CAMPOS[tipo]).order_by('pk')
+        lote = []
+        for objeto in objetos.iterator(chunk_size=1000):
+            lote.extend(
+                TerminoBusqueda(tipo=tipo, termino=termino, objeto_id=objeto.pk, peso=peso)
+                for termino, peso in terminos(tipo, objeto).items()
+            )
+            if len(lote) >= 5000:
+                TerminoBusqueda.objects.bulk_create(lote, batch_size=1000)
+                lote = []
+        TerminoBusqueda.objects.bulk_create(lote, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project2024', '0010_indices_compuestos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TerminoBusqueda',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('curso', 'Curso'), ('usuario', 'Usuario')], max_length=10)),
+                ('termino', models.CharField(max_length=20)),
+                ('objeto_id', models.BigIntegerField()),
+                ('peso', models.PositiveSmallIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tipo', 'termino', '-peso', 'objeto_id'], name='termino_busqueda_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'objeto_id', 'termino'), name='termino_busqueda_unico')],
+            },
+        ),
+        migrations.RunPython(indexar, migrations.RunPython.noop),
+    ]
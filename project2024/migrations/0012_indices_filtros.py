@@ -0,0 +1,37 @@
+# Generated by Django 5.1 on 2026-10-18 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project2024', '0011_termino_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='docente',
+            index=models.Index(fields=['campus', 'facultad'], name='docente_campus_facultad_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historialpago',
+            index=models.Index(fields=['fecha_cambio'], name='historial_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscripcion',
+            index=models.Index(fields=['fecha_inscripcion'], name='inscripcion_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['estado', 'tipo_notificacion'], name='notif_estado_tipo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pago',
+            index=models.Index(fields=['fecha_pago'], name='pago_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reembolso',
+            index=models.Index(fields=['estado', 'fecha_solicitud'], name='reembolso_estado_fecha_idx'),
+        ),
+    ]
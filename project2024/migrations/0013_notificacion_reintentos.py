@@ -0,0 +1,38 @@
+# Generated by Django 5.1 on 2026-10-18 19:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project2024', '0012_indices_filtros'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificacion',
+            name='intentos',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='notificacion',
+            name='proximo_intento',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='notificacion',
+            name='ultimo_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AlterField(
+            model_name='notificacion',
+            name='estado',
+            field=models.CharField(choices=[('enviado', 'Enviado'), ('pendiente', 'Pendiente'), ('fallido', 'Fallido')], default='pendiente', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['estado', 'proximo_intento'], name='notif_estado_intento_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1 on 2026-10-18 19:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project2024', '0013_notificacion_reintentos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarcaRecordatorio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dias_antes', models.PositiveSmallIntegerField(unique=True)),
+                ('hasta', models.DateField()),
+                ('ultimo_pago_id', models.BigIntegerField(default=0)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='notificacion',
+            name='dias_antes',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notificacion',
+            name='pago',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='project2024.pago'),
+        ),
+        migrations.AddConstraint(
+            model_name='notificacion',
+            constraint=models.UniqueConstraint(fields=('pago', 'dias_antes'), name='notif_recordatorio_unico'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 19:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project2024', '0014_recordatorios_pago'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inscripcion',
+            name='estado',
+            field=models.CharField(choices=[('inscrito', 'Inscrito'), ('pendiente', 'Pendiente'), ('espera', 'Lista de espera')], max_length=10),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1 on 2026-10-18 20:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+
+def resumir_pagos(apps, schema_editor):
+    Pago = apps.get_model('project2024', 'Pago')
+    IngresoDiario = apps.get_model('project2024', 'IngresoDiario')
+    filas = (
+        Pago.objects.annotate(dia=TruncDate('fecha_pago'))
+        .values('dia', 'metodo_pago', 'estado_pago', curso=F('inscripcion__curso_id'))
+        .annotate(suma=Sum('monto'), filas=Count('id'))
+        .order_by()
+    )
+    IngresoDiario.objects.bulk_create([
+        IngresoDiario(curso_id=fila['curso'], fecha=fila['dia'], metodo_pago=fila['metodo_pago'],
+                      estado_pago=fila['estado_pago'], total=fila['suma'], cantidad=fila['filas'])
+        for fila in filas
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project2024', '0015_inscripcion_lista_espera'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngresoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('metodo_pago', models.CharField(choices=[('transferencia', 'Transferencia'), ('Paypal', 'Paypal'), ('manual', 'Manual')], max_length=15)),
+                ('estado_pago', models.CharField(choices=[('completado', 'Completado'), ('pendiente', 'Pendiente'), ('parcial', 'Parcial')], max_length=15)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cantidad', models.IntegerField(default=0)),
+                ('curso', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='project2024.curso')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado_pago', 'fecha'], name='ingreso_estado_fecha_idx')],
+                'constraints': [models.UniqueConstraint(fields=('curso', 'fecha', 'metodo_pago', 'estado_pago'), name='ingreso_diario_unico')],
+            },
+        ),
+        migrations.RunPython(resumir_pagos, migrations.RunPython.noop),
+    ]
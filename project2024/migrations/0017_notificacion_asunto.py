@@ -0,0 +1,45 @@
+# Generated by Django 5.1 on 2026-10-18 20:16
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def activar_cursos_pendientes(apps, schema_editor):
+    # Hasta ahora la activación ocurría al consultar los cursos del docente: se ponen al día los
+    # cursos que ya pasaron el 50% y se deja su aviso pendiente para el despachador
+    Curso = apps.get_model('project2024', 'Curso')
+    Notificacion = apps.get_model('project2024', 'Notificacion')
+    cursos = list(
+        Curso.objects.filter(estado='inactivo', capacidad__gt=0)
+        .alias(ocupacion=F('inscritos') * 100).filter(ocupacion__gte=F('capacidad') * 50)
+        .values_list('pk', 'nombre', 'inscritos', 'docente_id_id')
+    )
+    Curso.objects.filter(pk__in=[pk for pk, _, _, _ in cursos]).update(estado='activo')
+    Notificacion.objects.bulk_create([
+        Notificacion(
+            usuario_id=docente_id, tipo_notificacion='curso_activado', asunto=f'Curso {nombre} listo para pagos',
+            mensaje=f'El curso {nombre} ha alcanzado el 50% de su capacidad. Cantidad de inscritos: {inscritos}.',
+        )
+        for _, nombre, inscritos, docente_id in cursos if docente_id
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project2024', '0016_ingreso_diario'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificacion',
+            name='asunto',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='notificacion',
+            name='tipo_notificacion',
+            field=models.CharField(choices=[('recordatorio_pago', 'Recordatorio de Pago'), ('ingreso_registrado', 'Ingreso Registrado'), ('curso_activado', 'Curso Activado')], max_length=25),
+        ),
+        migrations.RunPython(activar_cursos_pendientes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1 on 2026-10-18 22:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project2024', '0017_notificacion_asunto'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pago',
+            name='fecha_modificacion',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RemoveField(
+            model_name='marcarecordatorio',
+            name='ultimo_pago_id',
+        ),
+        # Sin marca de tiempo, la próxima corrida relee completo el tramo ya revisado
+        migrations.AddField(
+            model_name='marcarecordatorio',
+            name='revisado',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
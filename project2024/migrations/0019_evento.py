@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-18 21:01
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project2024', '0018_pago_fecha_modificacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Evento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=20)),
+                ('accion', models.CharField(max_length=15)),
+                ('estudiante_id', models.IntegerField(null=True)),
+                ('curso_id', models.IntegerField(null=True)),
+                ('datos', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['fecha'], name='evento_fecha_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,335 @@
+import csv
+import datetime
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router, transaction
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .filtros import inicio_del_dia
+from .forma import SerializerDinamico, parsear_forma
+from .models import EstadoDesactualizado, TransicionInvalida
+
+
+class _RelacionPrecargada(serializers.PrimaryKeyRelatedField):
+    """
+    Campo de relación que resuelve el ID desde un diccionario precargado en lugar de hacer
+    un `queryset.get(pk=...)` por cada fila del lote.
+    """
+    def __init__(self, objetos, **kwargs):
+        self.objetos = objetos
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return self.objetos[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class BulkCreateUpdateMixin:
+    """
+    Agrega al ViewSet el endpoint `bulk/`, que recibe una lista de objetos:
+
+    - POST crea todas las filas con `bulk_create`.
+    - PATCH actualiza parcialmente las filas indicadas por `id` con `bulk_update`.
+
+    Todo el lote se valida antes de escribir; las llaves foráneas se comprueban con una sola
+    consulta por modelo relacionado. Si alguna fila es inválida no se escribe nada y se
+    devuelven los errores de cada fila con su índice. La escritura ocurre en una transacción.
+    """
+    bulk_max_filas = 10000
+    bulk_batch_size = 500
+    # Llave foránea por la que se releen los ids del lote cuando la base no los devuelve tras
+    # bulk_create (MySQL); sin ella los objetos creados quedan sin id
+    bulk_clave_padre = None
+
+    @action(detail=False, methods=['post', 'patch'], url_path='bulk')
+    def bulk(self, request):
+        filas = request.data
+        if not isinstance(filas, list) or not filas:
+            return Response({'error': 'Se esperaba una lista de objetos.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(filas) > self.bulk_max_filas:
+            return Response(
+                {'error': f'El lote no puede tener más de {self.bulk_max_filas} filas.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        parcial = request.method == 'PATCH'
+        plantilla = self.get_bulk_serializer(filas, partial=parcial)
+        modelo = plantilla.Meta.model
+
+        instancias, pks = {}, []
+        if parcial:
+            # Los ids pueden llegar como texto ("12"): se convierten con el campo pk antes de buscarlos
+            pks = [self._pk_de_fila(modelo, fila) for fila in filas]
+            instancias = self.get_queryset().in_bulk({pk for pk in pks if pk is not None})
+
+        errores = []
+        validados = []
+        for indice, fila in enumerate(filas):
+            if not isinstance(fila, dict):
+                errores.append({'indice': indice, 'errores': {'non_field_errors': ['Se esperaba un objeto.']}})
+                continue
+            pk = pks[indice] if parcial else None
+            if parcial and pk not in instancias:
+                errores.append({'indice': indice, 'errores': {'id': ['No existe un registro con este id.']}})
+                continue
+            try:
+                datos = plantilla.run_validation(fila)
+                if parcial:
+                    self.validar_bulk_update(instancias[pk], datos)
+                validados.append((pk, datos))
+            except serializers.ValidationError as exc:
+                errores.append({'indice': indice, 'errores': exc.detail})
+
+        if errores:
+            return Response({'errores': errores}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            if parcial:
+                objetos = []
+                campos = set()
+                for pk, datos in validados:
+                    instancia = instancias[pk]
+                    for campo, valor in datos.items():
+                        setattr(instancia, campo, valor)
+                    campos.update(datos)
+                    objetos.append(instancia)
+                self.perform_bulk_update(objetos, sorted(campos))
+                return Response({'actualizados': len(objetos)}, status=status.HTTP_200_OK)
+
+            objetos = [modelo(**datos) for _, datos in validados]
+            self.perform_bulk_create(objetos)
+            return Response({'creados': len(objetos)}, status=status.HTTP_201_CREATED)
+
+    def get_bulk_serializer(self, filas, partial=False):
+        """
+        Devuelve un serializer "plantilla" con sus campos de relación precargados en una
+        consulta por modelo relacionado, listo para validar cada fila con `run_validation`.
+        """
+        plantilla = self.get_serializer(partial=partial)
+        for nombre, campo in list(plantilla.fields.items()):
+            if campo.read_only or not isinstance(campo, serializers.PrimaryKeyRelatedField):
+                continue
+            pks = set()
+            for fila in filas:
+                valor = fila.get(nombre) if isinstance(fila, dict) else None
+                try:
+                    pks.add(int(valor))
+                except (TypeError, ValueError):
+                    pass
+            plantilla.fields[nombre] = _RelacionPrecargada(
+                campo.get_queryset().in_bulk(pks),
+                queryset=campo.get_queryset(),
+                required=campo.required,
+                allow_null=campo.allow_null,
+                source=campo.source if campo.source != nombre else None,
+            )
+        return plantilla
+
+    @staticmethod
+    def _pk_de_fila(modelo, fila):
+        """El `id` de la fila convertido al tipo de la llave primaria, o None si no es válido."""
+        if not isinstance(fila, dict) or isinstance(fila.get('id'), bool):
+            return None
+        try:
+            return modelo._meta.pk.to_python(fila.get('id'))
+        except DjangoValidationError:
+            return None
+
+    def validar_bulk_update(self, instancia, datos):
+        """
+        Validación adicional de una fila del PATCH contra la instancia que actualiza (por ejemplo,
+        que el cambio de estado esté permitido). Lanza serializers.ValidationError si no procede.
+        """
+
+    def perform_bulk_create(self, objetos):
+        modelo = type(objetos[0])
+        padre = modelo._meta.get_field(self.bulk_clave_padre) if self.bulk_clave_padre else None
+        if padre is None or connections[router.db_for_write(modelo)].features.can_return_rows_from_bulk_insert:
+            modelo.objects.bulk_create(objetos, batch_size=self.bulk_batch_size)
+            return
+        # MySQL no devuelve los ids de un INSERT de varias filas. Con las filas padre bloqueadas nadie
+        # más les inserta hijos hasta el COMMIT: sus hijos más nuevos son los de este lote, con ids
+        # crecientes en el orden en que se insertaron
+        padres = {getattr(objeto, padre.attname) for objeto in objetos}
+        list(padre.related_model.objects.select_for_update().filter(pk__in=padres).order_by('pk').values_list('pk'))
+        modelo.objects.bulk_create(objetos, batch_size=self.bulk_batch_size)
+        ids = modelo.objects.filter(**{f'{padre.attname}__in': padres}).order_by('-pk').values_list('pk', flat=True)
+        for objeto, pk in zip(objetos, sorted(ids[:len(objetos)])):
+            objeto.pk = pk
+
+    def perform_bulk_update(self, objetos, campos):
+        if campos:
+            modelo = type(objetos[0])
+            # bulk_update no llama a pre_save: los campos auto_now se rellenan aquí
+            automaticos = [campo for campo in modelo._meta.concrete_fields if getattr(campo, 'auto_now', False)]
+            for objeto in objetos:
+                for campo in automaticos:
+                    campo.pre_save(objeto, add=False)
+            campos = [*campos, *(campo.name for campo in automaticos if campo.name not in campos)]
+            modelo.objects.bulk_update(objetos, campos, batch_size=self.bulk_batch_size)
+
+
+class EstadosPagoMixin:
+    """
+    Responde a los errores de la máquina de estados de Pago en cualquier escritura de la vista
+    (PUT/PATCH, bulk/, acciones): 409 si el pago ya no estaba en el estado esperado y 400 si la
+    transición no está permitida.
+    """
+    def handle_exception(self, exc):
+        if isinstance(exc, EstadoDesactualizado):
+            return Response({'error': str(exc)}, status=status.HTTP_409_CONFLICT)
+        if isinstance(exc, TransicionInvalida):
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return super().handle_exception(exc)
+
+
+class _Eco:
+    """Objeto tipo archivo que devuelve lo que se le escribe, para que csv.writer genere líneas."""
+    def write(self, valor):
+        return valor
+
+
+class ExportMixin:
+    """
+    Agrega al ViewSet el endpoint `export/`, que devuelve la tabla completa en CSV
+    (`?formato=csv`, por defecto) o NDJSON (`?formato=ndjson`) mediante un
+    `StreamingHttpResponse`. Las filas se leen con `values_list()` por lotes de
+    `export_chunk_size`, cada uno con `pk > <última del lote anterior>` sobre la clave primaria,
+    sin instanciar modelos ni armar la lista completa en memoria (en MySQL `iterator()` no usa
+    cursores del lado del servidor y el driver cargaría todo el resultado).
+
+    Filtros: `desde` y `hasta` (AAAA-MM-DD, inclusivos) sobre `export_campo_fecha`, y los
+    parámetros declarados en `export_filtros` (nombre del parámetro -> lookup del ORM).
+    """
+    export_campos = []
+    export_campo_fecha = None
+    export_filtros = {}
+    export_chunk_size = 2000
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        formato = request.query_params.get('formato', 'csv')
+        if formato not in ('csv', 'ndjson'):
+            return Response({'error': 'formato debe ser csv o ndjson.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            queryset = self.filtrar_export(self.get_queryset().model.objects.all(), request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        filas = self._filas_por_lotes(queryset)
+        nombre = self.get_queryset().model._meta.model_name
+        if formato == 'csv':
+            respuesta = StreamingHttpResponse(self._lineas_csv(filas), content_type='text/csv')
+            respuesta['Content-Disposition'] = f'attachment; filename="{nombre}.csv"'
+        else:
+            respuesta = StreamingHttpResponse(self._lineas_ndjson(filas), content_type='application/x-ndjson')
+            respuesta['Content-Disposition'] = f'attachment; filename="{nombre}.ndjson"'
+        return respuesta
+
+    def filtrar_export(self, queryset, params):
+        if self.export_campo_fecha:
+            desde = self._fecha_param(params, 'desde')
+            hasta = self._fecha_param(params, 'hasta')
+            # Rango semiabierto sobre el valor de la columna para que pueda usar un índice
+            if desde:
+                queryset = queryset.filter(**{f'{self.export_campo_fecha}__gte': inicio_del_dia(desde)})
+            if hasta:
+                queryset = queryset.filter(
+                    **{f'{self.export_campo_fecha}__lt': inicio_del_dia(hasta + datetime.timedelta(days=1))}
+                )
+        for parametro, lookup in self.export_filtros.items():
+            valor = params.get(parametro)
+            if valor:
+                queryset = queryset.filter(**{lookup: valor})
+        return queryset
+
+    def _filas_por_lotes(self, queryset):
+        ultimo = None
+        while True:
+            lote = queryset.order_by('pk') if ultimo is None else queryset.filter(pk__gt=ultimo).order_by('pk')
+            lote = list(lote.values_list('pk', *self.export_campos)[:self.export_chunk_size])
+            for fila in lote:
+                yield fila[1:]
+            if len(lote) < self.export_chunk_size:
+                return
+            ultimo = lote[-1][0]
+
+    def _fecha_param(self, params, nombre):
+        valor = params.get(nombre)
+        if not valor:
+            return None
+        fecha = parse_date(valor)
+        if fecha is None:
+            raise ValueError(f'{nombre} debe tener el formato AAAA-MM-DD.')
+        return fecha
+
+    def _lineas_csv(self, filas):
+        escritor = csv.writer(_Eco())
+        yield escritor.writerow(self.export_campos)
+        for fila in filas:
+            yield escritor.writerow(fila)
+
+    def _lineas_ndjson(self, filas):
+        for fila in filas:
+            yield json.dumps(dict(zip(self.export_campos, fila)), cls=DjangoJSONEncoder) + '\n'
+
+
+class FormaDinamicaMixin:
+    """
+    Atiende `?fields=` y `?expand=` en el listado y el detalle (ver forma.py): el serializer
+    recibe la forma pedida y la consulta se limita con `only()` y se une con
+    `select_related`/`prefetch_related` según los campos que ese serializer va a leer.
+    Las escrituras y las acciones propias del ViewSet no cambian.
+    """
+    forma_acciones = ('list', 'retrieve')
+
+    def forma_solicitada(self):
+        if self.request is None or self.request.method not in ('GET', 'HEAD') or self.action not in self.forma_acciones:
+            return None
+        if not hasattr(self, '_forma'):
+            parametros = self.request.query_params
+            self._forma = parsear_forma(parametros.get('fields'), parametros.get('expand'))
+        return self._forma
+
+    def get_serializer(self, *args, **kwargs):
+        forma = self.forma_solicitada()
+        if forma is not None and issubclass(self.get_serializer_class(), SerializerDinamico):
+            kwargs.setdefault('forma', forma)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        forma = self.forma_solicitada()
+        clase = self.get_serializer_class()
+        if forma is None or not issubclass(clase, SerializerDinamico):
+            return queryset
+        return clase(forma=forma, context=self.get_serializer_context()).preparar_consulta(queryset)
+
+
+class ListaCompactaMixin(FormaDinamicaMixin):
+    """
+    En el listado (`list`) usa `serializer_lista_class`, y la consulta queda limitada con
+    `only()` a los campos de ese serializer, para no transferir ni serializar columnas que los
+    directorios no muestran. El detalle y las escrituras siguen usando el serializer completo,
+    igual que el listado cuando el cliente elige los campos con `?fields=`.
+    """
+    serializer_lista_class = None
+
+    def get_serializer_class(self):
+        if (self.action == 'list' and self.serializer_lista_class is not None
+                and 'fields' not in self.request.query_params):
+            return self.serializer_lista_class
+        return super().get_serializer_class()
@@ -1,6 +1,19 @@
-from django.db import models
+import datetime
+import threading
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models, router, transaction
 from django.dispatch import receiver
-from django.db.models.signals import pre_save
+from django.db.models import Case, Count, Exists, F, OuterRef, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.utils import timezone
+
+from . import busqueda
+from . import eventos
+from . import cache as catalogo_cache
 
 # Tabla Usuarios: almacena información básica de los usuarios del sistema
 class Usuario(models.Model):
@@ -22,6 +35,13 @@ class Usuario(models.Model):
     class Meta:
         unique_together = (('cedula', 'correo'),)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Recordar la contraseña cargada para no volver a calcular su hash si no cambia
+        instance._password_original = instance.__dict__.get('password')
+        return instance
+
     def __str__(self):
         return self.nombre_completo
 
@@ -59,6 +79,12 @@ class Docente(Usuario):
     ]
     codigo = models.CharField(max_length=10, choices=CODIGO_CHOICES)
 
+    class Meta:
+        indexes = [
+            # Filtros del listado de docentes por campus y facultad
+            models.Index(fields=['campus', 'facultad'], name='docente_campus_facultad_idx'),
+        ]
+
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
@@ -79,6 +105,95 @@ class Administrativo(Usuario):
 
 
 
+
+
+
+# Tabla Credenciales: índice de inicio de sesión. Cada fila se busca por su llave primaria
+# "<rol>:<identificador>" y guarda el hash de la contraseña del usuario
+class Credencial(models.Model):
+    ROL_CHOICES = [
+        ('administrativo', 'Administrativo'),
+        ('estudiante', 'Estudiante'),
+        ('docente', 'Docente'),
+    ]
+    # Campo que identifica a cada rol al iniciar sesión
+    CAMPOS_LOGIN = {
+        'administrativo': 'codigo_adm',
+        'estudiante': 'matricula',
+        'docente': 'codigo_doc',
+    }
+
+    clave = models.CharField(max_length=40, primary_key=True)
+    usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE)
+    rol = models.CharField(max_length=15, choices=ROL_CHOICES)
+    password_hash = models.CharField(max_length=255)
+
+    @staticmethod
+    def construir_clave(rol, identificador):
+        return f'{rol}:{identificador}'
+
+    @staticmethod
+    def iteraciones():
+        return getattr(settings, 'CREDENCIALES_ITERACIONES', 100_000)
+
+    @classmethod
+    def hashear(cls, password):
+        """
+        Hash PBKDF2-SHA256 con CREDENCIALES_ITERACIONES iteraciones, independiente de
+        PASSWORD_HASHERS: el factor de trabajo fija el costo de cada inicio de sesión (ver settings.py).
+        """
+        hasher = PBKDF2PasswordHasher()
+        return hasher.encode(password, hasher.salt(), cls.iteraciones())
+
+    def verificar(self, password):
+        """
+        Comprueba la contraseña contra el hash. Los hashes con otro algoritmo o factor de trabajo
+        (por ejemplo, creados antes de fijar CREDENCIALES_ITERACIONES) se rehacen tras un acceso correcto.
+        """
+        hasher = PBKDF2PasswordHasher()
+        if self.password_hash.startswith(f'{hasher.algorithm}$'):
+            valida = hasher.verify(password, self.password_hash)
+            vigente = hasher.decode(self.password_hash)['iterations'] == self.iteraciones()
+        else:
+            valida, vigente = check_password(password, self.password_hash), False
+        if valida and not vigente:
+            self.password_hash = self.hashear(password)
+            Credencial.objects.filter(pk=self.pk).update(password_hash=self.password_hash)
+        return valida
+
+    def __str__(self):
+        return self.clave
+
+
+# Mantiene la credencial al día cada vez que se guarda un estudiante, docente o administrativo.
+# El hash solo se calcula si la contraseña cambió (o si al usuario le falta la credencial); si solo
+# cambió el identificador, la fila se renombra y conserva su hash. Para cambios hechos con
+# QuerySet.update existe el comando indexar_credenciales
+@receiver(post_save, sender=Administrativo)
+@receiver(post_save, sender=Estudiante)
+@receiver(post_save, sender=Docente)
+def indexar_credencial(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    rol = sender._meta.model_name
+    clave = Credencial.construir_clave(rol, getattr(instance, Credencial.CAMPOS_LOGIN[rol]))
+    anteriores = Credencial.objects.filter(usuario=instance, rol=rol).exclude(clave=clave)
+
+    password_cambiada = created or instance.password != getattr(instance, '_password_original', None)
+    if password_cambiada:
+        anteriores.delete()
+        Credencial.objects.update_or_create(
+            clave=clave,
+            defaults={'usuario': instance, 'rol': rol, 'password_hash': Credencial.hashear(instance.password)},
+        )
+    elif not anteriores.update(clave=clave) and not Credencial.objects.filter(clave=clave).exists():
+        Credencial.objects.create(
+            clave=clave, usuario=instance, rol=rol, password_hash=Credencial.hashear(instance.password),
+        )
+    instance._password_original = instance.password
+
+
+
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
@@ -101,6 +216,7 @@ class Curso(models.Model):
     fecha_inicio = models.DateField()
     fecha_fin = models.DateField()
     capacidad = models.IntegerField(default=0)
+    inscritos = models.IntegerField(default=0, editable=False)  # Contador mantenido por Inscripcion; ver recontar_inscritos
     docente_id = models.ForeignKey(Docente, on_delete=models.SET_NULL, null=True)
     modulos = models.IntegerField()
     horas = models.IntegerField()
@@ -110,16 +226,44 @@ class Curso(models.Model):
     telefono = models.CharField(max_length=15)
     imagen_url = models.URLField(blank=True, null=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._estado_original = instance.__dict__.get('estado')
+        return instance
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Una edición (PUT/PATCH, admin) no reescribe lo que cambia con UPDATE mientras tanto:
+            # el contador inscritos nunca, y el estado solo si se modificó (activar_cursos lo cambia)
+            excluidos = {'inscritos'} | self.get_deferred_fields()
+            if self.estado == getattr(self, '_estado_original', None):
+                excluidos.add('estado')
+            kwargs['update_fields'] = [
+                campo.attname for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.attname not in excluidos
+            ]
+        super().save(*args, **kwargs)
+        self._estado_original = self.estado
+
 
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
+class CursoLleno(Exception):
+    """No quedan cupos en los cursos indicados para las inscripciones pedidas."""
+    def __init__(self, cursos):
+        self.cursos = cursos
+        super().__init__('El curso no tiene cupos disponibles.')
+
+
 # Tabla Inscripciones: almacena las inscripciones de los estudiantes en los cursos
 class Inscripcion(models.Model):
     ESTADO_CHOICES = [
         ('inscrito', 'Inscrito'),
         ('pendiente', 'Pendiente'),
+        ('espera', 'Lista de espera'),  # Sin cupo: no cuenta en Curso.inscritos
     ]
     
     estudiante = models.ForeignKey(Estudiante, on_delete=models.CASCADE)
@@ -127,14 +271,188 @@ class Inscripcion(models.Model):
     fecha_inscripcion = models.DateTimeField(auto_now_add=True)
     estado = models.CharField(max_length=10, choices=ESTADO_CHOICES)
 
+    class Meta:
+        indexes = [
+            # Rango de fechas del listado y de la exportación (?desde=&hasta=)
+            models.Index(fields=['fecha_inscripcion'], name='inscripcion_fecha_idx'),
+        ]
+
+    @property
+    def ocupa_cupo(self):
+        return self.estado != 'espera'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Recordar el curso y si ocupaba cupo para detectar los cambios al guardar
+        instance._curso_id_original = instance.__dict__.get('curso_id')
+        instance._ocupaba_cupo = instance.__dict__.get('estado') != 'espera'
+        return instance
+
+    def save(self, *args, **kwargs):
+        # La inscripción y el ajuste del contador Curso.inscritos se confirman juntos. El cupo
+        # se toma con reservar_cupos: si el curso está lleno se lanza CursoLleno y no se guarda nada
+        with transaction.atomic(using=kwargs.get('using')):
+            if self._state.adding:
+                curso_anterior_id, ocupaba = None, False
+            else:
+                curso_anterior_id = getattr(self, '_curso_id_original', None)
+                ocupaba = getattr(self, '_ocupaba_cupo', True)
+            conserva = ocupaba and self.ocupa_cupo and curso_anterior_id == self.curso_id
+            if self.ocupa_cupo and not conserva:
+                reservar_cupos({self.curso_id: 1})
+            super().save(*args, **kwargs)
+            if ocupaba and curso_anterior_id is not None and not conserva:
+                liberar_cupos({curso_anterior_id: 1}, excluir=[self.pk])
+            if curso_anterior_id is not None and curso_anterior_id != self.curso_id:
+                IngresoDiario.trasladar({self.pk: curso_anterior_id})
+        self._curso_id_original = self.curso_id
+        self._ocupaba_cupo = self.ocupa_cupo
+
      # Método para obtener el nombre del curso
     def __str__(self):
         return f"{self.estudiante} inscrito en {self.curso.nombre}"
 
 
+def ajustar_inscritos(deltas):
+    """
+    Aplica en una sola sentencia UPDATE los cambios netos `{curso_id: delta}` al contador
+    Curso.inscritos. Lo usan las escrituras masivas, que no pasan por Inscripcion.save.
+    """
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    Curso.objects.filter(pk__in=deltas).update(inscritos=F('inscritos') + Case(
+        *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+        default=Value(0),
+    ))
+    # UPDATE no emite señales, así que el catálogo se invalida aquí
+    catalogo_cache.invalidar()
+
+
+def reservar_cupos(cupos):
+    """
+    Ocupa `{curso_id: cantidad}` cupos con un UPDATE por curso condicionado a la capacidad
+    (`inscritos + cantidad <= capacidad`; una capacidad de 0 o menos no limita). La condición y
+    el incremento van en la misma sentencia, sin leer ni bloquear antes la fila del curso, así
+    que dos inscripciones simultáneas nunca toman el mismo último cupo. Si algún curso no tiene
+    cupo lanza CursoLleno: debe llamarse dentro de una transacción para deshacer los demás.
+    """
+    llenos = []
+    for curso_id, cantidad in cupos.items():
+        if cantidad <= 0:
+            continue
+        con_cupo = Q(capacidad__lte=0) | Q(inscritos__lte=F('capacidad') - cantidad)
+        if not Curso.objects.filter(con_cupo, pk=curso_id).update(inscritos=F('inscritos') + cantidad):
+            llenos.append(curso_id)
+    if llenos:
+        raise CursoLleno(llenos)
+    activar_cursos([curso_id for curso_id, cantidad in cupos.items() if cantidad > 0])
+    catalogo_cache.invalidar()
+
+
+# Ocupación (en %) con la que un curso inactivo se activa y se avisa a su docente
+PORCENTAJE_ACTIVACION = 50
+
+
+def cursos_por_activar():
+    """Cursos inactivos que ya llegaron a PORCENTAJE_ACTIVACION de su capacidad."""
+    return (
+        Curso.objects.filter(estado='inactivo', capacidad__gt=0)
+        .alias(ocupacion=F('inscritos') * 100)
+        .filter(ocupacion__gte=F('capacidad') * PORCENTAJE_ACTIVACION)
+    )
+
+
+def activar_cursos(curso_ids):
+    """
+    Activa los cursos inactivos de `curso_ids` que llegaron a PORCENTAJE_ACTIVACION de su capacidad
+    y deja el aviso al docente como Notificacion pendiente, en la misma transacción que la
+    inscripción: el correo lo envía después despachar_notificaciones, fuera de la petición. La
+    activación es un UPDATE condicionado a estado='inactivo', así que si dos inscripciones cruzan
+    el umbral a la vez solo una activa el curso y se crea un solo aviso. Devuelve la cantidad de
+    cursos activados.
+    """
+    candidatos = cursos_por_activar().filter(pk__in=curso_ids).values_list('pk', 'nombre', 'inscritos', 'docente_id_id')
+    activados = 0
+    avisos = []
+    for pk, nombre, inscritos, docente_id in candidatos:
+        if not Curso.objects.filter(pk=pk, estado='inactivo').update(estado='activo'):
+            continue
+        activados += 1
+        if docente_id:
+            avisos.append(Notificacion(
+                usuario_id=docente_id,
+                tipo_notificacion='curso_activado',
+                asunto=f'Curso {nombre} listo para pagos',
+                mensaje=f'El curso {nombre} ha alcanzado el {PORCENTAJE_ACTIVACION}% de su capacidad. '
+                        f'Cantidad de inscritos: {inscritos}.',
+            ))
+    Notificacion.objects.bulk_create(avisos)
+    return activados
+
+
+def liberar_cupos(cupos, excluir=()):
+    """
+    Devuelve `{curso_id: cantidad}` cupos al curso y con ellos inscribe a los primeros de la
+    lista de espera, salvo las inscripciones `excluir` (las que acaban de pasar a espera).
+    """
+    ajustar_inscritos({curso_id: -cantidad for curso_id, cantidad in cupos.items()})
+    promover_lista_espera(cupos, excluir)
+
+
+def promover_lista_espera(cupos, excluir=()):
+    """
+    Inscribe hasta `cantidad` inscripciones en espera de cada curso, por orden de llegada, en
+    la medida en que reservar_cupos encuentre cupo (otra inscripción pudo tomarlo antes).
+    """
+    for curso_id, cantidad in cupos.items():
+        en_espera = Inscripcion.objects.filter(curso_id=curso_id, estado='espera').exclude(pk__in=excluir)
+        en_espera = en_espera.order_by('fecha_inscripcion', 'id')
+        for pk, estudiante_id in en_espera.values_list('pk', 'estudiante_id')[:cantidad]:
+            try:
+                with transaction.atomic():
+                    reservar_cupos({curso_id: 1})
+                    if not Inscripcion.objects.filter(pk=pk, estado='espera').update(estado='inscrito'):
+                        raise CursoLleno([curso_id])  # Ya no estaba en espera: se devuelve el cupo
+            except CursoLleno:
+                break
+            eventos.publicar([('inscripcion', 'actualizado', {'id': pk, 'estado': 'inscrito'}, estudiante_id, curso_id)])
+
+
+# Descuenta la inscripción del curso y cede el cupo al primero de la lista de espera; se
+# ejecuta dentro de la transacción del borrado tanto para instance.delete() como para
+# QuerySet.delete() y borrados en cascada. Las inscripciones en lista de espera no ocupaban cupo
+@receiver(post_delete, sender=Inscripcion)
+def descontar_inscrito(sender, instance, using, **kwargs):
+    if instance.ocupa_cupo:
+        Curso.objects.using(using).filter(pk=instance.curso_id).update(inscritos=F('inscritos') - 1)
+        promover_lista_espera({instance.curso_id: 1})
+
+
+# Cualquier cambio en cursos o inscripciones (que alteran Curso.inscritos) invalida el catálogo en caché,
+# y también en docentes: las páginas con ?expand=docente_id los incluyen
+@receiver(post_save, sender=Curso)
+@receiver(post_delete, sender=Curso)
+@receiver(post_save, sender=Inscripcion)
+@receiver(post_delete, sender=Inscripcion)
+@receiver(post_save, sender=Docente)
+@receiver(post_delete, sender=Docente)
+def invalidar_catalogo(sender, **kwargs):
+    catalogo_cache.invalidar()
+
+
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
+class TransicionInvalida(ValueError):
+    """El cambio de estado de pago no está permitido por Pago.TRANSICIONES."""
+
+
+class EstadoDesactualizado(TransicionInvalida):
+    """El pago ya no estaba en el estado esperado: otro proceso lo cambió antes."""
+
+
 # Tabla Pagos: almacena información sobre los pagos realizados por los estudiantes
 class Pago(models.Model):
     METODO_CHOICES = [
@@ -154,7 +472,118 @@ class Pago(models.Model):
     estado_pago = models.CharField(max_length=15, choices=ESTADO_CHOICES)
     fecha_pago = models.DateTimeField(auto_now_add=True)
     fecha_vencimiento = models.DateField(null=True, blank=True)
+    fecha_modificacion = models.DateTimeField(auto_now=True)  # Los recordatorios revisan lo modificado desde su marca
+
+    class Meta:
+        indexes = [
+            # Pagos de una inscripción filtrados por estado (verificación del estudiante)
+            models.Index(fields=['inscripcion', 'estado_pago'], name='pago_inscripcion_estado_idx'),
+            # Pendientes por vencimiento (reporte de pendientes, recordatorios de pago)
+            models.Index(fields=['estado_pago', 'fecha_vencimiento'], name='pago_estado_vencimiento_idx'),
+            # Pagos cobrados por rango de fecha de pago
+            models.Index(fields=['estado_pago', 'fecha_pago'], name='pago_estado_fecha_idx'),
+            # Rango de fechas sin filtro de estado (listado y exportación)
+            models.Index(fields=['fecha_pago'], name='pago_fecha_idx'),
+        ]
+
+    # Cambios de estado permitidos; un pago completado ya no cambia de estado
+    TRANSICIONES = {
+        'pendiente': {'parcial', 'completado'},
+        'parcial': {'completado'},
+        'completado': set(),
+    }
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Recordar el estado cargado para validar la transición al actualizar
+        instance._estado_pago_original = instance.__dict__.get('estado_pago')
+        instance._aporte_original = instance._aporte()
+        return instance
+
+    def _aporte(self):
+        # Campos que deciden la fila y el monto del pago en el resumen IngresoDiario
+        return tuple(self.__dict__.get(campo) for campo in ('inscripcion_id', 'fecha_pago', 'metodo_pago', 'estado_pago', 'monto'))
+
+    def save(self, *args, **kwargs):
+        if kwargs.get('update_fields') is not None:
+            # auto_now solo se escribe si está entre los campos a guardar
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'fecha_modificacion'}
+        if not self._state.adding and self._aporte() == getattr(self, '_aporte_original', None):
+            # Nada de lo que suma al resumen cambió desde que se leyó (p. ej. solo el vencimiento)
+            super().save(*args, **kwargs)
+            return
+        # El resumen IngresoDiario se ajusta en la misma transacción que el pago
+        with transaction.atomic(using=kwargs.get('using')):
+            antes = {} if self._state.adding else IngresoDiario.aportes(Pago.objects.filter(pk=self.pk))
+            super().save(*args, **kwargs)
+            IngresoDiario.aplicar(antes, IngresoDiario.aportes(Pago.objects.filter(pk=self.pk)))
+        self._aporte_original = self._aporte()
 
+    @classmethod
+    def validar_transicion(cls, anterior, nuevo):
+        if nuevo not in dict(cls.ESTADO_CHOICES):
+            raise TransicionInvalida(f'Estado de pago desconocido: {nuevo}.')
+        if nuevo not in cls.TRANSICIONES.get(anterior, ()):
+            raise TransicionInvalida(f'No se puede pasar un pago de {anterior} a {nuevo}.')
+
+    @classmethod
+    def cambiar_estado(cls, pk, nuevo, anterior=None, comentario=None):
+        """
+        Pasa el pago `pk` de `anterior` a `nuevo` y devuelve el HistorialPago del cambio. Si no
+        se indica `anterior` se lee el estado actual (solo esa columna).
+        """
+        if anterior is None:
+            anterior = cls.objects.filter(pk=pk).values_list('estado_pago', flat=True).get()
+        return cls.cambiar_estados([(pk, anterior, nuevo)], comentario)[0]
+
+    @classmethod
+    def cambiar_estados(cls, cambios, comentario=None):
+        """
+        Aplica los cambios `[(pk, anterior, nuevo), ...]` en una transacción: un UPDATE ...
+        WHERE estado_pago=<anterior> por cada par (anterior, nuevo) y un INSERT de todo el
+        historial. Si algún pago ya no estaba en el estado esperado (otro cajero lo cambió
+        antes) se lanza EstadoDesactualizado, y Pago.DoesNotExist si alguno no existe; en ambos
+        casos no se aplica ningún cambio. Devuelve los HistorialPago creados, en el orden de
+        `cambios`. El resumen IngresoDiario pasa del estado anterior al nuevo con una sola
+        lectura de los pagos cambiados.
+        """
+        cambios = [(cls._meta.pk.to_python(pk), anterior, nuevo) for pk, anterior, nuevo in cambios]
+        grupos = {}
+        for pk, anterior, nuevo in cambios:
+            cls.validar_transicion(anterior, nuevo)
+            grupos.setdefault((anterior, nuevo), []).append(pk)
+
+        with transaction.atomic():
+            for (anterior, nuevo), pks in grupos.items():
+                actualizados = cls.objects.filter(pk__in=pks, estado_pago=anterior).update(
+                    estado_pago=nuevo, fecha_modificacion=timezone.now(),
+                )
+                if actualizados != len(set(pks)):
+                    if cls.objects.filter(pk__in=pks).count() != len(set(pks)):
+                        raise cls.DoesNotExist('Algún pago no existe.')
+                    raise EstadoDesactualizado(f'Algún pago ya no estaba en estado {anterior}.')
+            despues = IngresoDiario.aportes(cls.objects.filter(pk__in=[pk for pk, _, _ in cambios]))
+            antes = {}
+            for pk, anterior, _ in cambios:
+                (curso_id, fecha, metodo, _), monto = despues[pk]
+                antes[pk] = ((curso_id, fecha, metodo, anterior), monto)
+            IngresoDiario.aplicar(antes, despues)
+            historial = HistorialPago.objects.bulk_create([
+                HistorialPago(pago_id=pk, estado_pago_anterior=anterior, estado_pago_nuevo=nuevo, comentario=comentario)
+                for pk, anterior, nuevo in cambios
+            ])
+            if historial[0].pk is None:
+                # MySQL no devuelve los ids de un INSERT de varias filas. Los pagos siguen bloqueados
+                # por el UPDATE de esta transacción: sus filas de historial más nuevas son estas, con
+                # ids crecientes en el orden en que se insertaron
+                ids = HistorialPago.objects.filter(
+                    pago_id__in=[pk for pk, _, _ in cambios],
+                ).order_by('-pk').values_list('pk', flat=True)[:len(historial)]
+                for cambio, pk in zip(historial, sorted(ids)):
+                    cambio.pk = pk
+            publicar_historial(historial, 'creado', con_pago=True)
+            return historial
 
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
@@ -168,6 +597,297 @@ class HistorialPago(models.Model):
     fecha_cambio = models.DateTimeField(auto_now_add=True)
     comentario = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Último cambio de cada pago leído en orden del índice, sin ordenar en memoria
+            models.Index(fields=['pago', '-fecha_cambio', '-id'], name='historial_pago_fecha_idx'),
+            models.Index(fields=['fecha_cambio'], name='historial_fecha_idx'),
+        ]
+
+
+""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+
+# Tabla Ingresos Diarios: resumen de los pagos por curso, día, método y estado, mantenido al escribir
+# los pagos para que los reportes lean unas cuantas filas en vez de recorrer toda la tabla Pago
+class IngresoDiario(models.Model):
+    curso = models.ForeignKey(Curso, on_delete=models.CASCADE)
+    fecha = models.DateField()  # Día de Pago.fecha_pago en la zona horaria local
+    metodo_pago = models.CharField(max_length=15, choices=Pago.METODO_CHOICES)
+    estado_pago = models.CharField(max_length=15, choices=Pago.ESTADO_CHOICES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cantidad = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['curso', 'fecha', 'metodo_pago', 'estado_pago'], name='ingreso_diario_unico'),
+        ]
+        indexes = [
+            # Rango de días por estado (reporte de ingresos)
+            models.Index(fields=['estado_pago', 'fecha'], name='ingreso_estado_fecha_idx'),
+        ]
+
+    @staticmethod
+    def clave(curso_id, fecha_pago, metodo_pago, estado_pago):
+        return (curso_id, timezone.localdate(fecha_pago), metodo_pago, estado_pago)
+
+    @classmethod
+    def aportes(cls, pagos):
+        """Lee de la base de datos `{pago_id: (clave, monto)}` de los pagos de la consulta `pagos`."""
+        filas = pagos.order_by().values_list(
+            'id', 'inscripcion__curso_id', 'fecha_pago', 'metodo_pago', 'estado_pago', 'monto',
+        )
+        return {pk: (cls.clave(curso_id, fecha, metodo, estado), monto) for pk, curso_id, fecha, metodo, estado, monto in filas}
+
+    @classmethod
+    def aportes_de(cls, pagos):
+        """Como aportes(), a partir de instancias de Pago (con una consulta para sus cursos)."""
+        cursos = dict(
+            Inscripcion.objects.filter(pk__in={pago.inscripcion_id for pago in pagos}).values_list('id', 'curso_id')
+        )
+        return {
+            indice: (cls.clave(cursos[pago.inscripcion_id], pago.fecha_pago, pago.metodo_pago, pago.estado_pago), pago.monto)
+            for indice, pago in enumerate(pagos) if pago.inscripcion_id in cursos
+        }
+
+    @classmethod
+    def aplicar(cls, antes, despues):
+        """Resta del resumen los aportes `antes` y suma los aportes `despues`."""
+        deltas = {}
+        for signo, aportes in ((-1, antes), (1, despues)):
+            for clave, monto in aportes.values():
+                total, cantidad = deltas.get(clave, (0, 0))
+                deltas[clave] = (total + signo * monto, cantidad + signo)
+        cls.acumular({clave: delta for clave, delta in deltas.items() if delta != (0, 0)})
+
+    @classmethod
+    def acumular(cls, deltas, lote=200):
+        """
+        Suma `{(curso_id, fecha, metodo_pago, estado_pago): (total, cantidad)}` al resumen con un
+        upsert por bloque de claves: INSERT de las filas que faltan que, si la fila ya existe, la
+        incrementa (total = total + ...), así que dos transacciones nunca pisan sus sumas. Las
+        claves se escriben ordenadas para que transacciones concurrentes las bloqueen en el mismo
+        orden.
+        """
+        if not deltas:
+            return
+        conexion = connections[router.db_for_write(cls)]
+        campos = [cls._meta.get_field(nombre) for nombre in ('curso', 'fecha', 'metodo_pago', 'estado_pago', 'total', 'cantidad')]
+        tabla = conexion.ops.quote_name(cls._meta.db_table)
+        columnas = [conexion.ops.quote_name(campo.column) for campo in campos]
+        total, cantidad = columnas[-2:]
+        if conexion.vendor != 'mysql':
+            # SQLite y PostgreSQL
+            sufijo = (
+                f'ON CONFLICT ({", ".join(columnas[:4])}) DO UPDATE SET '
+                f'{total} = {tabla}.{total} + EXCLUDED.{total}, {cantidad} = {tabla}.{cantidad} + EXCLUDED.{cantidad}'
+            )
+        elif conexion.mysql_is_mariadb or conexion.mysql_version < (8, 0, 19):
+            sufijo = (
+                f'ON DUPLICATE KEY UPDATE {total} = {total} + VALUES({total}), '
+                f'{cantidad} = {cantidad} + VALUES({cantidad})'
+            )
+        else:
+            sufijo = (
+                f'AS nuevo ON DUPLICATE KEY UPDATE {total} = {tabla}.{total} + nuevo.{total}, '
+                f'{cantidad} = {tabla}.{cantidad} + nuevo.{cantidad}'
+            )
+
+        claves = sorted(deltas)
+        fila = f'({", ".join(["%s"] * len(campos))})'
+        with conexion.cursor() as cursor:
+            for inicio in range(0, len(claves), lote):
+                bloque = claves[inicio:inicio + lote]
+                valores = [
+                    campo.get_db_prep_save(valor, conexion)
+                    for clave in bloque for campo, valor in zip(campos, (*clave, *deltas[clave]))
+                ]
+                cursor.execute(
+                    f'INSERT INTO {tabla} ({", ".join(columnas)}) VALUES {", ".join([fila] * len(bloque))} {sufijo}',
+                    valores,
+                )
+
+    @classmethod
+    def trasladar(cls, cursos_anteriores):
+        """
+        Pasa al curso actual los aportes de los pagos de las inscripciones que cambiaron de curso,
+        dadas como `{inscripcion_id: curso_anterior_id}`.
+        """
+        filas = Pago.objects.filter(inscripcion_id__in=cursos_anteriores).order_by().values_list(
+            'id', 'inscripcion_id', 'inscripcion__curso_id', 'fecha_pago', 'metodo_pago', 'estado_pago', 'monto',
+        )
+        antes, despues = {}, {}
+        for pk, inscripcion_id, curso_id, fecha, metodo, estado, monto in filas:
+            antes[pk] = (cls.clave(cursos_anteriores[inscripcion_id], fecha, metodo, estado), monto)
+            despues[pk] = (cls.clave(curso_id, fecha, metodo, estado), monto)
+        cls.aplicar(antes, despues)
+
+    @classmethod
+    def reconstruir(cls, desde=None, hasta=None, lote=1000):
+        """
+        Recalcula el resumen de los días [desde, hasta] (None = sin límite) a partir de la tabla
+        Pago con una consulta agrupada. Corrige lo que se escribió sin pasar por el modelo
+        (QuerySet.update, cargas masivas). Devuelve la cantidad de filas escritas.
+        """
+        from .filtros import inicio_del_dia  # filtros importa los modelos
+
+        pagos = Pago.objects.all()
+        resumen = cls.objects.all()
+        if desde:
+            pagos = pagos.filter(fecha_pago__gte=inicio_del_dia(desde))
+            resumen = resumen.filter(fecha__gte=desde)
+        if hasta:
+            pagos = pagos.filter(fecha_pago__lt=inicio_del_dia(hasta + datetime.timedelta(days=1)))
+            resumen = resumen.filter(fecha__lte=hasta)
+
+        filas = (
+            pagos.annotate(dia=TruncDate('fecha_pago'))
+            .values('dia', 'metodo_pago', 'estado_pago', curso=F('inscripcion__curso_id'))
+            .annotate(suma=Sum('monto'), filas=Count('id'))
+            .order_by()
+        )
+        with transaction.atomic():
+            resumen.delete()
+            nuevas = [
+                cls(curso_id=fila['curso'], fecha=fila['dia'], metodo_pago=fila['metodo_pago'],
+                    estado_pago=fila['estado_pago'], total=fila['suma'], cantidad=fila['filas'])
+                for fila in filas
+            ]
+            cls.objects.bulk_create(nuevas, batch_size=lote)
+        return len(nuevas)
+
+
+# Cursos que se están borrando, junto al objeto o queryset que inició el borrado (origin). Sus
+# filas del resumen se borran en cascada antes que los pagos, así que descontar_ingreso no debe
+# volver a escribirlas. Ligarlas al origin evita que una marca que quedó de un borrado fallido
+# afecte a borrados posteriores
+_cursos_borrados = threading.local()
+
+
+@receiver(pre_delete, sender=Curso)
+def marcar_curso_borrado(sender, instance, origin=None, **kwargs):
+    marca = getattr(_cursos_borrados, 'marca', None)
+    if marca is None or marca[0] is not origin:
+        _cursos_borrados.marca = marca = (origin, set())
+    marca[1].add(instance.pk)
+
+
+@receiver(post_delete, sender=Curso)
+def desmarcar_curso_borrado(sender, instance, origin=None, **kwargs):
+    marca = getattr(_cursos_borrados, 'marca', None)
+    if marca is not None and marca[0] is origin:
+        marca[1].discard(instance.pk)
+        if not marca[1]:
+            _cursos_borrados.marca = None
+
+
+# Descuenta el pago borrado del resumen de ingresos, también en los borrados en cascada (los pagos
+# se borran antes que su inscripción). Si se borra el curso, sus filas del resumen se van con él
+@receiver(post_delete, sender=Pago)
+def descontar_ingreso(sender, instance, origin=None, **kwargs):
+    aportes = IngresoDiario.aportes_de([instance])
+    marca = getattr(_cursos_borrados, 'marca', None)
+    if marca is not None and marca[0] is origin:
+        aportes = {indice: aporte for indice, aporte in aportes.items() if aporte[0][0] not in marca[1]}
+    IngresoDiario.aplicar(aportes, {})
+
+
+def publicar_inscripciones(inscripciones, accion):
+    """Publica en el stream de eventos el cambio de las inscripciones."""
+    eventos.publicar([
+        ('inscripcion', accion, {'id': inscripcion.pk, 'estado': inscripcion.estado},
+         inscripcion.estudiante_id, inscripcion.curso_id)
+        for inscripcion in inscripciones
+    ])
+
+
+def publicar_pagos(pagos, accion):
+    """
+    Como publicar_inscripciones; el estudiante y el curso se leen de las inscripciones en una
+    consulta, después del commit salvo en los borrados (entonces la inscripción puede no existir ya).
+    """
+    def eventos_de_pagos():
+        inscripciones = {
+            pk: (estudiante_id, curso_id)
+            for pk, estudiante_id, curso_id in Inscripcion.objects.filter(
+                pk__in={pago.inscripcion_id for pago in pagos}
+            ).values_list('pk', 'estudiante_id', 'curso_id')
+        }
+        return [
+            ('pago', accion, {
+                'id': pago.pk, 'inscripcion': pago.inscripcion_id, 'estado_pago': pago.estado_pago,
+                'metodo_pago': pago.metodo_pago, 'monto': pago.monto,
+            }, *inscripciones.get(pago.inscripcion_id, (None, None)))
+            for pago in pagos
+        ]
+    eventos.publicar(eventos_de_pagos() if accion == 'eliminado' else eventos_de_pagos)
+
+
+def publicar_historial(historial, accion, con_pago=False):
+    """
+    Publica los HistorialPago; con `con_pago` (cambios de estado hechos con UPDATE, que no emiten
+    señales) publica además el pago con su estado nuevo. Como en publicar_pagos, los pagos se leen
+    después del commit salvo en los borrados.
+    """
+    def eventos_de_historial():
+        pagos = {
+            pk: (inscripcion_id, estudiante_id, curso_id)
+            for pk, inscripcion_id, estudiante_id, curso_id in Pago.objects.filter(
+                pk__in={cambio.pago_id for cambio in historial}
+            ).values_list('pk', 'inscripcion_id', 'inscripcion__estudiante_id', 'inscripcion__curso_id')
+        }
+        publicados = []
+        for cambio in historial:
+            inscripcion_id, estudiante_id, curso_id = pagos.get(cambio.pago_id, (None, None, None))
+            if con_pago:
+                publicados.append(('pago', 'actualizado', {
+                    'id': cambio.pago_id, 'inscripcion': inscripcion_id, 'estado_pago': cambio.estado_pago_nuevo,
+                }, estudiante_id, curso_id))
+            publicados.append(('historial_pago', accion, {
+                'id': cambio.pk, 'pago': cambio.pago_id, 'estado_pago_anterior': cambio.estado_pago_anterior,
+                'estado_pago_nuevo': cambio.estado_pago_nuevo, 'comentario': cambio.comentario,
+            }, estudiante_id, curso_id))
+        return publicados
+    eventos.publicar(eventos_de_historial() if accion == 'eliminado' else eventos_de_historial)
+
+
+# Cambios guardados o borrados uno a uno, también en cascada (los pagos y su historial se borran
+# antes que la inscripción, así que todavía se encuentran). Las escrituras masivas publican aparte
+@receiver(post_save, sender=Inscripcion)
+@receiver(post_save, sender=Pago)
+@receiver(post_save, sender=HistorialPago)
+def publicar_guardado(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        _PUBLICADORES[sender]([instance], 'creado' if created else 'actualizado')
+
+
+@receiver(post_delete, sender=Inscripcion)
+@receiver(post_delete, sender=Pago)
+@receiver(post_delete, sender=HistorialPago)
+def publicar_borrado(sender, instance, **kwargs):
+    _PUBLICADORES[sender]([instance], 'eliminado')
+
+
+_PUBLICADORES = {Inscripcion: publicar_inscripciones, Pago: publicar_pagos, HistorialPago: publicar_historial}
+
+
+# Tabla Eventos: bandeja de salida del stream SSE /async/eventos/ (ver eventos.py). Cada proceso
+# que sirve conexiones la lee por id creciente; las filas se borran pasados EVENTOS_REANUDAR_SEGUNDOS
+class Evento(models.Model):
+    tipo = models.CharField(max_length=20)  # inscripcion, pago o historial_pago
+    accion = models.CharField(max_length=15)  # creado, actualizado o eliminado
+    # Sin llaves foráneas: el evento de un borrado sobrevive a la fila borrada
+    estudiante_id = models.IntegerField(null=True)
+    curso_id = models.IntegerField(null=True)
+    datos = models.JSONField(encoder=DjangoJSONEncoder)
+    fecha = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Limpieza de los eventos vencidos
+            models.Index(fields=['fecha'], name='evento_fecha_idx'),
+        ]
+
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
@@ -186,7 +906,13 @@ class Reembolso(models.Model):
     estado = models.CharField(max_length=15, choices=ESTADO_CHOICES)
     fecha_solicitud = models.DateTimeField(auto_now_add=True)
     fecha_resolucion = models.DateTimeField(null=True, blank=True)
-    
+
+    class Meta:
+        indexes = [
+            # Solicitudes por estado en un rango de fechas (bandeja de reembolsos)
+            models.Index(fields=['estado', 'fecha_solicitud'], name='reembolso_estado_fecha_idx'),
+        ]
+
     def __str__(self):
         return f'Reembolso {self.id} - {self.estado}'
 
@@ -201,17 +927,43 @@ class Notificacion(models.Model):
     TIPO_CHOICES = [
         ('recordatorio_pago', 'Recordatorio de Pago'),
         ('ingreso_registrado', 'Ingreso Registrado'),
+        ('curso_activado', 'Curso Activado'),
     ]
     tipo_notificacion = models.CharField(max_length=25, choices=TIPO_CHOICES)
+    asunto = models.CharField(max_length=255, blank=True, default='')  # Vacío: el nombre del tipo
     mensaje = models.TextField()
     fecha_envio = models.DateTimeField(auto_now_add=True)
     
     ESTADO_CHOICES = [
         ('enviado', 'Enviado'),
         ('pendiente', 'Pendiente'),
+        ('fallido', 'Fallido'),
     ]
     estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='pendiente')
 
+    # Control de envío (ver notificaciones.py): una notificación pendiente se envía a partir de
+    # `proximo_intento`; cada fallo la reprograma con espera creciente hasta agotar los intentos
+    intentos = models.PositiveSmallIntegerField(default=0)
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    ultimo_error = models.TextField(blank=True, default='')
+
+    # Solo en los recordatorios de pago: el pago y el horizonte (días antes del vencimiento)
+    # que los generó. Las demás notificaciones los dejan en NULL
+    pago = models.ForeignKey('Pago', on_delete=models.CASCADE, null=True, blank=True)
+    dias_antes = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['usuario', 'estado'], name='notif_usuario_estado_idx'),
+            models.Index(fields=['estado', 'tipo_notificacion'], name='notif_estado_tipo_idx'),
+            # Lotes del despachador: pendientes cuyo próximo intento ya venció, en ese orden
+            models.Index(fields=['estado', 'proximo_intento'], name='notif_estado_intento_idx'),
+        ]
+        constraints = [
+            # Un solo recordatorio por pago y horizonte; los NULL de las demás notificaciones no chocan
+            models.UniqueConstraint(fields=['pago', 'dias_antes'], name='notif_recordatorio_unico'),
+        ]
+
     def __str__(self):
         return f'Notificación {self.tipo_notificacion} para {self.usuario.nombre_completo} - {self.estado}'
 
@@ -220,6 +972,21 @@ class Notificacion(models.Model):
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
+# Tabla Marcas de Recordatorios: hasta dónde revisó cada horizonte el programador de
+# recordatorios de pago (ver notificaciones.programar_recordatorios)
+class MarcaRecordatorio(models.Model):
+    dias_antes = models.PositiveSmallIntegerField(unique=True)
+    hasta = models.DateField()  # Vencimientos hasta esta fecha ya revisados
+    revisado = models.DateTimeField(null=True)  # Pagos modificados después se revisan aparte
+    actualizado = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Recordatorios a {self.dias_antes} días revisados hasta {self.hasta}'
+
+
+""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+
 # Tabla Reportes: almacena reportes generados por el sistema
 class Reporte(models.Model):
     TIPO_CHOICES = [
@@ -230,7 +997,131 @@ class Reporte(models.Model):
     
     tipo_reporte = models.CharField(max_length=20, choices=TIPO_CHOICES)
     fecha_generacion = models.DateTimeField(auto_now_add=True)
-    descripcion = models.TextField()
+    descripcion = models.TextField(blank=True)
+    fecha_desde = models.DateField(null=True, blank=True)  # Ventana del reporte; vacía = sin límite
+    fecha_hasta = models.DateField(null=True, blank=True)
+    resultado = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)  # Calculado por project2024.reportes
 
     def __str__(self):
         return f'Reporte de {self.tipo_reporte} - {self.fecha_generacion}'
+
+
+""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+
+# Tabla Términos de Búsqueda: índice invertido de cursos y usuarios. Cada fila dice que el
+# prefijo `termino` aparece en el objeto `objeto_id` del `tipo` indicado (ver busqueda.py)
+class TerminoBusqueda(models.Model):
+    TIPO_CHOICES = [
+        ('curso', 'Curso'),
+        ('usuario', 'Usuario'),
+    ]
+
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES)
+    termino = models.CharField(max_length=busqueda.LONGITUD_MAXIMA)
+    objeto_id = models.BigIntegerField()
+    peso = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            # También sirve para borrar los términos de un objeto y para comprobar si un
+            # objeto contiene un término (intersección de las palabras de una consulta)
+            models.UniqueConstraint(fields=['tipo', 'objeto_id', 'termino'], name='termino_busqueda_unico'),
+        ]
+        indexes = [
+            # Lista de objetos de un término ya ordenada por relevancia
+            models.Index(fields=['tipo', 'termino', '-peso', 'objeto_id'], name='termino_busqueda_idx'),
+        ]
+
+    # Hasta cuántas filas se cuentan para decidir qué palabra de la consulta es más rara
+    TOPE_FRECUENCIA = 1000
+
+    @classmethod
+    def indexar(cls, tipo, objetos, batch_size=1000):
+        """Reemplaza los términos de `objetos` (instancias de Curso o Usuario) en el índice."""
+        objetos = list(objetos)
+        with transaction.atomic():
+            cls.objects.filter(tipo=tipo, objeto_id__in=[objeto.pk for objeto in objetos]).delete()
+            cls.objects.bulk_create([
+                cls(tipo=tipo, termino=termino, objeto_id=objeto.pk, peso=peso)
+                for objeto in objetos
+                for termino, peso in busqueda.terminos(tipo, objeto).items()
+            ], batch_size=batch_size)
+
+    @classmethod
+    def palabras(cls, tipo, consulta):
+        """
+        Palabras de la consulta de la más rara a la más común. Con una sola palabra no se
+        consulta nada; con varias, se cuenta cada lista de objetos hasta TOPE_FRECUENCIA.
+        """
+        palabras = busqueda.palabras_consulta(consulta)
+        if len(palabras) < 2:
+            return palabras
+        frecuencias = {
+            palabra: cls.objects.filter(tipo=tipo, termino=palabra)[:cls.TOPE_FRECUENCIA].count()
+            for palabra in palabras
+        }
+        return sorted(palabras, key=lambda palabra: (frecuencias[palabra], -len(palabra)))
+
+    @classmethod
+    def coincidencias(cls, tipo, consulta, palabras=None):
+        """
+        Subconsulta con los `objeto_id` que contienen todas las palabras de la consulta. Parte
+        de la palabra más rara y comprueba las demás con el índice (tipo, objeto_id, termino).
+        """
+        palabras = cls.palabras(tipo, consulta) if palabras is None else palabras
+        if not palabras:
+            return cls.objects.none().values('objeto_id')
+        ids = cls.objects.filter(tipo=tipo, termino=palabras[0])
+        for palabra in palabras[1:]:
+            # EXISTS correlacionado: una búsqueda por objeto, sin materializar la lista de la palabra común
+            ids = ids.filter(Exists(cls.objects.filter(tipo=tipo, termino=palabra, objeto_id=OuterRef('objeto_id'))))
+        return ids.values('objeto_id')
+
+    @classmethod
+    def buscar(cls, tipo, consulta, limite=20):
+        """Lista de (objeto_id, puntaje) de los mejores resultados, del más relevante al menos."""
+        palabras = cls.palabras(tipo, consulta)
+        if not palabras:
+            return []
+        if len(palabras) == 1:
+            # El índice ya entrega los objetos en orden de peso: se leen solo `limite` filas
+            filas = (
+                cls.objects.filter(tipo=tipo, termino=palabras[0])
+                .order_by('-peso', 'objeto_id')
+                .values_list('objeto_id', 'peso')[:limite]
+            )
+            return list(filas)
+        filas = (
+            cls.objects.filter(
+                tipo=tipo, termino__in=palabras, objeto_id__in=cls.coincidencias(tipo, consulta, palabras),
+            )
+            .values('objeto_id')
+            .annotate(puntaje=Sum('peso'))
+            .order_by('-puntaje', 'objeto_id')[:limite]
+        )
+        return [(fila['objeto_id'], fila['puntaje']) for fila in filas]
+
+    def __str__(self):
+        return f'{self.tipo}:{self.termino} -> {self.objeto_id}'
+
+
+# Mantiene el índice de búsqueda al guardar o borrar cursos y usuarios (de cualquier rol).
+# Los cambios hechos con bulk_create o QuerySet.update se reindexan con el comando indexar_busqueda
+@receiver(post_save, sender=Curso)
+@receiver(post_save, sender=Usuario)
+@receiver(post_save, sender=Estudiante)
+@receiver(post_save, sender=Docente)
+@receiver(post_save, sender=Administrativo)
+def indexar_busqueda(sender, instance, raw=False, update_fields=None, **kwargs):
+    tipo = 'curso' if sender is Curso else 'usuario'
+    if raw or not busqueda.campos_cambiados(tipo, update_fields):
+        return
+    TerminoBusqueda.indexar(tipo, [instance])
+
+
+@receiver(post_delete, sender=Curso)
+@receiver(post_delete, sender=Usuario)
+def desindexar_busqueda(sender, instance, **kwargs):
+    tipo = 'curso' if sender is Curso else 'usuario'
+    TerminoBusqueda.objects.filter(tipo=tipo, objeto_id=instance.pk).delete()
@@ -0,0 +1,223 @@
+"""
+Envío por correo de las notificaciones pendientes.
+
+`despachar_lote` toma un lote de notificaciones pendientes cuyo próximo intento ya venció con
+SELECT ... FOR UPDATE SKIP LOCKED, de modo que varios procesos pueden despachar a la vez sin
+enviar dos veces la misma. Los correos salen por una sola conexión SMTP abierta para todo el
+lote, las enviadas se marcan con un único UPDATE y las que fallan se reprograman con espera
+exponencial; tras NOTIFICACIONES_MAX_INTENTOS quedan en estado 'fallido'. Todo ocurre en una
+transacción: si el proceso muere a mitad del lote, las filas vuelven a quedar pendientes.
+
+`programar_recordatorios` crea los recordatorios de pago que luego envía el despachador. La tabla
+de notificaciones hace también de bandeja de salida: los avisos que generan las escrituras (por
+ejemplo, la activación de un curso en models.activar_cursos) se guardan en la misma transacción
+y el despachador los envía después.
+"""
+import datetime
+import itertools
+import time
+
+from django.conf import settings
+from django.core import mail
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import MarcaRecordatorio, Notificacion, Pago
+
+
+ASUNTOS = dict(Notificacion.TIPO_CHOICES)
+
+# Estados de pago con saldo por cobrar
+ESTADOS_POR_COBRAR = ['pendiente', 'parcial']
+
+
+def espera(intentos):
+    """Segundos hasta el siguiente intento tras `intentos` fallos: base, 2*base, 4*base... con tope."""
+    base = getattr(settings, 'NOTIFICACIONES_ESPERA_BASE', 60)
+    tope = getattr(settings, 'NOTIFICACIONES_ESPERA_MAXIMA', 3600)
+    return min(base * 2 ** (intentos - 1), tope)
+
+
+def despachar_lote(lote=None, conexion=None):
+    """
+    Envía un lote de notificaciones pendientes por `conexion` (por defecto la del
+    EMAIL_BACKEND configurado). Devuelve la cantidad de enviadas y de fallidas.
+    """
+    if conexion is None:
+        with mail.get_connection() as conexion:
+            return despachar_lote(lote, conexion)
+
+    lote = lote or getattr(settings, 'NOTIFICACIONES_LOTE', 100)
+    max_intentos = getattr(settings, 'NOTIFICACIONES_MAX_INTENTOS', 5)
+    ahora = timezone.now()
+
+    with transaction.atomic():
+        notificaciones = list(
+            Notificacion.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(estado='pendiente', proximo_intento__lte=ahora)
+            .select_related('usuario')
+            .only('tipo_notificacion', 'asunto', 'mensaje', 'estado', 'intentos', 'proximo_intento', 'usuario__correo')
+            .order_by('proximo_intento')[:lote]
+        )
+        enviadas, fallidas = [], []
+        caida = None
+        for notificacion in notificaciones:
+            error, definitivo = caida, False
+            if error is None and not notificacion.usuario.correo:
+                # Sin destinatario no tiene sentido reintentar
+                error, definitivo = 'El usuario no tiene correo.', True
+            if error is None:
+                mensaje = mail.EmailMessage(
+                    subject=notificacion.asunto or ASUNTOS.get(notificacion.tipo_notificacion, notificacion.tipo_notificacion),
+                    body=notificacion.mensaje,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[notificacion.usuario.correo],
+                    connection=conexion,
+                )
+                try:
+                    mensaje.send()
+                    enviadas.append(notificacion.pk)
+                    continue
+                except ValueError as exc:
+                    error = exc
+                except OSError as exc:
+                    # El fallo puede haber dejado la conexión inservible: se abre otra y, si
+                    # tampoco se puede, el resto del lote se reprograma sin intentar enviarlo
+                    error = exc
+                    conexion.close()
+                    try:
+                        conexion.open()
+                    except OSError as exc_conexion:
+                        caida = exc_conexion
+
+            notificacion.intentos += 1
+            notificacion.ultimo_error = str(error)
+            if definitivo or notificacion.intentos >= max_intentos:
+                notificacion.estado = 'fallido'
+            else:
+                notificacion.proximo_intento = ahora + datetime.timedelta(seconds=espera(notificacion.intentos))
+            fallidas.append(notificacion)
+
+        if enviadas:
+            # fecha_envio pasa a ser la del envío real, no la de creación
+            Notificacion.objects.filter(pk__in=enviadas).update(
+                estado='enviado', fecha_envio=timezone.now(), intentos=F('intentos') + 1, ultimo_error='',
+            )
+        if fallidas:
+            Notificacion.objects.bulk_update(fallidas, ['estado', 'intentos', 'proximo_intento', 'ultimo_error'])
+    return len(enviadas), len(fallidas)
+
+
+def despachar(lote=None, max_lotes=None, conexion=None):
+    """
+    Despacha lotes por la misma conexión hasta que no queden notificaciones vencidas (o hasta
+    `max_lotes`) y devuelve el resumen con el rendimiento obtenido.
+    """
+    conexion = conexion or mail.get_connection()
+    inicio = time.monotonic()
+    lotes = enviadas = fallidas = 0
+    conexion.open()
+    try:
+        while max_lotes is None or lotes < max_lotes:
+            enviadas_lote, fallidas_lote = despachar_lote(lote, conexion)
+            if not enviadas_lote and not fallidas_lote:
+                break
+            lotes += 1
+            enviadas += enviadas_lote
+            fallidas += fallidas_lote
+    finally:
+        conexion.close()
+
+    segundos = time.monotonic() - inicio
+    return {
+        'lotes': lotes,
+        'enviadas': enviadas,
+        'fallidas': fallidas,
+        'segundos': round(segundos, 3),
+        'por_segundo': round(enviadas / segundos, 1) if segundos else 0.0,
+    }
+
+
+def pagos_por_vencer(desde, hasta):
+    """Pagos con saldo por cobrar que vencen entre `desde` y `hasta` (inclusive)."""
+    return Pago.objects.filter(estado_pago__in=ESTADOS_POR_COBRAR, fecha_vencimiento__range=(desde, hasta))
+
+
+def programar_recordatorios(hoy=None, horizontes=None, lote=1000):
+    """
+    Crea un recordatorio por cada pago que entró en alguno de los `horizontes` (días antes del
+    vencimiento, por defecto RECORDATORIOS_DIAS_ANTES) y devuelve `{dias_antes: creados}`.
+
+    Cada horizonte guarda en MarcaRecordatorio hasta qué vencimiento revisó y cuándo, así que una
+    corrida solo lee el tramo de fechas nuevo (un rango sobre pago_estado_vencimiento_idx) más
+    los pagos del tramo ya revisado con `fecha_modificacion` posterior a la corrida anterior:
+    los creados desde entonces y aquellos cuyo vencimiento o estado cambió. Un pago recibe solo el recordatorio del horizonte más cercano que le
+    corresponde: si se registra dos días antes de vencer no recibe también el de siete. Los
+    recordatorios ya emitidos se descartan antes de insertar, y la restricción única
+    (pago, dias_antes) evita duplicados si dos corridas coinciden.
+    """
+    hoy = hoy or timezone.localdate()
+    horizontes = sorted(set(horizontes or getattr(settings, 'RECORDATORIOS_DIAS_ANTES', [7, 3, 1])), reverse=True)
+    revisado = timezone.now()
+    un_dia = datetime.timedelta(days=1)
+
+    creados = {}
+    for indice, dias in enumerate(horizontes):
+        siguiente = horizontes[indice + 1] if indice + 1 < len(horizontes) else -1
+        inicio, fin = hoy + datetime.timedelta(days=siguiente + 1), hoy + datetime.timedelta(days=dias)
+
+        with transaction.atomic():
+            marca = MarcaRecordatorio.objects.select_for_update().filter(dias_antes=dias).first()
+            if marca is None:
+                consultas = [pagos_por_vencer(inicio, fin)]
+                hasta = fin
+            else:
+                consultas = []
+                if marca.hasta < fin:
+                    consultas.append(pagos_por_vencer(max(inicio, marca.hasta + un_dia), fin))
+                if marca.hasta >= inicio:
+                    relectura = pagos_por_vencer(inicio, min(marca.hasta, fin))
+                    if marca.revisado is not None:
+                        relectura = relectura.filter(fecha_modificacion__gt=marca.revisado)
+                    consultas.append(relectura)
+                hasta = max(marca.hasta, fin)
+
+            creados[dias] = sum(_crear_recordatorios(consulta, dias, hoy, lote) for consulta in consultas)
+            MarcaRecordatorio.objects.update_or_create(
+                dias_antes=dias, defaults={'hasta': hasta, 'revisado': revisado},
+            )
+    return creados
+
+
+def _crear_recordatorios(pagos, dias, hoy, lote):
+    filas = pagos.order_by().values_list(
+        'id', 'monto', 'fecha_vencimiento', 'inscripcion__estudiante_id', 'inscripcion__curso__nombre',
+    ).iterator(chunk_size=lote)
+
+    creados = 0
+    while bloque := list(itertools.islice(filas, lote)):
+        emitidos = set(
+            Notificacion.objects.filter(pago_id__in=[fila[0] for fila in bloque], dias_antes=dias)
+            .values_list('pago_id', flat=True)
+        )
+        nuevos = [
+            Notificacion(
+                usuario_id=estudiante_id,
+                pago_id=pago_id,
+                dias_antes=dias,
+                tipo_notificacion='recordatorio_pago',
+                mensaje=_mensaje_recordatorio(monto, vencimiento, curso, hoy),
+            )
+            for pago_id, monto, vencimiento, estudiante_id, curso in bloque
+            if pago_id not in emitidos
+        ]
+        Notificacion.objects.bulk_create(nuevos, batch_size=lote, ignore_conflicts=True)
+        creados += len(nuevos)
+    return creados
+
+
+def _mensaje_recordatorio(monto, vencimiento, curso, hoy):
+    dias = (vencimiento - hoy).days
+    cuando = 'hoy' if dias <= 0 else 'mañana' if dias == 1 else f'en {dias} días'
+    return f'Su pago de {monto} del curso {curso} vence {cuando} ({vencimiento:%d/%m/%Y}).'
@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) sobre la llave primaria. Cada página se obtiene con
+    `WHERE id < <cursor> ORDER BY id DESC LIMIT n`, por lo que el costo no crece con la
+    profundidad de la página como ocurre con OFFSET. El tamaño por defecto se toma de
+    `REST_FRAMEWORK['PAGE_SIZE']` y el cliente puede ajustarlo con `?page_size=`.
+    """
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = 500
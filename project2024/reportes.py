@@ -0,0 +1,176 @@
+"""
+Motor de reportes: calcula en la base de datos (agregaciones agrupadas) el contenido de cada
+tipo de `Reporte` y lo devuelve como un diccionario listo para guardarse en `Reporte.resultado`.
+El reporte de ingresos agrupa el resumen diario IngresoDiario en lugar de la tabla de pagos.
+"""
+import datetime
+from decimal import Decimal
+
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .filtros import inicio_del_dia
+from .models import IngresoDiario, Inscripcion, Pago
+
+
+# Estados de pago que representan dinero recibido
+ESTADOS_INGRESO = ['completado', 'parcial']
+
+# Tramos de antigüedad de los pagos pendientes: (nombre, días vencidos mínimos, máximos)
+TRAMOS_VENCIMIENTO = [
+    ('1_30', 1, 30),
+    ('31_60', 31, 60),
+    ('61_90', 61, 90),
+    ('mas_90', 91, None),
+]
+
+
+def generar(tipo, desde=None, hasta=None, anterior=None):
+    """
+    Calcula el reporte `tipo` para la ventana [desde, hasta] (fechas inclusivas, None = sin
+    límite). Si se pasa `anterior` (el resultado previo de un reporte de ingresos), solo se
+    recalculan los meses que tocan la ventana y el resto se reutiliza sin volver a consultar.
+    """
+    if tipo == 'ingresos':
+        return generar_ingresos(desde, hasta, anterior)
+    if tipo == 'pagos_pendientes':
+        return generar_pagos_pendientes(desde, hasta)
+    if tipo == 'asistencia':
+        return generar_asistencia(desde, hasta)
+    raise ValueError(f'Tipo de reporte desconocido: {tipo}')
+
+
+def generar_ingresos(desde=None, hasta=None, anterior=None):
+    # La ventana se amplía a meses completos para que cada periodo se calcule entero
+    if desde:
+        desde = desde.replace(day=1)
+    if hasta:
+        hasta = _fin_de_mes(hasta)
+
+    periodos = {}
+    if anterior:
+        for clave, periodo in anterior.get('periodos', {}).items():
+            mes = datetime.date.fromisoformat(f'{clave}-01')
+            if (desde and mes < desde) or (hasta and mes > hasta):
+                periodos[clave] = periodo
+
+    # Se lee el resumen diario (IngresoDiario), no la tabla de pagos
+    ingresos = IngresoDiario.objects.filter(estado_pago__in=ESTADOS_INGRESO, cantidad__gt=0)
+    if desde:
+        ingresos = ingresos.filter(fecha__gte=desde)
+    if hasta:
+        ingresos = ingresos.filter(fecha__lte=hasta)
+
+    filas = (
+        ingresos.annotate(periodo=TruncMonth('fecha'))
+        .values('periodo', 'metodo_pago', 'curso_id')
+        .annotate(total=Sum('total'), cantidad=Sum('cantidad'))
+        .order_by()
+    )
+    for fila in filas:
+        clave = fila['periodo'].strftime('%Y-%m')
+        periodo = periodos.setdefault(clave, {'total': '0.00', 'cantidad': 0, 'por_curso': {}, 'por_metodo': {}})
+        _acumular(periodo, fila['total'], fila['cantidad'])
+        _acumular(periodo['por_curso'].setdefault(str(fila['curso_id']), {'total': '0.00', 'cantidad': 0}),
+                  fila['total'], fila['cantidad'])
+        _acumular(periodo['por_metodo'].setdefault(fila['metodo_pago'], {'total': '0.00', 'cantidad': 0}),
+                  fila['total'], fila['cantidad'])
+
+    periodos = dict(sorted(periodos.items()))
+    return {
+        'periodos': periodos,
+        'total': _dinero(sum((Decimal(p['total']) for p in periodos.values()), Decimal('0'))),
+        'cantidad': sum(p['cantidad'] for p in periodos.values()),
+    }
+
+
+def generar_pagos_pendientes(desde=None, hasta=None):
+    """
+    Agrupa los pagos pendientes según los días que llevan vencidos, en una sola consulta con
+    agregaciones condicionales. La ventana, si se indica, se aplica a `fecha_vencimiento`.
+    """
+    hoy = timezone.localdate()
+    pagos = Pago.objects.filter(estado_pago='pendiente')
+    if desde:
+        pagos = pagos.filter(fecha_vencimiento__gte=desde)
+    if hasta:
+        pagos = pagos.filter(fecha_vencimiento__lte=hasta)
+
+    condiciones = {
+        'sin_vencimiento': Q(fecha_vencimiento__isnull=True),
+        'por_vencer': Q(fecha_vencimiento__gte=hoy),
+    }
+    for nombre, minimo, maximo in TRAMOS_VENCIMIENTO:
+        condicion = Q(fecha_vencimiento__lte=hoy - datetime.timedelta(days=minimo))
+        if maximo is not None:
+            condicion &= Q(fecha_vencimiento__gte=hoy - datetime.timedelta(days=maximo))
+        condiciones[nombre] = condicion
+
+    agregados = {}
+    for nombre, condicion in condiciones.items():
+        agregados[f'{nombre}__total'] = Sum('monto', filter=condicion)
+        agregados[f'{nombre}__cantidad'] = Count('id', filter=condicion)
+    valores = pagos.aggregate(**agregados)
+
+    tramos = {
+        nombre: {
+            'total': _dinero(valores[f'{nombre}__total'] or Decimal('0')),
+            'cantidad': valores[f'{nombre}__cantidad'],
+        }
+        for nombre in condiciones
+    }
+    return {
+        'fecha_corte': hoy.isoformat(),
+        'tramos': tramos,
+        'total': _dinero(sum((Decimal(t['total']) for t in tramos.values()), Decimal('0'))),
+        'cantidad': sum(t['cantidad'] for t in tramos.values()),
+    }
+
+
+def generar_asistencia(desde=None, hasta=None):
+    """
+    El sistema no registra asistencia a clases; este reporte resume la ocupación de cada curso
+    (inscripciones por estado frente a la capacidad), que es el dato disponible más cercano.
+    La ventana se aplica a `fecha_inscripcion`.
+    """
+    inscripciones = Inscripcion.objects.all()
+    if desde:
+        inscripciones = inscripciones.filter(fecha_inscripcion__gte=inicio_del_dia(desde))
+    if hasta:
+        inscripciones = inscripciones.filter(fecha_inscripcion__lt=inicio_del_dia(hasta + datetime.timedelta(days=1)))
+
+    filas = (
+        inscripciones.values('curso_id', nombre=F('curso__nombre'), capacidad=F('curso__capacidad'))
+        .annotate(
+            inscritos=Count('id', filter=Q(estado='inscrito')),
+            pendientes=Count('id', filter=Q(estado='pendiente')),
+        )
+        .order_by('curso_id')
+    )
+    cursos = {}
+    for fila in filas:
+        capacidad = fila['capacidad']
+        cursos[str(fila['curso_id'])] = {
+            'nombre': fila['nombre'],
+            'capacidad': capacidad,
+            'inscritos': fila['inscritos'],
+            'pendientes': fila['pendientes'],
+            'porcentaje_ocupacion': round(fila['inscritos'] / capacidad * 100, 2) if capacidad > 0 else 0.0,
+        }
+    return {'cursos': cursos}
+
+
+def _acumular(destino, total, cantidad):
+    destino['total'] = _dinero(Decimal(destino['total']) + total)
+    destino['cantidad'] += cantidad
+
+
+def _dinero(valor):
+    # Los montos se guardan como texto con dos decimales para no perder precisión en el JSON
+    return str(Decimal(valor).quantize(Decimal('0.01')))
+
+
+def _fin_de_mes(fecha):
+    siguiente = (fecha.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+    return siguiente - datetime.timedelta(days=1)
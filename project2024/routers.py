@@ -0,0 +1,80 @@
+"""
+Enrutamiento de lecturas a la réplica de la base de datos.
+
+`ReplicaMiddleware` decide por petición si las lecturas pueden ir a la réplica: solo en
+métodos seguros (GET, HEAD, OPTIONS), si el cliente no escribió hace poco y si la réplica
+responde. `ReplicaRouter` aplica esa decisión a los modelos de project2024; las escrituras y
+cualquier lectura fuera de una petición (comandos, tareas) van siempre a 'default'.
+"""
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+
+COOKIE_PRIMARIA = 'leer_primaria'
+METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS')
+
+_leer_de_replica = ContextVar('leer_de_replica', default=False)
+_replica_caida_hasta = 0.0
+
+
+def replica_disponible():
+    """
+    Indica si la réplica configurada acepta conexiones. Tras un fallo no se vuelve a intentar
+    durante REPLICA_REINTENTO_SEGUNDOS, para no pagar el tiempo de conexión en cada petición.
+    """
+    global _replica_caida_hasta
+    alias = getattr(settings, 'DATABASE_REPLICA', None)
+    if not alias:
+        return False
+    if time.monotonic() < _replica_caida_hasta:
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        _replica_caida_hasta = time.monotonic() + getattr(settings, 'REPLICA_REINTENTO_SEGUNDOS', 30)
+        return False
+    return True
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == 'project2024' and _leer_de_replica.get():
+            return settings.DATABASE_REPLICA
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # La réplica contiene los mismos datos que la primaria
+        return True
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        usar_replica = (
+            request.method in METODOS_SEGUROS
+            and COOKIE_PRIMARIA not in request.COOKIES
+            and replica_disponible()
+        )
+        token = _leer_de_replica.set(usar_replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            _leer_de_replica.reset(token)
+
+        # Después de escribir, el cliente lee de la primaria un momento para ver sus propios cambios
+        # aunque la réplica todavía no los haya recibido
+        if request.method not in METODOS_SEGUROS:
+            response.set_cookie(
+                COOKIE_PRIMARIA, '1',
+                max_age=getattr(settings, 'REPLICA_PIN_SEGUNDOS', 5),
+                httponly=True, samesite='Lax',
+            )
+        return response
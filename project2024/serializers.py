@@ -1,11 +1,14 @@
+from django.db import transaction
 from rest_framework import serializers
-from .models import Curso, Pago, Inscripcion, Estudiante,Docente, Administrativo, HistorialPago, Reembolso, Notificacion, Reporte
+
+from .forma import Expandible, SerializerDinamico
+from .models import Curso, Pago, Inscripcion, Estudiante,Docente, Administrativo, HistorialPago, Reembolso, Notificacion, Reporte, TransicionInvalida
 
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class AdministrativoSerializer(serializers.ModelSerializer):
+class AdministrativoSerializer(SerializerDinamico):
     class Meta:
         model = Administrativo
         fields = '__all__'
@@ -14,7 +17,17 @@ class AdministrativoSerializer(serializers.ModelSerializer):
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class DocenteSerializer(serializers.ModelSerializer):
+class AdministrativoListaSerializer(SerializerDinamico):
+    # Representación compacta para el listado de administrativos
+    class Meta:
+        model = Administrativo
+        fields = ['id', 'nombre_completo', 'correo', 'estado', 'codigo_adm', 'departamento', 'cargo', 'acceso']
+
+
+""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+
+class DocenteSerializer(SerializerDinamico):
     class Meta:
         model = Docente
         fields = '__all__' 
@@ -23,36 +36,73 @@ class DocenteSerializer(serializers.ModelSerializer):
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class CursoSerializer(serializers.ModelSerializer):
+class DocenteListaSerializer(SerializerDinamico):
+    # Representación compacta para el listado de docentes
+    class Meta:
+        model = Docente
+        fields = ['id', 'nombre_completo', 'correo', 'estado', 'codigo_doc', 'especialidad', 'facultad', 'campus']
+
+
+""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+
+class CursoSerializer(SerializerDinamico):
     class Meta:
         model = Curso
         fields = '__all__'  # O puedes especificar los campos que deseas incluir
+        expandibles = {'docente_id': Expandible('DocenteListaSerializer')}
 
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class PagoSerializer(serializers.ModelSerializer):
+class PagoSerializer(SerializerDinamico):
     class Meta:
         model = Pago
         fields = '__all__'
+        expandibles = {
+            'inscripcion': Expandible('InscripcionSerializer'),
+            'historial': Expandible('HistorialPagoSerializer', source='historialpago_set', many=True),
+        }
 
     def validate(self, data):
-        if data['monto'] <= 0:
+        # En actualizaciones parciales el monto puede no venir
+        if 'monto' in data and data['monto'] <= 0:
             raise serializers.ValidationError("El monto debe ser mayor que cero.")
+        if self.instance is not None and 'estado_pago' in data and data['estado_pago'] != self.instance.estado_pago:
+            try:
+                Pago.validar_transicion(self.instance.estado_pago, data['estado_pago'])
+            except TransicionInvalida as exc:
+                raise serializers.ValidationError({'estado_pago': [str(exc)]})
         return data
 
+    def update(self, instance, validated_data):
+        # El estado no se reescribe junto con la fila: pasa por Pago.cambiar_estado, que solo lo
+        # cambia si sigue siendo el que se leyó y registra el cambio en el historial
+        nuevo_estado = validated_data.pop('estado_pago', instance.estado_pago)
+        with transaction.atomic():
+            for campo, valor in validated_data.items():
+                setattr(instance, campo, valor)
+            if validated_data:
+                instance.save(update_fields=list(validated_data))
+            if nuevo_estado != instance.estado_pago:
+                Pago.cambiar_estado(instance.pk, nuevo_estado, anterior=instance.estado_pago)
+                instance.estado_pago = nuevo_estado
+        return instance
+
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class HistorialPagoSerializer(serializers.ModelSerializer):
+class HistorialPagoSerializer(SerializerDinamico):
     pago = PagoSerializer()  # Define el serializer para el pago anidado
 
     class Meta:
         model = HistorialPago
-        fields = ['pago', 'estado_pago_anterior', 'estado_pago_nuevo', 'fecha_cambio', 'comentario']
+        fields = ['id', 'pago', 'estado_pago_anterior', 'estado_pago_nuevo', 'fecha_cambio', 'comentario']
         read_only_fields = ['fecha_cambio']  # Este campo se genera automáticamente y no debe ser modificado
+        # Al leer, el pago se devuelve como id salvo que se pida ?expand=pago
+        expandibles = {'pago': Expandible(PagoSerializer)}
 
     def create(self, validated_data):
         # Extraer los datos del pago del serializer anidado
@@ -70,30 +120,38 @@ class HistorialPagoSerializer(serializers.ModelSerializer):
         # Actualizar el pago si es necesario
         pago_data = validated_data.pop('pago', None)
         
-        if pago_data:
-            # Si se proporciona un pago anidado, actualízalo
-            instance.pago.monto = pago_data.get('monto', instance.pago.monto)
-            instance.pago.estado_pago = pago_data.get('estado_pago', instance.pago.estado_pago)
-            instance.pago.save()
-        
-        # Actualizar los demás campos del historial de pago
-        instance.estado_pago_anterior = validated_data.get('estado_pago_anterior', instance.estado_pago_anterior)
-        instance.estado_pago_nuevo = validated_data.get('estado_pago_nuevo', instance.estado_pago_nuevo)
-        instance.fecha_cambio = validated_data.get('fecha_cambio', instance.fecha_cambio)
-        instance.comentario = validated_data.get('comentario', instance.comentario)
-        
-        instance.save()
+        with transaction.atomic():
+            if pago_data:
+                # Si se proporciona un pago anidado, actualízalo. El estado pasa por
+                # Pago.cambiar_estado, que valida la transición y la registra en el historial
+                pago = instance.pago
+                if 'monto' in pago_data:
+                    pago.monto = pago_data['monto']
+                    pago.save(update_fields=['monto'])
+                nuevo_estado = pago_data.get('estado_pago', pago.estado_pago)
+                if nuevo_estado != pago.estado_pago:
+                    Pago.cambiar_estado(pago.pk, nuevo_estado, anterior=pago.estado_pago)
+                    pago.estado_pago = nuevo_estado
+            
+            # Actualizar los demás campos del historial de pago
+            instance.estado_pago_anterior = validated_data.get('estado_pago_anterior', instance.estado_pago_anterior)
+            instance.estado_pago_nuevo = validated_data.get('estado_pago_nuevo', instance.estado_pago_nuevo)
+            instance.fecha_cambio = validated_data.get('fecha_cambio', instance.fecha_cambio)
+            instance.comentario = validated_data.get('comentario', instance.comentario)
+            
+            instance.save()
         return instance
 
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class ReembolsoSerializer(serializers.ModelSerializer):
+class ReembolsoSerializer(SerializerDinamico):
     class Meta:
         model = Reembolso
         fields = ['id', 'usuario', 'pago', 'motivo', 'estado', 'fecha_solicitud', 'fecha_resolucion']
         read_only_fields = ['fecha_solicitud', 'fecha_resolucion']
+        expandibles = {'pago': Expandible(PagoSerializer)}
     
     def update(self, instance, validated_data):
         # Aquí puedes agregar lógica adicional para actualizar el estado del reembolso
@@ -106,11 +164,11 @@ class ReembolsoSerializer(serializers.ModelSerializer):
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class NotificacionSerializer(serializers.ModelSerializer):
+class NotificacionSerializer(SerializerDinamico):
     class Meta:
         model = Notificacion
-        fields = ['id', 'usuario', 'tipo_notificacion', 'mensaje', 'fecha_envio', 'estado']
-        read_only_fields = ['fecha_envio']  # Solo se establece automáticamente en el envío
+        fields = ['id', 'usuario', 'tipo_notificacion', 'mensaje', 'fecha_envio', 'estado', 'intentos', 'ultimo_error']
+        read_only_fields = ['fecha_envio', 'intentos', 'ultimo_error']  # Los mantiene el despachador de correos
     
     def validate(self, data):
         # Validación personalizada si es necesario
@@ -120,18 +178,23 @@ class NotificacionSerializer(serializers.ModelSerializer):
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class InscripcionSerializer(serializers.ModelSerializer):
+class InscripcionSerializer(SerializerDinamico):
     nombre_curso = serializers.ReadOnlyField(source='curso.nombre') 
 
     class Meta:
         model = Inscripcion
         fields = '__all__'
+        expandibles = {
+            'curso': Expandible(CursoSerializer),
+            'estudiante': Expandible('EstudianteListaSerializer'),
+            'pagos': Expandible(PagoSerializer, source='pago_set', many=True),
+        }
 
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class EstudianteSerializer(serializers.ModelSerializer):
+class EstudianteSerializer(SerializerDinamico):
     class Meta:
         model = Estudiante
         fields = '__all__'  # O especifica los campos que deseas incluir
@@ -144,6 +207,16 @@ class EstudianteSerializer(serializers.ModelSerializer):
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
+class EstudianteListaSerializer(SerializerDinamico):
+    # Representación compacta para el listado de estudiantes
+    class Meta:
+        model = Estudiante
+        fields = ['id', 'nombre_completo', 'correo', 'estado', 'matricula']
+
+
+""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+
 class AdministrativoAccesoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Administrativo
@@ -172,12 +245,15 @@ class UserAuthSerializer(serializers.Serializer):
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class ReporteSerializer(serializers.ModelSerializer):
+class ReporteSerializer(SerializerDinamico):
     class Meta:
         model = Reporte
-        fields = ['id', 'tipo_reporte', 'fecha_generacion', 'descripcion']
-        read_only_fields = ['fecha_generacion']  # Solo lectura, se genera automáticamente
+        fields = ['id', 'tipo_reporte', 'fecha_generacion', 'descripcion', 'fecha_desde', 'fecha_hasta', 'resultado']
+        read_only_fields = ['fecha_generacion', 'resultado']  # Solo lectura, se generan automáticamente
 
     def validate(self, data):
-        # Validación adicional si es necesaria
+        desde = data.get('fecha_desde', getattr(self.instance, 'fecha_desde', None))
+        hasta = data.get('fecha_hasta', getattr(self.instance, 'fecha_hasta', None))
+        if desde and hasta and desde > hasta:
+            raise serializers.ValidationError("fecha_desde no puede ser posterior a fecha_hasta.")
         return data
\ No newline at end of file
@@ -0,0 +1,85 @@
+from io import StringIO
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from project2024.models import Credencial, Estudiante
+from .utils import crear_docente, crear_estudiante
+
+
+class AccesoUsuarioViewTests(TestCase):
+    url = '/api/acceso/usuario/'
+
+    def setUp(self):
+        self.estudiante = crear_estudiante(password='secreta')
+
+    def login(self, **datos):
+        return self.client.post(self.url, datos, content_type='application/json')
+
+    def test_credencial_guarda_hash_y_no_la_contraseña(self):
+        credencial = Credencial.objects.get(pk=f'estudiante:{self.estudiante.matricula}')
+        self.assertNotEqual(credencial.password_hash, 'secreta')
+        self.assertTrue(credencial.verificar('secreta'))
+
+    def test_login_exitoso_con_una_busqueda_por_llave(self):
+        # Búsqueda en el índice y carga de los datos del estudiante
+        with self.assertNumQueries(2):
+            respuesta = self.login(matricula=self.estudiante.matricula, password='secreta')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['id'], self.estudiante.id)
+
+    def test_contraseña_incorrecta(self):
+        respuesta = self.login(matricula=self.estudiante.matricula, password='otra')
+        self.assertEqual(respuesta.status_code, 404)
+
+    def test_prueba_el_siguiente_rol_si_el_primero_no_coincide(self):
+        docente = crear_docente(password='docente')
+        respuesta = self.login(matricula=self.estudiante.matricula, codigo_doc=docente.codigo_doc, password='docente')
+        self.assertEqual(respuesta.json()['id'], docente.id)
+
+    def test_cambios_de_contraseña_y_matricula_actualizan_el_indice(self):
+        estudiante = Estudiante.objects.get(pk=self.estudiante.pk)
+        estudiante.password = 'nueva'
+        estudiante.matricula = 'M-NUEVA'
+        estudiante.save()
+
+        self.assertEqual(self.login(matricula=self.estudiante.matricula, password='secreta').status_code, 404)
+        self.assertEqual(self.login(matricula='M-NUEVA', password='nueva').status_code, 200)
+        self.assertEqual(Credencial.objects.filter(usuario_id=estudiante.pk).count(), 1)
+
+    def test_guardar_sin_cambiar_la_contraseña_no_recalcula_el_hash(self):
+        credencial = Credencial.objects.get(usuario_id=self.estudiante.pk)
+        estudiante = Estudiante.objects.get(pk=self.estudiante.pk)
+        estudiante.nombre_completo = 'Otro nombre'
+        estudiante.save()
+        estudiante.matricula = 'M-OTRA'
+        estudiante.save()
+        self.assertEqual(Credencial.objects.get(pk='estudiante:M-OTRA').password_hash, credencial.password_hash)
+
+    @override_settings(CREDENCIALES_ITERACIONES=1200)
+    def test_el_hash_con_otro_factor_de_trabajo_se_rehace_al_entrar(self):
+        anterior = Credencial.objects.get(usuario_id=self.estudiante.pk).password_hash
+        self.assertEqual(self.login(matricula=self.estudiante.matricula, password='secreta').status_code, 200)
+        nuevo = Credencial.objects.get(usuario_id=self.estudiante.pk).password_hash
+        self.assertNotEqual(nuevo, anterior)
+        self.assertEqual(PBKDF2PasswordHasher().decode(nuevo)['iterations'], 1200)
+
+    def test_comando_indexa_por_lotes_solo_lo_que_falta(self):
+        otros = [crear_estudiante() for _ in range(4)]
+        Credencial.objects.filter(usuario_id__in=[e.pk for e in otros[:3]]).delete()
+        Estudiante.objects.filter(pk=otros[3].pk).update(matricula='M-CAMBIADA')
+        intacta = Credencial.objects.get(usuario_id=self.estudiante.pk).password_hash
+
+        salida = StringIO()
+        call_command('indexar_credenciales', '--lote', '2', stdout=salida)
+        self.assertIn('Credenciales indexadas: 4', salida.getvalue())
+        self.assertEqual(Credencial.objects.get(usuario_id=self.estudiante.pk).password_hash, intacta)
+        self.assertEqual(Credencial.objects.filter(usuario_id=otros[3].pk).get().clave, 'estudiante:M-CAMBIADA')
+        self.assertEqual(self.login(matricula=otros[0].matricula, password=otros[0].password).status_code, 200)
+
+        call_command('indexar_credenciales', '--todas', stdout=salida)
+        self.assertIn('Credenciales indexadas: 5', salida.getvalue())
+
+    def test_sin_password(self):
+        self.assertEqual(self.login(matricula=self.estudiante.matricula).status_code, 400)
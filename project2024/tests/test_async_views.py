@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from project2024 import routers
+from project2024.models import Curso, HistorialPago
+from .utils import crear_curso, crear_docente, crear_estudiante, crear_inscripcion, crear_pago
+
+
+class VistasAsincronasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.docente = crear_docente()
+        self.estudiante = crear_estudiante()
+        for _ in range(3):
+            curso = crear_curso(docente_id=self.docente, capacidad=4)
+            pago = crear_pago(crear_inscripcion(self.estudiante, curso))
+            HistorialPago.objects.create(pago=pago, estado_pago_anterior='parcial', estado_pago_nuevo='pendiente')
+
+    async def test_verificar_estudiante_igual_que_la_version_sincrona(self):
+        sincrona = await self.async_client.get(f'/estudiante/{self.estudiante.id}/verificar/')
+        asincrona = await self.async_client.get(f'/async/estudiante/{self.estudiante.id}/verificar/')
+
+        self.assertEqual(asincrona.status_code, 200)
+        self.assertEqual(asincrona.json(), sincrona.json())
+
+    async def test_verificar_estudiante_sin_inscripciones(self):
+        respuesta = await self.async_client.get('/async/estudiante/999999/verificar/')
+        self.assertEqual(respuesta.status_code, 404)
+
+    async def test_docente_cursos_igual_que_la_version_sincrona(self):
+        sincrona = await self.async_client.get(f'/docente/{self.docente.id}/cursos/')
+        asincrona = await self.async_client.get(f'/async/docente/{self.docente.id}/cursos/')
+
+        self.assertEqual(asincrona.status_code, 200)
+        self.assertEqual(asincrona.json(), sincrona.json())
+        self.assertEqual((await self.async_client.get('/async/docente/999999/cursos/')).status_code, 404)
+
+    async def test_catalogo_paginado_y_en_cache(self):
+        primera = await self.async_client.get('/async/cursos/?page_size=2')
+        datos = primera.json()
+        self.assertEqual(primera['X-Cache'], 'MISS')
+        self.assertEqual(len(datos['results']), 2)
+
+        segunda = (await self.async_client.get(datos['next'])).json()
+        self.assertEqual(len(segunda['results']), 1)
+        self.assertIsNone(segunda['next'])
+
+        repetida = await self.async_client.get('/async/cursos/?page_size=2')
+        self.assertEqual(repetida['X-Cache'], 'HIT')
+
+    async def test_catalogo_usa_la_paginacion_de_la_api(self):
+        asincrona = (await self.async_client.get('/async/cursos/?page_size=2')).json()
+        sincrona = (await self.async_client.get('/api/cursos/?page_size=2')).json()
+        self.assertEqual(asincrona['results'], sincrona['results'])
+        self.assertIn('cursor=', asincrona['next'])
+        self.assertEqual((await self.async_client.get('/async/cursos/?cursor=invalido')).status_code, 404)
+
+    async def test_catalogo_con_los_filtros_y_la_forma_de_la_api(self):
+        await Curso.objects.filter(pk=(await Curso.objects.afirst()).pk).aupdate(tipo='diplomado')
+        for consulta in ('?tipo=diplomado', '?tipo=curso&expand=docente_id', '?fields=id,nombre'):
+            asincrona = await self.async_client.get(f'/async/cursos/{consulta}')
+            sincrona = await self.async_client.get(f'/api/cursos/{consulta}')
+            self.assertEqual(asincrona.json()['results'], sincrona.json()['results'])
+        self.assertEqual(len((await self.async_client.get('/async/cursos/?tipo=diplomado')).json()['results']), 1)
+        self.assertEqual((await self.async_client.get('/async/cursos/?docente=abc')).status_code, 400)
+
+    async def test_catalogo_con_la_cookie_de_la_primaria_no_usa_la_cache(self):
+        await self.async_client.get('/async/cursos/')
+        await Curso.objects.filter(docente_id=self.docente).aupdate(nombre='Renombrado')  # Sin señales
+        self.async_client.cookies[routers.COOKIE_PRIMARIA] = '1'
+        respuesta = await self.async_client.get('/async/cursos/')
+        self.assertNotIn('X-Cache', respuesta)
+        self.assertEqual({c['nombre'] for c in respuesta.json()['results']}, {'Renombrado'})
@@ -0,0 +1,106 @@
+from django.test import TestCase
+
+from project2024.models import Curso, Inscripcion, Pago
+from .utils import crear_curso, crear_estudiante, crear_inscripcion, crear_pago
+
+
+class BulkInscripcionTests(TestCase):
+    url = '/api/inscripciones/bulk/'
+
+    def setUp(self):
+        self.curso = crear_curso(capacidad=30)
+        self.estudiantes = [crear_estudiante() for _ in range(20)]
+
+    def test_crea_el_lote_con_consultas_constantes(self):
+        filas = [{'estudiante': e.id, 'curso': self.curso.id, 'estado': 'inscrito'} for e in self.estudiantes]
+
+        # Precarga de estudiantes y cursos, reserva de cupos, revisión de cursos por activar, INSERT
+        # y el SAVEPOINT/RELEASE de la transacción del lote (dentro de la transacción de la prueba)
+        with self.assertNumQueries(7):
+            respuesta = self.client.post(self.url, filas, content_type='application/json')
+
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(respuesta.json(), {'creados': 20})
+        self.assertEqual(Inscripcion.objects.count(), 20)
+        self.assertEqual(Curso.objects.get(pk=self.curso.pk).inscritos, 20)
+
+    def test_filas_invalidas_no_escriben_nada(self):
+        filas = [
+            {'estudiante': self.estudiantes[0].id, 'curso': self.curso.id, 'estado': 'inscrito'},
+            {'estudiante': 999999, 'curso': self.curso.id, 'estado': 'inscrito'},
+            {'estudiante': self.estudiantes[1].id, 'curso': self.curso.id, 'estado': 'otro'},
+        ]
+
+        respuesta = self.client.post(self.url, filas, content_type='application/json')
+
+        self.assertEqual(respuesta.status_code, 400)
+        errores = respuesta.json()['errores']
+        self.assertEqual([e['indice'] for e in errores], [1, 2])
+        self.assertIn('estudiante', errores[0]['errores'])
+        self.assertIn('estado', errores[1]['errores'])
+        self.assertFalse(Inscripcion.objects.exists())
+
+    def test_actualiza_y_mueve_inscripciones(self):
+        otro_curso = crear_curso()
+        inscripciones = [crear_inscripcion(e, self.curso) for e in self.estudiantes[:3]]
+        filas = [{'id': i.id, 'curso': otro_curso.id} for i in inscripciones[:2]]
+        filas.append({'id': inscripciones[2].id, 'estado': 'pendiente'})
+
+        respuesta = self.client.patch(self.url, filas, content_type='application/json')
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json(), {'actualizados': 3})
+        self.assertEqual(Curso.objects.get(pk=self.curso.pk).inscritos, 1)
+        self.assertEqual(Curso.objects.get(pk=otro_curso.pk).inscritos, 2)
+        self.assertEqual(Inscripcion.objects.get(pk=inscripciones[2].pk).estado, 'pendiente')
+
+    def test_actualizar_id_inexistente(self):
+        respuesta = self.client.patch(self.url, [{'id': 999999, 'estado': 'pendiente'}],
+                                      content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.json()['errores'][0]['indice'], 0)
+
+    def test_ids_como_texto(self):
+        inscripcion = crear_inscripcion(self.estudiantes[0], self.curso)
+        respuesta = self.client.patch(self.url, [{'id': str(inscripcion.id), 'estado': 'pendiente'}],
+                                      content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertEqual(Inscripcion.objects.get(pk=inscripcion.pk).estado, 'pendiente')
+
+        respuesta = self.client.patch(self.url, [{'id': 'abc', 'estado': 'pendiente'}, {'id': True, 'estado': 'pendiente'}],
+                                      content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual([e['indice'] for e in respuesta.json()['errores']], [0, 1])
+
+
+class BulkPagoTests(TestCase):
+    url = '/api/historial-pagos/bulk/'
+
+    def setUp(self):
+        self.inscripcion = crear_inscripcion(crear_estudiante(), crear_curso())
+
+    def test_crea_pagos_y_valida_monto(self):
+        filas = [
+            {'inscripcion': self.inscripcion.id, 'metodo_pago': 'manual', 'monto': '10.00', 'estado_pago': 'pendiente'},
+            {'inscripcion': self.inscripcion.id, 'metodo_pago': 'manual', 'monto': '0', 'estado_pago': 'pendiente'},
+        ]
+        respuesta = self.client.post(self.url, filas, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.json()['errores'][0]['indice'], 1)
+
+        respuesta = self.client.post(self.url, filas[:1] * 3, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(Pago.objects.filter(inscripcion=self.inscripcion).count(), 3)
+
+    def test_actualiza_pagos(self):
+        pagos = [crear_pago(self.inscripcion) for _ in range(3)]
+        filas = [{'id': p.id, 'monto': '75.00'} for p in pagos]
+
+        respuesta = self.client.patch(self.url, filas, content_type='application/json')
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(set(Pago.objects.values_list('monto', flat=True)), {75})
+
+    def test_rechaza_lo_que_no_es_lista(self):
+        respuesta = self.client.post(self.url, {'monto': '1'}, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
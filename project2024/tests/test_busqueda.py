@@ -0,0 +1,121 @@
+import re
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from project2024 import busqueda
+from project2024.models import Curso, Estudiante, TerminoBusqueda
+from .utils import crear_curso, crear_docente, crear_estudiante, crear_inscripcion
+
+
+class TerminosTests(TestCase):
+    def test_normaliza_acentos_y_mayusculas(self):
+        self.assertEqual(busqueda.palabras('José  PÉREZ-Núñez'), ['jose', 'perez', 'nunez'])
+
+    def test_indexa_prefijos_con_peso_doble_para_la_palabra_completa(self):
+        curso = Curso(nombre='Álgebra', codigo='', descripcion='')
+        terminos = busqueda.terminos('curso', curso)
+        self.assertEqual(terminos['al'], 3)
+        self.assertEqual(terminos['algebra'], 6)
+        self.assertNotIn('a', terminos)
+
+    def test_cedula_tambien_se_indexa_sin_separadores(self):
+        estudiante = Estudiante(nombre_completo='', cedula='001-1234567-8', correo='')
+        self.assertIn('00112345678', busqueda.terminos('usuario', estudiante))
+
+
+class BusquedaTests(TestCase):
+    url = '/api/busqueda/'
+
+    def setUp(self):
+        cache.clear()
+        self.garcia = crear_estudiante(nombre_completo='María García', cedula='001-7654321-0')
+        self.garciela = crear_estudiante(nombre_completo='Garciela Ramos')
+        self.docente = crear_docente(nombre_completo='Pedro Martínez')
+        self.algebra = crear_curso(nombre='Álgebra Lineal', descripcion='Matrices y vectores')
+        self.calculo = crear_curso(nombre='Cálculo', descripcion='Incluye un repaso de álgebra')
+
+    def buscar(self, **parametros):
+        return self.client.get(self.url, parametros).json()
+
+    def test_ordena_por_relevancia(self):
+        # El nombre pesa más que la descripción
+        cursos = self.buscar(q='algebra', tipo='curso')['cursos']
+        self.assertEqual([c['id'] for c in cursos], [self.algebra.id, self.calculo.id])
+        self.assertGreater(cursos[0]['puntaje'], cursos[1]['puntaje'])
+
+    def test_palabra_completa_antes_que_prefijo(self):
+        usuarios = self.buscar(q='garcia', tipo='usuario')['usuarios']
+        self.assertEqual([u['id'] for u in usuarios], [self.garcia.id])
+        usuarios = self.buscar(q='garci', tipo='usuario')['usuarios']
+        self.assertEqual({u['id'] for u in usuarios}, {self.garcia.id, self.garciela.id})
+
+    def test_todas_las_palabras_deben_coincidir(self):
+        usuarios = self.buscar(q='maria garc', tipo='usuario')['usuarios']
+        self.assertEqual([u['id'] for u in usuarios], [self.garcia.id])
+        self.assertEqual(usuarios[0]['rol'], 'estudiante')
+
+    def test_busca_por_cedula_y_correo(self):
+        self.assertEqual(self.buscar(q='00176543', tipo='usuario')['usuarios'][0]['id'], self.garcia.id)
+        self.assertEqual(self.buscar(q=self.docente.correo, tipo='usuario')['usuarios'][0]['id'], self.docente.id)
+
+    def test_busqueda_usa_igualdad_sobre_el_indice(self):
+        for q in ('garcia', 'garcia maria'):
+            with CaptureQueriesContext(connection) as consultas:
+                self.buscar(q=q, tipo='usuario')
+            sqls = [c['sql'] for c in consultas if 'project2024_terminobusqueda' in c['sql']]
+            self.assertTrue(sqls)
+            for sql in sqls:
+                self.assertNotIn('LIKE', sql)
+                if connection.vendor == 'sqlite':
+                    with connection.cursor() as cursor:
+                        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                        plan = [fila[-1] for fila in cursor.fetchall()]
+                    self.assertFalse([d for d in plan if re.match(r'SCAN (project2024_terminobusqueda|U\d)\b', d)], plan)
+
+    def test_tipo_invalido(self):
+        self.assertEqual(self.client.get(self.url, {'q': 'x', 'tipo': 'pago'}).status_code, 400)
+
+    def test_limite_invalido(self):
+        for limite in ('abc', '0', '-5'):
+            self.assertEqual(self.client.get(self.url, {'q': 'x', 'limite': limite}).status_code, 400)
+
+    def test_el_indice_sigue_los_cambios(self):
+        self.garcia.nombre_completo = 'María Fernández'
+        self.garcia.save()
+        self.assertEqual(self.buscar(q='garcia', tipo='usuario')['usuarios'], [])
+        self.assertEqual(self.buscar(q='fernandez', tipo='usuario')['usuarios'][0]['id'], self.garcia.id)
+
+        self.algebra.delete()
+        self.assertFalse(TerminoBusqueda.objects.filter(tipo='curso', objeto_id=self.algebra.id).exists())
+
+    def test_guardar_solo_campos_no_indexados_no_reindexa(self):
+        with self.assertNumQueries(1):
+            self.calculo.save(update_fields=['estado'])
+
+    def test_search_en_los_listados(self):
+        crear_inscripcion(self.garcia, self.calculo)
+        crear_inscripcion(self.garciela, self.algebra)
+
+        estudiantes = self.client.get('/api/estudiantes/', {'search': 'maria'}).json()['results']
+        self.assertEqual([e['id'] for e in estudiantes], [self.garcia.id])
+        cursos = self.client.get('/api/cursos/', {'search': 'lineal'}).json()['results']
+        self.assertEqual([c['id'] for c in cursos], [self.algebra.id])
+
+        # En inscripciones basta con que coincida el curso o el estudiante
+        inscripciones = self.client.get('/api/inscripciones/', {'search': 'calculo'}).json()['results']
+        self.assertEqual([i['estudiante'] for i in inscripciones], [self.garcia.id])
+        inscripciones = self.client.get('/api/inscripciones/', {'search': 'garciela'}).json()['results']
+        self.assertEqual([i['curso'] for i in inscripciones], [self.algebra.id])
+
+    def test_comando_reconstruye_el_indice(self):
+        TerminoBusqueda.objects.all().delete()
+        call_command('indexar_busqueda', stdout=StringIO())
+        self.assertEqual(self.buscar(q='algebra lineal', tipo='curso')['cursos'][0]['id'], self.algebra.id)
+
+    def test_consulta_vacia_no_devuelve_resultados(self):
+        self.assertEqual(self.buscar(q=' ? '), {'cursos': [], 'usuarios': []})
@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from project2024.models import Curso, Docente
+from .utils import crear_curso, crear_docente, crear_estudiante, crear_inscripcion
+
+
+class CacheCatalogoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.curso = crear_curso(nombre='Álgebra')
+
+    def test_segunda_lectura_no_consulta_la_base_de_datos(self):
+        primera = self.client.get('/api/cursos/')
+        self.assertEqual(primera['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            segunda = self.client.get('/api/cursos/')
+
+        self.assertEqual(segunda['X-Cache'], 'HIT')
+        self.assertEqual(segunda.json(), primera.json())
+
+    def test_guardar_un_curso_invalida_el_catalogo(self):
+        self.client.get(f'/api/cursos/{self.curso.id}/')
+
+        curso = Curso.objects.get(pk=self.curso.pk)
+        curso.nombre = 'Álgebra lineal'
+        curso.save()
+
+        respuesta = self.client.get(f'/api/cursos/{self.curso.id}/')
+        self.assertEqual(respuesta['X-Cache'], 'MISS')
+        self.assertEqual(respuesta.json()['nombre'], 'Álgebra lineal')
+
+    def test_cambios_del_docente_invalidan_las_paginas_expandidas(self):
+        docente = crear_docente(nombre_completo='Viejo')
+        Curso.objects.filter(pk=self.curso.pk).update(docente_id=docente)
+        url = '/api/cursos/?expand=docente_id'
+        self.client.get(url)
+
+        docente = Docente.objects.get(pk=docente.pk)
+        docente.nombre_completo = 'Nuevo'
+        docente.save()
+        respuesta = self.client.get(url)
+        self.assertEqual(respuesta['X-Cache'], 'MISS')
+        self.assertEqual(respuesta.json()['results'][0]['docente_id']['nombre_completo'], 'Nuevo')
+
+        docente.delete()
+        self.assertIsNone(self.client.get(url).json()['results'][0]['docente_id'])
+
+    def test_inscripciones_invalidan_el_contador_en_caché(self):
+        self.client.get(f'/api/cursos/{self.curso.id}/')
+        crear_inscripcion(crear_estudiante(), self.curso)
+
+        self.assertEqual(self.client.get(f'/api/cursos/{self.curso.id}/').json()['inscritos'], 1)
+
+    def test_contadores_de_aciertos_y_fallos(self):
+        self.client.get('/api/cursos/')
+        self.client.get('/api/cursos/')
+        self.client.get('/api/cursos/')
+
+        estadisticas = self.client.get('/api/cursos/cache/').json()
+        self.assertEqual(estadisticas['aciertos'], 2)
+        self.assertEqual(estadisticas['fallos'], 1)
@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from project2024.models import Curso, Inscripcion
+from .utils import crear_curso, crear_docente, crear_estudiante, crear_inscripcion
+
+
+class ContadorInscritosTests(TestCase):
+    def setUp(self):
+        self.curso = crear_curso()
+        self.otro_curso = crear_curso()
+
+    def inscritos(self, curso):
+        return Curso.objects.get(pk=curso.pk).inscritos
+
+    def test_crear_y_eliminar_actualizan_el_contador(self):
+        inscripcion = crear_inscripcion(crear_estudiante(), self.curso)
+        crear_inscripcion(crear_estudiante(), self.curso)
+        self.assertEqual(self.inscritos(self.curso), 2)
+
+        inscripcion.delete()
+        self.assertEqual(self.inscritos(self.curso), 1)
+
+        Inscripcion.objects.filter(curso=self.curso).delete()
+        self.assertEqual(self.inscritos(self.curso), 0)
+
+    def test_mover_inscripcion_de_curso(self):
+        inscripcion = crear_inscripcion(crear_estudiante(), self.curso)
+
+        inscripcion = Inscripcion.objects.get(pk=inscripcion.pk)
+        inscripcion.curso = self.otro_curso
+        inscripcion.save()
+
+        self.assertEqual(self.inscritos(self.curso), 0)
+        self.assertEqual(self.inscritos(self.otro_curso), 1)
+
+    def test_guardar_sin_cambiar_curso_no_altera_el_contador(self):
+        inscripcion = crear_inscripcion(crear_estudiante(), self.curso)
+        inscripcion.estado = 'pendiente'
+        inscripcion.save()
+        self.assertEqual(self.inscritos(self.curso), 1)
+
+    def test_guardar_un_curso_leido_antes_no_pisa_el_contador_ni_el_estado(self):
+        docente = crear_docente()
+        curso = crear_curso(capacidad=4, estado='inactivo', docente_id=docente)
+        viejo = Curso.objects.get(pk=curso.pk)
+        crear_inscripcion(crear_estudiante(), curso)
+        crear_inscripcion(crear_estudiante(), curso)  # Llega al 50%: activar_cursos lo activa
+
+        viejo.nombre = 'Renombrado'
+        viejo.save()
+        curso.refresh_from_db()
+        self.assertEqual((curso.nombre, curso.inscritos, curso.estado), ('Renombrado', 2, 'activo'))
+
+        # Lo mismo con una edición por la API y un cambio de estado explícito
+        respuesta = self.client.patch(f'/api/cursos/{curso.pk}/', {'estado': 'inactivo'}, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        curso.refresh_from_db()
+        self.assertEqual((curso.inscritos, curso.estado), (2, 'inactivo'))
+
+    def test_recontar_inscritos_corrige_desviaciones(self):
+        crear_inscripcion(crear_estudiante(), self.curso)
+        Curso.objects.filter(pk=self.curso.pk).update(inscritos=7)
+        Curso.objects.filter(pk=self.otro_curso.pk).update(inscritos=3)
+
+        salida = StringIO()
+        call_command('recontar_inscritos', stdout=salida)
+
+        self.assertIn('2 cursos', salida.getvalue())
+        self.assertEqual(self.inscritos(self.curso), 1)
+        self.assertEqual(self.inscritos(self.otro_curso), 0)
+
+    def test_recontar_invalida_el_catalogo(self):
+        self.assertEqual(self.client.get('/api/cursos/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/api/cursos/')['X-Cache'], 'HIT')
+        Curso.objects.filter(pk=self.curso.pk).update(inscritos=7)
+
+        call_command('recontar_inscritos', '--dry-run', stdout=StringIO())
+        self.assertEqual(self.client.get('/api/cursos/')['X-Cache'], 'HIT')
+        call_command('recontar_inscritos', stdout=StringIO())
+        self.assertEqual(self.client.get('/api/cursos/')['X-Cache'], 'MISS')
@@ -0,0 +1,161 @@
+import threading
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from project2024.models import Curso, CursoLleno, Inscripcion
+from .utils import crear_curso, crear_estudiante, crear_inscripcion
+
+
+class CuposTests(TestCase):
+    url = '/api/inscripciones/'
+
+    def setUp(self):
+        self.curso = crear_curso(capacidad=2)
+        self.ocupadas = [crear_inscripcion(crear_estudiante(), self.curso) for _ in range(2)]
+
+    def inscritos(self, curso):
+        return Curso.objects.get(pk=curso.pk).inscritos
+
+    def inscribir(self, **extra):
+        datos = {'estudiante': crear_estudiante().id, 'curso': self.curso.id, 'estado': 'inscrito', **extra}
+        return self.client.post(self.url, datos, content_type='application/json')
+
+    def test_curso_lleno_se_rechaza(self):
+        with self.assertRaises(CursoLleno):
+            crear_inscripcion(crear_estudiante(), self.curso)
+
+        respuesta = self.inscribir()
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertEqual(respuesta.json()['cursos'], [self.curso.id])
+        self.assertEqual(Inscripcion.objects.filter(curso=self.curso).count(), 2)
+        self.assertEqual(self.inscritos(self.curso), 2)
+
+    def test_lista_de_espera_y_promocion_por_orden_de_llegada(self):
+        primera = self.inscribir(lista_espera=True)
+        segunda = self.inscribir(lista_espera=True)
+        self.assertEqual(primera.status_code, 201, primera.content)
+        self.assertEqual((primera.json()['estado'], segunda.json()['estado']), ('espera', 'espera'))
+        self.assertEqual(self.inscritos(self.curso), 2)
+
+        self.ocupadas[0].delete()
+        self.assertEqual(Inscripcion.objects.get(pk=primera.json()['id']).estado, 'inscrito')
+        self.assertEqual(Inscripcion.objects.get(pk=segunda.json()['id']).estado, 'espera')
+        self.assertEqual(self.inscritos(self.curso), 2)
+
+        # Mover una inscripción a otro curso también libera su cupo
+        self.ocupadas[1].curso = crear_curso()
+        self.ocupadas[1].save()
+        self.assertEqual(Inscripcion.objects.get(pk=segunda.json()['id']).estado, 'inscrito')
+
+        # Borrar una inscripción en espera no descuenta cupos
+        tercera = self.inscribir(lista_espera=True).json()
+        Inscripcion.objects.get(pk=tercera['id']).delete()
+        self.assertEqual(self.inscritos(self.curso), 2)
+
+    def test_borrados_en_cascada_y_por_queryset_promueven_la_lista_de_espera(self):
+        primera = crear_inscripcion(crear_estudiante(), self.curso, estado='espera')
+        segunda = crear_inscripcion(crear_estudiante(), self.curso, estado='espera')
+
+        respuesta = self.client.delete(f'/api/estudiantes/{self.ocupadas[0].estudiante_id}/')
+        self.assertEqual(respuesta.status_code, 204)
+        self.assertEqual(Inscripcion.objects.get(pk=primera.pk).estado, 'inscrito')
+        self.assertEqual(self.inscritos(self.curso), 2)
+
+        Inscripcion.objects.filter(pk=self.ocupadas[1].pk).delete()
+        self.assertEqual(Inscripcion.objects.get(pk=segunda.pk).estado, 'inscrito')
+        self.assertEqual(self.inscritos(self.curso), 2)
+
+    def test_salir_de_la_espera_requiere_cupo(self):
+        en_espera = crear_inscripcion(crear_estudiante(), self.curso, estado='espera')
+        en_espera.estado = 'pendiente'
+        with self.assertRaises(CursoLleno):
+            en_espera.save()
+        self.assertEqual(Inscripcion.objects.get(pk=en_espera.pk).estado, 'espera')
+
+        self.ocupadas[0].estado = 'espera'
+        self.ocupadas[0].save()
+        self.assertEqual(Inscripcion.objects.get(pk=en_espera.pk).estado, 'inscrito')
+        self.assertEqual(self.inscritos(self.curso), 2)
+
+    def test_lote_que_excede_la_capacidad_no_escribe_nada(self):
+        otro = crear_curso(capacidad=5)
+        filas = [{'estudiante': crear_estudiante().id, 'curso': otro.id, 'estado': 'inscrito'} for _ in range(3)]
+        filas.append({'estudiante': crear_estudiante().id, 'curso': self.curso.id, 'estado': 'inscrito'})
+
+        respuesta = self.client.post(f'{self.url}bulk/', filas, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertEqual(respuesta.json()['cursos'], [self.curso.id])
+        self.assertEqual(self.inscritos(otro), 0)
+        self.assertFalse(Inscripcion.objects.filter(curso=otro).exists())
+
+        filas[-1]['estado'] = 'espera'
+        respuesta = self.client.post(f'{self.url}bulk/', filas, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual((self.inscritos(otro), self.inscritos(self.curso)), (3, 2))
+
+        # PATCH de lote: mover y pasar a espera liberan dos cupos; uno lo toma la inscripción en espera
+        respuesta = self.client.patch(f'{self.url}bulk/', [{'id': self.ocupadas[0].id, 'curso': otro.id},
+                                                           {'id': self.ocupadas[1].id, 'estado': 'espera'}],
+                                      content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertEqual((self.inscritos(otro), self.inscritos(self.curso)), (4, 1))
+        self.assertEqual(
+            set(Inscripcion.objects.filter(curso=self.curso).values_list('estudiante_id', 'estado')),
+            {(self.ocupadas[1].estudiante_id, 'espera'), (filas[-1]['estudiante'], 'inscrito')},
+        )
+
+    def test_capacidad_cero_no_limita(self):
+        curso = crear_curso(capacidad=0)
+        for _ in range(3):
+            crear_inscripcion(crear_estudiante(), curso)
+        self.assertEqual(self.inscritos(curso), 3)
+
+    def test_recontar_ignora_la_lista_de_espera(self):
+        crear_inscripcion(crear_estudiante(), self.curso, estado='espera')
+        salida = StringIO()
+        call_command('recontar_inscritos', '--dry-run', stdout=salida)
+        self.assertIn('Cursos con contador desviado: 0', salida.getvalue())
+
+
+class InscripcionesConcurrentesTests(TransactionTestCase):
+    def test_sin_sobreventa(self):
+        curso = crear_curso(capacidad=5)
+        estudiantes = [crear_estudiante() for _ in range(24)]
+        resultados = []
+        barrera = threading.Barrier(8)
+
+        def inscribir(porcion):
+            barrera.wait()
+            try:
+                for estudiante in porcion:
+                    try:
+                        Inscripcion.objects.create(estudiante=estudiante, curso=curso, estado='inscrito')
+                        resultados.append(True)
+                    except CursoLleno:
+                        resultados.append(False)
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=inscribir, args=(estudiantes[n::8],)) for n in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(len(resultados), 24)
+        self.assertEqual(resultados.count(True), 5)
+        self.assertEqual(Inscripcion.objects.filter(curso=curso).count(), 5)
+        self.assertEqual(Curso.objects.get(pk=curso.pk).inscritos, 5)
+
+    def test_comando_de_carga(self):
+        for _ in range(10):
+            crear_estudiante()
+        salida = StringIO()
+        call_command('benchmark_inscripciones', '--hilos', '4', '--estudiantes', '10', '--capacidad', '3',
+                     '--lista-espera', stdout=salida)
+        self.assertIn('Inscritas: 6, en espera: 14, rechazadas: 0, errores: 0', salida.getvalue())
+        self.assertIn('Sin sobreventa', salida.getvalue())
+        self.assertFalse(Curso.objects.filter(profesor='Benchmark').exists())
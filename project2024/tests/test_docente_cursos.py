@@ -0,0 +1,132 @@
+import importlib
+from io import StringIO
+
+from django.apps import apps
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from project2024 import notificaciones
+from project2024.models import Curso, Notificacion
+from .test_notificaciones import BackendDePrueba
+from .utils import crear_curso, crear_docente, crear_estudiante, crear_inscripcion
+
+
+class DocenteCursoViewTests(TestCase):
+    def setUp(self):
+        self.docente = crear_docente()
+
+    def test_docente_inexistente_devuelve_404(self):
+        respuesta = self.client.get('/docente/999999/cursos/')
+        self.assertEqual(respuesta.status_code, 404)
+
+    def test_ocupacion_calculada_por_curso(self):
+        un_cuarto = crear_curso(docente_id=self.docente, capacidad=4)
+        crear_inscripcion(crear_estudiante(), un_cuarto)
+        sin_capacidad = crear_curso(docente_id=self.docente, capacidad=0)
+
+        respuesta = self.client.get(f'/docente/{self.docente.id}/cursos/')
+
+        self.assertEqual(respuesta.status_code, 200)
+        datos = {c['id']: c for c in respuesta.json()}
+        self.assertEqual(datos[un_cuarto.id]['cantidad_inscritos'], 1)
+        self.assertEqual(datos[un_cuarto.id]['cupos_disponibles'], 3)
+        self.assertEqual(datos[un_cuarto.id]['porcentaje_ocupacion'], 25.0)
+        self.assertEqual(datos[un_cuarto.id]['docente'], self.docente.nombre_completo)
+        self.assertEqual(datos[sin_capacidad.id]['cantidad_inscritos'], 0)
+        self.assertEqual(datos[sin_capacidad.id]['porcentaje_ocupacion'], 0)
+
+    def test_activa_curso_al_inscribir_y_el_get_solo_lee(self):
+        curso = crear_curso(docente_id=self.docente, capacidad=4, estado='inactivo')
+        crear_inscripcion(crear_estudiante(), curso)
+        self.assertEqual(Curso.objects.get(id=curso.id).estado, 'inactivo')
+
+        # La inscripción que llega al 50% activa el curso y deja el aviso en la bandeja de salida
+        crear_inscripcion(crear_estudiante(), curso)
+        self.assertEqual(Curso.objects.get(id=curso.id).estado, 'activo')
+        aviso = Notificacion.objects.get(tipo_notificacion='curso_activado')
+        self.assertEqual((aviso.usuario_id, aviso.estado), (self.docente.id, 'pendiente'))
+        self.assertEqual(len(mail.outbox), 0)
+
+        crear_inscripcion(crear_estudiante(), curso)
+        self.assertEqual(Notificacion.objects.filter(tipo_notificacion='curso_activado').count(), 1)
+
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(f'/docente/{self.docente.id}/cursos/')
+        self.assertEqual(respuesta.json()[0]['estado'], 'activo')
+        self.assertTrue(all(c['sql'].startswith('SELECT') for c in consultas))
+
+        # El correo lo envía el despachador, fuera de la petición
+        notificaciones.despachar()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, f'Curso {curso.nombre} listo para pagos')
+        self.assertEqual(mail.outbox[0].to, [self.docente.correo])
+        self.assertIn('Cantidad de inscritos: 2.', mail.outbox[0].body)
+
+    def test_el_smtp_caido_no_afecta_la_inscripcion_ni_el_get(self):
+        curso = crear_curso(docente_id=self.docente, capacidad=2, estado='inactivo')
+        with self.settings(EMAIL_BACKEND='project2024.tests.test_notificaciones.BackendDePrueba'):
+            BackendDePrueba.rechazar = {self.docente.correo}
+            try:
+                respuesta = self.client.post('/api/inscripciones/', {
+                    'estudiante': crear_estudiante().id, 'curso': curso.id, 'estado': 'inscrito',
+                }, content_type='application/json')
+                self.assertEqual(respuesta.status_code, 201)
+                self.assertEqual(self.client.get(f'/docente/{self.docente.id}/cursos/').status_code, 200)
+                self.assertEqual(notificaciones.despachar_lote(), (0, 1))
+            finally:
+                BackendDePrueba.rechazar = set()
+        self.assertEqual(Curso.objects.get(id=curso.id).estado, 'activo')
+        self.assertEqual(Notificacion.objects.get(tipo_notificacion='curso_activado').intentos, 1)
+
+    def test_cantidad_de_consultas_no_depende_de_cursos(self):
+        for _ in range(2):
+            crear_inscripcion(crear_estudiante(), crear_curso(docente_id=self.docente))
+        with self.assertNumQueries(2):
+            self.client.get(f'/docente/{self.docente.id}/cursos/')
+
+        for _ in range(40):
+            crear_inscripcion(crear_estudiante(), crear_curso(docente_id=self.docente))
+        with self.assertNumQueries(2):
+            respuesta = self.client.get(f'/docente/{self.docente.id}/cursos/')
+        self.assertEqual(len(respuesta.json()), 42)
+
+    def cursos_sobre_el_umbral(self):
+        # Contadores que llegaron al umbral sin pasar por la inscripción (carga masiva, recuento)
+        con_docente = crear_curso(docente_id=self.docente, capacidad=4, estado='inactivo')
+        sin_docente = crear_curso(capacidad=10, estado='inactivo')
+        bajo_el_umbral = crear_curso(docente_id=self.docente, capacidad=10, estado='inactivo')
+        Curso.objects.filter(pk__in=[con_docente.pk, sin_docente.pk]).update(inscritos=5)
+        Curso.objects.filter(pk=bajo_el_umbral.pk).update(inscritos=4)
+        return con_docente, sin_docente, bajo_el_umbral
+
+    def test_comando_activa_los_cursos_que_ya_superan_el_umbral(self):
+        con_docente, sin_docente, bajo_el_umbral = self.cursos_sobre_el_umbral()
+        salida = StringIO()
+        call_command('activar_cursos', '--dry-run', stdout=salida)
+        self.assertIn('Cursos por activar: 2', salida.getvalue())
+        self.assertFalse(Curso.objects.filter(estado='activo').exists())
+
+        salida = StringIO()
+        call_command('activar_cursos', lote=1, stdout=salida)
+        self.assertIn('Cursos activados: 2', salida.getvalue())
+        estados = dict(Curso.objects.values_list('pk', 'estado'))
+        self.assertEqual([estados[c.pk] for c in (con_docente, sin_docente, bajo_el_umbral)], ['activo', 'activo', 'inactivo'])
+        aviso = Notificacion.objects.get(tipo_notificacion='curso_activado')
+        self.assertEqual((aviso.usuario_id, aviso.estado), (self.docente.id, 'pendiente'))
+
+        # Repetirlo no duplica avisos
+        call_command('activar_cursos', stdout=StringIO())
+        self.assertEqual(Notificacion.objects.filter(tipo_notificacion='curso_activado').count(), 1)
+
+    def test_la_migracion_0017_activa_y_deja_el_aviso(self):
+        con_docente, _, bajo_el_umbral = self.cursos_sobre_el_umbral()
+        migracion = importlib.import_module('project2024.migrations.0017_notificacion_asunto')
+        migracion.activar_cursos_pendientes(apps, None)
+        self.assertEqual(Curso.objects.filter(estado='activo').count(), 2)
+        self.assertEqual(Curso.objects.get(pk=bajo_el_umbral.pk).estado, 'inactivo')
+        aviso = Notificacion.objects.get(tipo_notificacion='curso_activado')
+        self.assertEqual(aviso.usuario_id, self.docente.id)
+        self.assertIn(con_docente.nombre, aviso.asunto)
@@ -0,0 +1,171 @@
+import threading
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from project2024.models import EstadoDesactualizado, HistorialPago, Pago, TransicionInvalida
+from .utils import crear_curso, crear_estudiante, crear_inscripcion, crear_pago
+
+
+class EstadosDePagoTests(TestCase):
+    # Ojo: el router publica PagoViewSet en historial-pagos/
+    url = '/api/historial-pagos/'
+
+    def setUp(self):
+        self.inscripcion = crear_inscripcion(crear_estudiante(), crear_curso())
+        self.pago = crear_pago(self.inscripcion)
+
+    def cambiar(self, pago, **datos):
+        return self.client.patch(f'{self.url}{pago.id}/change_status/', datos, content_type='application/json')
+
+    def estados(self, pago):
+        return list(HistorialPago.objects.filter(pago=pago).order_by('id').values_list(
+            'estado_pago_anterior', 'estado_pago_nuevo'
+        ))
+
+    def test_transicion_con_estado_esperado_sin_lecturas_previas(self):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.cambiar(self.pago, estado_pago='parcial', estado_anterior='pendiente', comentario='Abono')
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertEqual(respuesta.json()['estado_pago'], 'parcial')
+
+        # UPDATE condicional, lectura de lo cambiado, resumen de ingresos (un upsert con los dos
+        # estados) e historial
+        sentencias = [c['sql'].split()[0] for c in consultas if not c['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertEqual(sentencias, ['UPDATE', 'SELECT', 'INSERT', 'INSERT'])
+        self.pago.refresh_from_db()
+        self.assertEqual(self.pago.estado_pago, 'parcial')
+        self.assertEqual(self.estados(self.pago), [('pendiente', 'parcial')])
+        self.assertEqual(HistorialPago.objects.get(pago=self.pago).comentario, 'Abono')
+
+    def test_sin_estado_esperado_se_lee_el_actual(self):
+        self.assertEqual(self.cambiar(self.pago, estado_pago='completado').status_code, 200)
+        self.assertEqual(self.estados(self.pago), [('pendiente', 'completado')])
+
+    def test_transiciones_no_permitidas(self):
+        completado = crear_pago(self.inscripcion, estado_pago='completado')
+        respuesta = self.cambiar(completado, estado_pago='pendiente')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('completado', respuesta.json()['error'])
+        self.assertEqual(self.cambiar(self.pago, estado_pago='pagado').status_code, 400)
+        self.assertEqual(self.cambiar(self.pago, estado_pago='pendiente').status_code, 400)
+        self.assertFalse(HistorialPago.objects.exists())
+
+    def test_estado_esperado_desactualizado_devuelve_409(self):
+        Pago.cambiar_estado(self.pago.id, 'parcial')
+        respuesta = self.cambiar(self.pago, estado_pago='completado', estado_anterior='pendiente')
+        self.assertEqual(respuesta.status_code, 409)
+        self.pago.refresh_from_db()
+        self.assertEqual(self.pago.estado_pago, 'parcial')
+        self.assertEqual(self.estados(self.pago), [('pendiente', 'parcial')])
+
+    def test_pago_inexistente(self):
+        self.assertEqual(self.client.patch(f'{self.url}999999/change_status/', {'estado_pago': 'parcial'},
+                                           content_type='application/json').status_code, 404)
+        # Con el estado esperado el UPDATE condicional tampoco encuentra la fila: sigue siendo 404
+        respuesta = self.cambiar(Pago(id=999999), estado_pago='parcial', estado_anterior='pendiente')
+        self.assertEqual(respuesta.status_code, 404)
+
+    def test_patch_del_pago_pasa_por_la_maquina_de_estados(self):
+        url = f'{self.url}{self.pago.id}/'
+        respuesta = self.client.patch(url, {'estado_pago': 'completado', 'monto': '75.00'}, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.pago.refresh_from_db()
+        self.assertEqual((self.pago.estado_pago, str(self.pago.monto)), ('completado', '75.00'))
+        self.assertEqual(self.estados(self.pago), [('pendiente', 'completado')])
+
+        respuesta = self.client.patch(url, {'estado_pago': 'parcial'}, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('estado_pago', respuesta.json())
+
+    def test_bulk_patch_registra_el_historial_y_valida_cada_fila(self):
+        otro = crear_pago(self.inscripcion)
+        completado = crear_pago(self.inscripcion, estado_pago='completado')
+        url = f'{self.url}bulk/'
+
+        respuesta = self.client.patch(url, [
+            {'id': self.pago.id, 'estado_pago': 'parcial'},
+            {'id': completado.id, 'estado_pago': 'pendiente'},
+        ], content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual([error['indice'] for error in respuesta.json()['errores']], [1])
+
+        respuesta = self.client.patch(url, [
+            {'id': self.pago.id, 'estado_pago': 'parcial', 'monto': '20.00'},
+            {'id': otro.id, 'estado_pago': 'completado'},
+            {'id': completado.id, 'monto': '99.00'},
+        ], content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertEqual(self.estados(self.pago), [('pendiente', 'parcial')])
+        self.assertEqual(self.estados(otro), [('pendiente', 'completado')])
+        self.assertEqual(self.estados(completado), [])
+        self.assertEqual(str(Pago.objects.get(pk=self.pago.pk).monto), '20.00')
+
+    def test_cambiar_estados_es_todo_o_nada(self):
+        otro = crear_pago(self.inscripcion, estado_pago='parcial')
+        with self.assertRaises(EstadoDesactualizado):
+            Pago.cambiar_estados([(self.pago.id, 'pendiente', 'parcial'), (otro.id, 'pendiente', 'completado')])
+        self.assertEqual(Pago.objects.get(pk=self.pago.pk).estado_pago, 'pendiente')
+        self.assertFalse(HistorialPago.objects.exists())
+        with self.assertRaises(TransicionInvalida):
+            Pago.cambiar_estados([(otro.id, 'parcial', 'pendiente')])
+
+    def test_historial_con_ids_sin_returning_en_el_insert_masivo(self):
+        # Como en MySQL, donde un INSERT de varias filas no devuelve sus ids
+        otro = crear_pago(self.inscripcion)
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            historial = Pago.cambiar_estados([(otro.id, 'pendiente', 'parcial'), (self.pago.id, 'pendiente', 'completado')])
+        self.assertEqual(
+            [(cambio.pk, cambio.pago_id) for cambio in historial],
+            list(HistorialPago.objects.order_by('pk').values_list('pk', 'pago_id')),
+        )
+        self.assertEqual([cambio.pago_id for cambio in historial], [otro.id, self.pago.id])
+
+    def test_put_del_historial_pasa_por_la_maquina_de_estados(self):
+        historial = Pago.cambiar_estado(self.pago.id, 'parcial')
+        url = f'/api/pagos/{historial.id}/'
+        datos = {
+            'pago': {'inscripcion': self.inscripcion.id, 'metodo_pago': 'manual', 'monto': '60.00',
+                     'estado_pago': 'completado'},
+            'estado_pago_anterior': 'pendiente', 'estado_pago_nuevo': 'parcial', 'comentario': 'Corregido',
+        }
+        respuesta = self.client.put(url, datos, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.pago.refresh_from_db()
+        self.assertEqual((self.pago.estado_pago, str(self.pago.monto)), ('completado', '60.00'))
+        self.assertEqual(self.estados(self.pago), [('pendiente', 'parcial'), ('parcial', 'completado')])
+
+        datos['pago']['estado_pago'] = 'pendiente'
+        self.assertEqual(self.client.put(url, datos, content_type='application/json').status_code, 400)
+        self.assertEqual(Pago.objects.get(pk=self.pago.pk).estado_pago, 'completado')
+
+
+class CajerosConcurrentesTests(TransactionTestCase):
+    def test_solo_un_cajero_gana(self):
+        pago = crear_pago(crear_inscripcion(crear_estudiante(), crear_curso()))
+        resultados = []
+        barrera = threading.Barrier(4)
+
+        def cajero(nuevo):
+            barrera.wait()
+            try:
+                Pago.cambiar_estado(pago.id, nuevo, anterior='pendiente')
+                resultados.append(nuevo)
+            except EstadoDesactualizado:
+                resultados.append(None)
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=cajero, args=(nuevo,)) for nuevo in ('parcial', 'completado') * 2]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(len(resultados), 4)
+        ganadores = [nuevo for nuevo in resultados if nuevo]
+        self.assertEqual(len(ganadores), 1)
+        self.assertEqual(Pago.objects.get(pk=pago.pk).estado_pago, ganadores[0])
+        self.assertEqual(HistorialPago.objects.filter(pago=pago).count(), 1)
@@ -0,0 +1,172 @@
+import asyncio
+import datetime
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from project2024 import eventos
+from project2024.models import Evento, Inscripcion, Pago
+from .utils import crear_curso, crear_estudiante, crear_inscripcion, crear_pago
+
+
+class EventosTests(TestCase):
+    url = '/async/eventos/'
+
+    def setUp(self):
+        self.canal = eventos.Canal(hilo=False)  # La tabla se sondea en escribir()
+        parche = mock.patch.object(eventos, 'canal', self.canal)
+        parche.start()
+        self.addCleanup(parche.stop)
+        self.curso = crear_curso(capacidad=0)
+        self.estudiante = crear_estudiante()
+        self.otro = crear_estudiante()
+
+    async def abrir(self, consulta='', **headers):
+        respuesta = await self.async_client.get(f'{self.url}{consulta}', headers=headers)
+        self.assertEqual(respuesta['Content-Type'], 'text/event-stream')
+        flujo = aiter(respuesta.streaming_content)
+        self.assertEqual(await anext(flujo), b'retry: 3000\n\n')  # Al recibir esto ya está suscrito
+        return flujo
+
+    async def leer(self, flujo):
+        campos = {}
+        for linea in (await asyncio.wait_for(anext(flujo), 2)).decode().strip().split('\n'):
+            campo, _, valor = linea.partition(': ')
+            campos[campo] = json.loads(valor) if campo == 'data' else valor
+        return campos
+
+    async def desconectar(self, flujo):
+        # Como el servidor ASGI cuando el cliente se va: cancela la tarea que espera el siguiente evento
+        tarea = asyncio.ensure_future(anext(flujo))
+        await asyncio.sleep(0)
+        tarea.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await tarea
+
+    async def escribir(self, funcion, *args, **kwargs):
+        def confirmar():
+            with self.captureOnCommitCallbacks(execute=True):
+                resultado = funcion(*args, **kwargs)
+            self.canal.sondear()
+            return resultado
+        return await sync_to_async(confirmar)()
+
+    async def test_filtra_por_estudiante_y_publica_los_cambios_de_estado(self):
+        flujo = await self.abrir(f'?estudiante={self.estudiante.id}')
+        await self.escribir(crear_inscripcion, self.otro, self.curso)
+        inscripcion = await self.escribir(crear_inscripcion, self.estudiante, self.curso)
+        pago = await self.escribir(crear_pago, inscripcion, monto='50.00')
+        await self.escribir(Pago.cambiar_estado, pago.id, 'completado')
+
+        evento = await self.leer(flujo)
+        self.assertEqual((evento['event'], evento['data']['accion']), ('inscripcion', 'creado'))
+        self.assertEqual(evento['data']['estudiante'], self.estudiante.id)
+        evento = await self.leer(flujo)
+        self.assertEqual(evento['event'], 'pago')
+        self.assertEqual((evento['data']['monto'], evento['data']['curso']), ('50.00', self.curso.id))
+        self.assertEqual([(e['event'], e['data']['accion']) for e in [await self.leer(flujo), await self.leer(flujo)]],
+                         [('pago', 'actualizado'), ('historial_pago', 'creado')])
+
+    async def test_reanuda_con_last_event_id(self):
+        flujo = await self.abrir(f'?curso={self.curso.id}')
+        inscripcion = await self.escribir(crear_inscripcion, self.estudiante, self.curso)
+        ultimo = (await self.leer(flujo))['id']
+        await self.desconectar(flujo)
+        self.assertFalse(self.canal._suscripciones)
+
+        # Cambios mientras el cliente está desconectado
+        await self.escribir(crear_pago, inscripcion)
+        await self.escribir(lambda: crear_inscripcion(self.otro, crear_curso(capacidad=0)))
+        await self.escribir(lambda: Inscripcion.objects.get(pk=inscripcion.pk).delete())
+
+        flujo = await self.abrir(f'?curso={self.curso.id}', **{'Last-Event-ID': ultimo})
+        eventos_perdidos = [await self.leer(flujo) for _ in range(3)]
+        self.assertEqual([(e['event'], e['data']['accion']) for e in eventos_perdidos],
+                         [('pago', 'creado'), ('pago', 'eliminado'), ('inscripcion', 'eliminado')])
+
+        # Un id que no es de la tabla, o cuyos eventos siguientes ya se borraron, no se puede reanudar
+        flujo = await self.abrir(**{'Last-Event-ID': 'otro-1'})
+        self.assertEqual((await self.leer(flujo))['event'], 'reinicio')
+        await sync_to_async(Evento.objects.filter(pk__lte=int(ultimo) + 1).delete)()
+        flujo = await self.abrir(**{'Last-Event-ID': ultimo})
+        self.assertEqual((await self.leer(flujo))['event'], 'reinicio')
+
+    async def test_otro_proceso_recibe_los_cambios(self):
+        # Cada worker tiene su Canal: lo que escribe uno llega a las conexiones de los demás
+        flujo = await self.abrir(f'?curso={self.curso.id}')
+        otro_proceso = eventos.Canal(hilo=False)
+        suscripcion = eventos.Suscripcion(asyncio.get_running_loop(), curso_id=self.curso.id)
+        await sync_to_async(otro_proceso.suscribir)(suscripcion)
+
+        inscripcion = await self.escribir(crear_inscripcion, self.estudiante, self.curso)
+        self.assertEqual(await sync_to_async(otro_proceso.sondear)(), 1)
+        recibido = await asyncio.wait_for(suscripcion.cola.get(), 2)
+        self.assertEqual((recibido.tipo, recibido.datos['id']), ('inscripcion', inscripcion.id))
+        self.assertEqual((await self.leer(flujo))['id'], str(recibido.id))
+
+    async def test_lotes(self):
+        flujo = await self.abrir()
+        filas = [{'inscripcion': (await self.escribir(crear_inscripcion, self.estudiante, self.curso)).id,
+                  'metodo_pago': 'manual', 'monto': '10.00', 'estado_pago': 'pendiente'}]
+        await self.leer(flujo)
+
+        respuesta = await self.escribir(self.client.post, '/api/historial-pagos/bulk/', filas * 2,
+                                        content_type='application/json')
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual([(await self.leer(flujo))['data']['accion'] for _ in range(2)], ['creado', 'creado'])
+
+    def test_lotes_sin_ids_del_insert(self):
+        # Como en MySQL, bulk_create no devuelve los ids: se releen para publicar los eventos
+        inscripcion = crear_inscripcion(self.estudiante, self.curso)
+        crear_pago(inscripcion)
+        filas = [{'inscripcion': inscripcion.id, 'metodo_pago': 'manual', 'monto': monto, 'estado_pago': 'pendiente'}
+                 for monto in ('10.00', '20.00')]
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False), \
+                mock.patch.object(eventos, 'publicar') as publicar:
+            self.assertEqual(self.client.post('/api/historial-pagos/bulk/', filas,
+                                              content_type='application/json').status_code, 201)
+            self.assertEqual(self.client.post('/api/inscripciones/bulk/', [
+                {'estudiante': self.otro.id, 'curso': self.curso.id, 'estado': 'inscrito'},
+            ], content_type='application/json').status_code, 201)
+
+        publicados = [
+            (tipo, datos['id']) for llamada in publicar.call_args_list
+            for tipo, _, datos, _, _ in (llamada.args[0]() if callable(llamada.args[0]) else llamada.args[0])
+        ]
+        pagos = list(Pago.objects.filter(monto__in=['10.00', '20.00']).order_by('monto').values_list('pk', flat=True))
+        self.assertEqual(publicados, [('pago', pagos[0]), ('pago', pagos[1]),
+                                      ('inscripcion', Inscripcion.objects.get(estudiante=self.otro).pk)])
+
+    def test_espera_los_ids_sin_confirmar(self):
+        posicion = Evento.objects.create(tipo='pago', accion='creado', datos={}).pk
+        suscripcion = eventos.Suscripcion(mock.Mock())
+        self.canal.suscribir(suscripcion)
+        Evento.objects.create(pk=posicion + 1, tipo='pago', accion='creado', datos={})
+        Evento.objects.create(pk=posicion + 3, tipo='pago', accion='creado', datos={})
+
+        # El id siguiente puede ser de una transacción que todavía no confirma
+        self.assertEqual(self.canal.sondear(), 1)
+        self.assertEqual(self.canal.sondear(), 0)
+        Evento.objects.create(pk=posicion + 2, tipo='pago', accion='creado', datos={})
+        self.assertEqual(self.canal.sondear(), 2)
+        self.assertEqual(suscripcion.loop.call_soon_threadsafe.call_count, 3)
+
+        # Un hueco que no se llena se salta pasada la espera
+        Evento.objects.create(pk=posicion + 5, tipo='pago', accion='creado', datos={})
+        self.assertEqual(self.canal.sondear(), 0)
+        with self.settings(EVENTOS_ESPERA_HUECO_SEGUNDOS=0):
+            self.assertEqual(self.canal.sondear(), 1)
+
+    def test_los_eventos_vencidos_se_borran(self):
+        viejo = Evento.objects.create(tipo='pago', accion='creado', datos={})
+        Evento.objects.filter(pk=viejo.pk).update(fecha=timezone.now() - datetime.timedelta(hours=1))
+        with mock.patch.object(eventos, '_proxima_limpieza', 0.0), self.captureOnCommitCallbacks(execute=True):
+            crear_pago(crear_inscripcion(self.estudiante, self.curso))
+        self.assertEqual(list(Evento.objects.values_list('tipo', flat=True)), ['inscripcion', 'pago'])
+
+    def test_requiere_asgi(self):
+        self.assertEqual(self.client.get(self.url).status_code, 501)
@@ -0,0 +1,70 @@
+import datetime
+import json
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from project2024.models import HistorialPago, Pago
+from project2024.views import PagoViewSet
+from .utils import crear_curso, crear_estudiante, crear_inscripcion, crear_pago
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.curso = crear_curso()
+        self.otro_curso = crear_curso()
+        inscripcion = crear_inscripcion(crear_estudiante(), self.curso)
+        otra_inscripcion = crear_inscripcion(crear_estudiante(), self.otro_curso)
+        self.pendiente = crear_pago(inscripcion)
+        self.completado = crear_pago(inscripcion, estado_pago='completado')
+        self.de_otro_curso = crear_pago(otra_inscripcion)
+        HistorialPago.objects.create(pago=self.pendiente, estado_pago_anterior='parcial', estado_pago_nuevo='pendiente')
+
+    def contenido(self, respuesta):
+        self.assertEqual(respuesta.status_code, 200)
+        return b''.join(respuesta.streaming_content).decode()
+
+    def test_csv_de_pagos_filtrado(self):
+        respuesta = self.client.get(f'/api/historial-pagos/export/?estado_pago=pendiente&curso={self.curso.id}')
+
+        self.assertEqual(respuesta['Content-Type'], 'text/csv')
+        lineas = self.contenido(respuesta).splitlines()
+        self.assertTrue(lineas[0].startswith('id,inscripcion_id'))
+        self.assertEqual(len(lineas), 2)
+        self.assertTrue(lineas[1].startswith(f'{self.pendiente.id},'))
+
+    def test_ndjson_de_historial(self):
+        respuesta = self.client.get('/api/pagos/export/?formato=ndjson')
+
+        filas = [json.loads(linea) for linea in self.contenido(respuesta).splitlines()]
+        self.assertEqual([f['pago_id'] for f in filas], [self.pendiente.id])
+
+    def test_rango_de_fechas(self):
+        Pago.objects.filter(pk=self.completado.pk).update(fecha_pago=timezone.now() - datetime.timedelta(days=30))
+        hoy = timezone.now().date().isoformat()
+
+        respuesta = self.client.get(f'/api/historial-pagos/export/?formato=ndjson&desde={hoy}&hasta={hoy}')
+
+        ids = {json.loads(linea)['id'] for linea in self.contenido(respuesta).splitlines()}
+        self.assertEqual(ids, {self.pendiente.id, self.de_otro_curso.id})
+
+    def test_inscripciones_por_curso(self):
+        respuesta = self.client.get(f'/api/inscripciones/export/?curso={self.otro_curso.id}')
+        self.assertEqual(len(self.contenido(respuesta).splitlines()), 2)
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.client.get('/api/inscripciones/export/?formato=xml').status_code, 400)
+        self.assertEqual(self.client.get('/api/inscripciones/export/?desde=ayer').status_code, 400)
+
+    def test_lee_por_lotes_sobre_la_clave_primaria(self):
+        with mock.patch.object(PagoViewSet, 'export_chunk_size', 2), CaptureQueriesContext(connection) as consultas:
+            contenido = self.contenido(self.client.get('/api/historial-pagos/export/?formato=ndjson'))
+        ids = [json.loads(linea)['id'] for linea in contenido.splitlines()]
+        self.assertEqual(ids, sorted([self.pendiente.id, self.completado.id, self.de_otro_curso.id]))
+        lotes = [c['sql'] for c in consultas if 'FROM "project2024_pago"' in c['sql']]
+        self.assertEqual(len(lotes), 2)
+        self.assertTrue(all('LIMIT 2' in sql for sql in lotes))
+        self.assertIn(f'"project2024_pago"."id" > {ids[1]}', lotes[1])
@@ -0,0 +1,76 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from project2024.filtros import inicio_del_dia
+from project2024.models import HistorialPago, Pago
+from .utils import crear_curso, crear_docente, crear_estudiante, crear_inscripcion, crear_pago
+
+
+class FiltrosTests(TestCase):
+    # Ojo: el router publica PagoViewSet en historial-pagos/ y HistorialPagoViewSet en pagos/
+    url_pagos = '/api/historial-pagos/'
+
+    def setUp(self):
+        cache.clear()
+        self.docente = crear_docente(campus='Norte', facultad='Ingeniería')
+        crear_docente(campus='Central', facultad='Ingeniería')
+        self.curso = crear_curso(docente_id=self.docente, tipo='diplomado', fecha_inicio=datetime.date(2024, 3, 1))
+        self.otro_curso = crear_curso(fecha_inicio=datetime.date(2024, 9, 1))
+        self.estudiante = crear_estudiante()
+        self.inscripcion = crear_inscripcion(self.estudiante, self.curso)
+        otra = crear_inscripcion(crear_estudiante(), self.otro_curso, estado='pendiente')
+
+        self.pendiente = crear_pago(self.inscripcion, fecha_vencimiento=datetime.date(2024, 5, 10))
+        self.completado = crear_pago(self.inscripcion, estado_pago='completado', metodo_pago='Paypal')
+        self.ajeno = crear_pago(otra)
+        Pago.objects.filter(pk=self.completado.pk).update(fecha_pago=inicio_del_dia(datetime.date(2024, 5, 31)))
+
+    def ids(self, url, **parametros):
+        respuesta = self.client.get(url, parametros)
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return {fila['id'] for fila in respuesta.json()['results']}
+
+    def test_pagos_por_estado_metodo_curso_y_estudiante(self):
+        self.assertEqual(self.ids(self.url_pagos, estado_pago='pendiente'), {self.pendiente.id, self.ajeno.id})
+        self.assertEqual(self.ids(self.url_pagos, metodo_pago='Paypal'), {self.completado.id})
+        self.assertEqual(self.ids(self.url_pagos, curso=self.curso.id, estado_pago='pendiente'), {self.pendiente.id})
+        self.assertEqual(self.ids(self.url_pagos, estudiante=self.estudiante.id),
+                         {self.pendiente.id, self.completado.id})
+
+    def test_rangos_de_fechas_incluyen_el_dia_completo(self):
+        self.assertEqual(self.ids(self.url_pagos, desde='2024-05-31', hasta='2024-05-31'), {self.completado.id})
+        self.assertEqual(self.ids(self.url_pagos, hasta='2024-05-30'), set())
+        self.assertEqual(self.ids(self.url_pagos, vence_desde='2024-05-10', vence_hasta='2024-05-10'),
+                         {self.pendiente.id})
+
+    def test_el_filtro_es_una_sola_consulta(self):
+        # Los filtros por relación usan la columna _id: no se consulta antes el objeto relacionado
+        with self.assertNumQueries(1):
+            self.client.get(self.url_pagos, {'curso': self.curso.id, 'estado_pago': 'pendiente', 'desde': '2024-01-01'})
+
+    def test_valores_invalidos_devuelven_400(self):
+        self.assertEqual(self.client.get(self.url_pagos, {'estado_pago': 'pagado'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url_pagos, {'desde': '31/05/2024'}).status_code, 400)
+
+    def test_docentes_por_campus_y_facultad(self):
+        self.assertEqual(self.ids('/api/docentes/', campus='Norte', facultad='Ingeniería'), {self.docente.id})
+
+    def test_cursos_por_tipo_docente_y_fecha_de_inicio(self):
+        self.assertEqual(self.ids('/api/cursos/', tipo='diplomado'), {self.curso.id})
+        self.assertEqual(self.ids('/api/cursos/', docente=self.docente.id), {self.curso.id})
+        self.assertEqual(self.ids('/api/cursos/', inicio_desde='2024-06-01'), {self.otro_curso.id})
+
+    def test_inscripciones_por_estado_y_curso(self):
+        self.assertEqual(self.ids('/api/inscripciones/', estado='inscrito'), {self.inscripcion.id})
+        self.assertEqual(self.ids('/api/inscripciones/', curso=self.otro_curso.id, estado='inscrito'), set())
+        hoy = timezone.localdate().isoformat()
+        self.assertEqual(len(self.ids('/api/inscripciones/', desde=hoy, hasta=hoy)), 2)
+
+    def test_historial_por_pago(self):
+        HistorialPago.objects.create(pago=self.pendiente, estado_pago_anterior='pendiente', estado_pago_nuevo='completado')
+        HistorialPago.objects.create(pago=self.ajeno, estado_pago_anterior='pendiente', estado_pago_nuevo='completado')
+        respuesta = self.client.get('/api/pagos/', {'pago': self.pendiente.id, 'estado_pago_nuevo': 'completado'})
+        self.assertEqual([fila['pago'] for fila in respuesta.json()['results']], [self.pendiente.id])
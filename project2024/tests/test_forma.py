@@ -0,0 +1,91 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from project2024.models import HistorialPago
+from .utils import crear_curso, crear_docente, crear_estudiante, crear_inscripcion, crear_pago
+
+
+class FormaTests(TestCase):
+    # Ojo: el router publica PagoViewSet en historial-pagos/ y HistorialPagoViewSet en pagos/
+    url_pagos = '/api/historial-pagos/'
+    url_historial = '/api/pagos/'
+
+    def setUp(self):
+        cache.clear()
+        self.docente = crear_docente()
+        self.cursos = [crear_curso(docente_id=self.docente) for _ in range(3)]
+        self.inscripciones = [crear_inscripcion(crear_estudiante(), curso) for curso in self.cursos]
+        self.pagos = [crear_pago(inscripcion) for inscripcion in self.inscripciones for _ in range(2)]
+        for pago in self.pagos:
+            HistorialPago.objects.create(pago=pago, estado_pago_anterior='pendiente', estado_pago_nuevo='completado')
+
+    def get(self, url, **parametros):
+        respuesta = self.client.get(url, parametros)
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return respuesta.json()
+
+    def test_fields_limita_columnas_y_consulta(self):
+        with CaptureQueriesContext(connection) as consultas:
+            filas = self.get('/api/inscripciones/', fields='id,estado')['results']
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual({tuple(fila) for fila in filas}, {('id', 'estado')})
+        sql = consultas.captured_queries[0]['sql']
+        self.assertNotIn('"fecha_inscripcion"', sql)
+        self.assertNotIn('project2024_curso', sql)
+
+    def test_nombre_curso_se_une_en_la_misma_consulta(self):
+        with self.assertNumQueries(1):
+            filas = self.get('/api/inscripciones/')['results']
+        self.assertEqual({fila['nombre_curso'] for fila in filas}, {curso.nombre for curso in self.cursos})
+
+    def test_expand_de_relacion_hacia_adelante(self):
+        with self.assertNumQueries(1):
+            filas = self.get(self.url_pagos, expand='inscripcion.curso', fields='id,inscripcion.curso.nombre')['results']
+        self.assertEqual(len(filas), 6)
+        nombres = {fila['inscripcion']['curso']['nombre'] for fila in filas}
+        self.assertEqual(nombres, {curso.nombre for curso in self.cursos})
+        self.assertEqual(set(filas[0]['inscripcion']), {'curso'})
+        self.assertEqual(set(filas[0]['inscripcion']['curso']), {'nombre'})
+
+    def test_expand_de_lista_usa_prefetch(self):
+        with self.assertNumQueries(2):
+            filas = self.get('/api/inscripciones/', expand='pagos', fields='id,pagos.monto')['results']
+        self.assertEqual([len(fila['pagos']) for fila in filas], [2, 2, 2])
+        self.assertEqual(set(filas[0]['pagos'][0]), {'monto'})
+
+    def test_historial_devuelve_el_pago_como_id_salvo_expand(self):
+        with self.assertNumQueries(1):
+            filas = self.get(self.url_historial)['results']
+        self.assertIsInstance(filas[0]['pago'], int)
+
+        with self.assertNumQueries(1):
+            filas = self.get(self.url_historial, expand='pago')['results']
+        self.assertEqual({fila['pago']['id'] for fila in filas}, {pago.id for pago in self.pagos})
+
+    def test_detalle_con_expand(self):
+        curso = self.cursos[0]
+        with self.assertNumQueries(1):
+            datos = self.get(f'/api/cursos/{curso.id}/', expand='docente_id', fields='nombre,docente_id')
+        self.assertEqual(datos['nombre'], curso.nombre)
+        self.assertEqual(datos['docente_id']['nombre_completo'], self.docente.nombre_completo)
+
+    def test_fields_en_listado_compacto_parte_del_serializer_completo(self):
+        filas = self.get('/api/docentes/', fields='id,escuela')['results']
+        self.assertEqual(filas, [{'id': self.docente.id, 'escuela': 'Matemáticas'}])
+
+    def test_campos_desconocidos_devuelven_400(self):
+        respuesta = self.client.get('/api/inscripciones/', {'fields': 'id,nada', 'expand': 'docente'})
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(set(respuesta.json()), {'fields', 'expand'})
+
+    def test_las_escrituras_no_cambian(self):
+        inscripcion = self.inscripciones[0]
+        respuesta = self.client.patch(
+            f'/api/inscripciones/{inscripcion.id}/?fields=id', {'estado': 'pendiente'}, content_type='application/json'
+        )
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('nombre_curso', respuesta.json())
+        inscripcion.refresh_from_db()
+        self.assertEqual(inscripcion.estado, 'pendiente')
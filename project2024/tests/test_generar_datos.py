@@ -0,0 +1,60 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from project2024.models import Curso, Estudiante, HistorialPago, Inscripcion, Notificacion, Pago
+
+
+class GenerarDatosTests(TestCase):
+    def setUp(self):
+        call_command(
+            'generar_datos', estudiantes=20, docentes=3, cursos=5, inscripciones_por_estudiante=2,
+            pagos_por_inscripcion=2, notificaciones_por_estudiante=1, lote=7, stdout=StringIO(),
+        )
+
+    def test_genera_los_volumenes_pedidos(self):
+        self.assertEqual(Estudiante.objects.count(), 20)
+        self.assertEqual(Curso.objects.count(), 5)
+        self.assertEqual(Inscripcion.objects.count(), 40)
+        self.assertEqual(Pago.objects.count(), 80)
+        self.assertEqual(Notificacion.objects.count(), 20)
+        self.assertLessEqual(HistorialPago.objects.count(), 80)
+
+    def test_contadores_de_inscritos_coinciden(self):
+        for curso in Curso.objects.annotate(reales=Count('inscripcion')):
+            self.assertEqual(curso.inscritos, curso.reales)
+
+    def test_los_usuarios_generados_pueden_entrar(self):
+        estudiante = Estudiante.objects.first()
+        respuesta = self.client.post(
+            '/api/acceso/usuario/', {'matricula': estudiante.matricula, 'password': 'clave123'},
+            content_type='application/json',
+        )
+        self.assertEqual(respuesta.status_code, 200)
+
+    def test_benchmark_recorre_las_rutas_sin_errores(self):
+        with tempfile.NamedTemporaryFile(suffix='.json') as salida:
+            call_command('benchmark_rutas', repeticiones=2, salida=salida.name, stdout=StringIO())
+            resultados = json.load(open(salida.name))['resultados']
+        urls = {r['url'] for r in resultados}
+        self.assertIn('/api/cursos/', urls)
+        self.assertTrue(any(url.startswith('/estudiante/') for url in urls))
+        self.assertEqual([r['url'] for r in resultados if r['estado'] >= 500], [])
+
+
+class CapacidadGenerarDatosTests(TestCase):
+    def test_no_supera_la_capacidad_de_los_cursos(self):
+        # 5 cursos con 20 a 60 plazas: 150 estudiantes con 2 inscripciones cada uno los llenan
+        call_command(
+            'generar_datos', estudiantes=150, docentes=1, cursos=5, inscripciones_por_estudiante=2,
+            pagos_por_inscripcion=1, notificaciones_por_estudiante=0, lote=50, stdout=StringIO(),
+        )
+        cursos = Curso.objects.annotate(reales=Count('inscripcion'))
+        for curso in cursos:
+            self.assertLessEqual(curso.reales, curso.capacidad)
+            self.assertEqual(curso.inscritos, curso.reales)
+        self.assertTrue(any(curso.reales == curso.capacidad for curso in cursos))
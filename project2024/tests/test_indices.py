@@ -0,0 +1,108 @@
+import datetime
+import re
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from project2024 import notificaciones, reportes
+from project2024.models import Inscripcion, Notificacion, Pago
+from .utils import crear_curso, crear_docente, crear_estudiante, crear_inscripcion, crear_pago
+
+
+# Un recorrido completo de una tabla o de un índice en el plan de SQLite
+ESCANEO_COMPLETO = re.compile(r'^SCAN (?!CONSTANT ROW)')
+
+
+def plan(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [fila[-1] for fila in cursor.fetchall()]
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Los planes se verifican con EXPLAIN QUERY PLAN de SQLite')
+class PlanesDeConsultaTests(TestCase):
+    """
+    Ejecuta EXPLAIN sobre las consultas de las rutas y reportes más usados y falla si alguna
+    vuelve a recorrer tablas completas o deja de usar los índices compuestos de los modelos.
+    """
+
+    def setUp(self):
+        self.docente = crear_docente()
+        self.estudiante = crear_estudiante()
+        self.curso = crear_curso(docente_id=self.docente)
+        self.inscripcion = crear_inscripcion(self.estudiante, self.curso)
+        crear_pago(self.inscripcion)
+
+    def planes_de(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        return {consulta['sql']: plan(consulta['sql']) for consulta in consultas}
+
+    def plan_de(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        return plan(sql, params)
+
+    def assertSinEscaneos(self, detalles):
+        escaneos = [detalle for detalle in detalles if ESCANEO_COMPLETO.match(detalle)]
+        self.assertEqual(escaneos, [], '\n'.join(detalles))
+
+    def assertUsaIndice(self, detalles, indice):
+        self.assertTrue(any(indice in detalle for detalle in detalles), '\n'.join(detalles))
+
+    def test_verificar_estudiante(self):
+        planes = self.planes_de(f'/estudiante/{self.estudiante.id}/verificar/')
+        for detalles in planes.values():
+            self.assertSinEscaneos(detalles)
+        detalles = [detalle for detalles in planes.values() for detalle in detalles]
+        self.assertUsaIndice(detalles, 'inscripcion_estudiante_id')
+        self.assertUsaIndice(detalles, 'pago_inscripcion_estado_idx')
+        # El último historial de cada pago se lee en el orden del índice, sin ordenar aparte
+        self.assertUsaIndice(detalles, 'historial_pago_fecha_idx')
+        self.assertEqual([d for d in detalles if 'TEMP B-TREE' in d], [], '\n'.join(detalles))
+
+    def test_docente_cursos(self):
+        for detalles in self.planes_de(f'/docente/{self.docente.id}/cursos/').values():
+            self.assertSinEscaneos(detalles)
+
+    def test_recordatorios_por_vencimiento(self):
+        hoy = timezone.localdate()
+        detalles = self.plan_de(notificaciones.pagos_por_vencer(hoy, hoy + datetime.timedelta(days=7)))
+        self.assertSinEscaneos(detalles)
+        self.assertUsaIndice(detalles, 'pago_estado_vencimiento_idx')
+
+    def test_reporte_de_pendientes(self):
+        with CaptureQueriesContext(connection) as consultas:
+            reportes.generar('pagos_pendientes', desde=datetime.date(2024, 1, 1))
+        detalles = plan(consultas[0]['sql'])
+        self.assertSinEscaneos(detalles)
+        self.assertUsaIndice(detalles, 'pago_estado_vencimiento_idx')
+
+    def test_reporte_de_ingresos(self):
+        with CaptureQueriesContext(connection) as consultas:
+            reportes.generar('ingresos', desde=datetime.date(2024, 1, 1), hasta=datetime.date(2024, 3, 31))
+        detalles = plan(consultas[0]['sql'])
+        self.assertSinEscaneos(detalles)
+        self.assertUsaIndice(detalles, 'ingreso_estado_fecha_idx')
+
+    def test_inscripciones_de_un_curso(self):
+        detalles = self.plan_de(Inscripcion.objects.filter(curso=self.curso, estado='inscrito'))
+        self.assertSinEscaneos(detalles)
+        self.assertUsaIndice(detalles, 'inscripcion_curso_id')
+
+    def test_notificaciones_pendientes_de_un_usuario(self):
+        detalles = self.plan_de(Notificacion.objects.filter(usuario=self.estudiante, estado='pendiente'))
+        self.assertSinEscaneos(detalles)
+        self.assertUsaIndice(detalles, 'notif_usuario_estado_idx')
+
+    def test_lote_del_despachador_de_notificaciones(self):
+        detalles = self.plan_de(
+            Notificacion.objects.filter(estado='pendiente', proximo_intento__lte=timezone.now())
+            .order_by('proximo_intento')[:100]
+        )
+        self.assertSinEscaneos(detalles)
+        self.assertUsaIndice(detalles, 'notif_estado_intento_idx')
+        self.assertEqual([d for d in detalles if 'TEMP B-TREE' in d], [], '\n'.join(detalles))
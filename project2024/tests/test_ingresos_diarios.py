@@ -0,0 +1,165 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from project2024 import reportes
+from project2024.models import IngresoDiario, Pago
+from .utils import crear_curso, crear_estudiante, crear_inscripcion, crear_pago
+
+
+class IngresoDiarioTests(TestCase):
+    url = '/api/historial-pagos/'  # El router publica PagoViewSet en historial-pagos/
+
+    def setUp(self):
+        self.curso = crear_curso(capacidad=0)
+        self.inscripcion = crear_inscripcion(crear_estudiante(), self.curso)
+        self.hoy = timezone.localdate()
+
+    def resumen(self):
+        return {
+            (fila.curso_id, fila.metodo_pago, fila.estado_pago): (str(fila.total), fila.cantidad)
+            for fila in IngresoDiario.objects.filter(cantidad__gt=0)
+        }
+
+    def assertCoincideConLaTablaDePagos(self):
+        incremental = self.resumen()
+        IngresoDiario.reconstruir()
+        self.assertEqual(incremental, self.resumen())
+
+    def test_pagos_nuevos_y_cambios_de_estado(self):
+        pago = crear_pago(self.inscripcion, monto='50.00')
+        crear_pago(self.inscripcion, monto='20.00')
+        crear_pago(self.inscripcion, monto='30.00', metodo_pago='manual', estado_pago='completado')
+        self.assertEqual(self.resumen(), {
+            (self.curso.id, 'transferencia', 'pendiente'): ('70.00', 2),
+            (self.curso.id, 'manual', 'completado'): ('30.00', 1),
+        })
+        self.assertEqual(IngresoDiario.objects.get(estado_pago='completado').fecha, self.hoy)
+
+        respuesta = self.client.patch(f'{self.url}{pago.id}/change_status/', {'estado_pago': 'parcial'},
+                                      content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200)
+        Pago.cambiar_estado(pago.id, 'completado')
+        self.assertEqual(self.resumen(), {
+            (self.curso.id, 'transferencia', 'pendiente'): ('20.00', 1),
+            (self.curso.id, 'transferencia', 'completado'): ('50.00', 1),
+            (self.curso.id, 'manual', 'completado'): ('30.00', 1),
+        })
+        self.assertCoincideConLaTablaDePagos()
+
+    def test_edicion_y_borrado(self):
+        pago = crear_pago(self.inscripcion, monto='50.00')
+        respuesta = self.client.patch(f'{self.url}{pago.id}/', {'monto': '80.00', 'metodo_pago': 'Paypal'},
+                                      content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertEqual(self.resumen(), {(self.curso.id, 'Paypal', 'pendiente'): ('80.00', 1)})
+
+        crear_pago(self.inscripcion, monto='5.00')
+        Pago.objects.get(pk=pago.pk).delete()
+        self.assertEqual(self.resumen(), {(self.curso.id, 'transferencia', 'pendiente'): ('5.00', 1)})
+
+        # Borrado en cascada desde la inscripción
+        self.inscripcion.delete()
+        self.assertEqual(self.resumen(), {})
+
+    def test_borrar_un_curso_con_pagos(self):
+        otro = crear_curso(capacidad=0)
+        crear_pago(self.inscripcion, monto='50.00')
+        crear_pago(crear_inscripcion(crear_estudiante(), otro), monto='20.00')
+
+        respuesta = self.client.delete(f'/api/cursos/{self.curso.id}/')
+        self.assertEqual(respuesta.status_code, 204)
+        self.assertFalse(IngresoDiario.objects.filter(curso_id=self.curso.id).exists())
+        self.assertEqual(self.resumen(), {(otro.id, 'transferencia', 'pendiente'): ('20.00', 1)})
+
+        # Lo que quede marcado del borrado no afecta a los borrados siguientes
+        Pago.objects.get().delete()
+        self.assertEqual(self.resumen(), {})
+
+    def test_guardar_sin_cambiar_el_aporte_no_toca_el_resumen(self):
+        pago = Pago.objects.get(pk=crear_pago(self.inscripcion, monto='50.00').pk)
+        pago.fecha_vencimiento = self.hoy
+        with CaptureQueriesContext(connection) as consultas:
+            pago.save()
+        self.assertEqual([c['sql'].split()[0] for c in consultas], ['UPDATE'])
+
+        pago.monto = Decimal('70.00')
+        with CaptureQueriesContext(connection) as consultas:
+            pago.save()
+        self.assertEqual(len([c for c in consultas if 'project2024_ingresodiario' in c['sql']]), 1)
+        pago.save()
+        self.assertEqual(self.resumen(), {(self.curso.id, 'transferencia', 'pendiente'): ('70.00', 1)})
+
+    def test_acumular_por_bloques(self):
+        IngresoDiario.acumular({(self.curso.id, self.hoy, 'manual', 'pendiente'): (Decimal('5.00'), 1)})
+        otro = crear_curso(capacidad=0)
+        IngresoDiario.acumular({
+            (curso_id, self.hoy, metodo, 'pendiente'): (Decimal('10.00'), 2)
+            for curso_id in (self.curso.id, otro.id) for metodo in ('manual', 'Paypal', 'transferencia')
+        }, lote=4)
+        self.assertEqual(self.resumen(), {
+            (self.curso.id, 'manual', 'pendiente'): ('15.00', 3),
+            (self.curso.id, 'Paypal', 'pendiente'): ('10.00', 2),
+            (self.curso.id, 'transferencia', 'pendiente'): ('10.00', 2),
+            (otro.id, 'manual', 'pendiente'): ('10.00', 2),
+            (otro.id, 'Paypal', 'pendiente'): ('10.00', 2),
+            (otro.id, 'transferencia', 'pendiente'): ('10.00', 2),
+        })
+
+    def test_cambiar_la_inscripcion_de_curso_mueve_sus_pagos(self):
+        crear_pago(self.inscripcion, monto='50.00', estado_pago='completado')
+        otro = crear_curso(capacidad=0)
+        self.inscripcion.curso = otro
+        self.inscripcion.save()
+        self.assertEqual(self.resumen(), {(otro.id, 'transferencia', 'completado'): ('50.00', 1)})
+
+        respuesta = self.client.patch('/api/inscripciones/bulk/', [{'id': self.inscripcion.id, 'curso': self.curso.id}],
+                                      content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertEqual(self.resumen(), {(self.curso.id, 'transferencia', 'completado'): ('50.00', 1)})
+
+    def test_lotes(self):
+        filas = [{'inscripcion': self.inscripcion.id, 'metodo_pago': 'manual', 'monto': '10.00',
+                  'estado_pago': 'pendiente'} for _ in range(4)]
+        self.assertEqual(self.client.post(f'{self.url}bulk/', filas, content_type='application/json').status_code, 201)
+        self.assertEqual(self.resumen(), {(self.curso.id, 'manual', 'pendiente'): ('40.00', 4)})
+
+        ids = list(Pago.objects.values_list('id', flat=True))
+        respuesta = self.client.patch(f'{self.url}bulk/', [
+            {'id': ids[0], 'estado_pago': 'completado', 'monto': '15.00'},
+            {'id': ids[1], 'metodo_pago': 'Paypal'},
+        ], content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertEqual(self.resumen(), {
+            (self.curso.id, 'manual', 'pendiente'): ('20.00', 2),
+            (self.curso.id, 'manual', 'completado'): ('15.00', 1),
+            (self.curso.id, 'Paypal', 'pendiente'): ('10.00', 1),
+        })
+        self.assertCoincideConLaTablaDePagos()
+
+    def test_reconstruir_corrige_escrituras_directas(self):
+        pago = crear_pago(self.inscripcion, monto='50.00')
+        Pago.objects.filter(pk=pago.pk).update(monto=Decimal('60.00'))
+        salida = StringIO()
+        call_command('reconstruir_ingresos', '--desde', self.hoy.isoformat(), stdout=salida)
+        self.assertIn('Resumen de ingresos recalculado: 1 filas', salida.getvalue())
+        self.assertEqual(self.resumen(), {(self.curso.id, 'transferencia', 'pendiente'): ('60.00', 1)})
+
+    def test_el_reporte_no_lee_la_tabla_de_pagos(self):
+        crear_pago(self.inscripcion, monto='50.00', estado_pago='completado')
+        crear_pago(self.inscripcion, monto='25.00', estado_pago='parcial', metodo_pago='manual')
+        crear_pago(self.inscripcion, monto='99.00')
+
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = reportes.generar('ingresos')
+        self.assertEqual(len(consultas), 1)
+        self.assertNotIn('project2024_pago', consultas[0]['sql'])
+        periodo = resultado['periodos'][f'{self.hoy:%Y-%m}']
+        self.assertEqual((resultado['total'], resultado['cantidad']), ('75.00', 2))
+        self.assertEqual(periodo['por_metodo']['manual'], {'total': '25.00', 'cantidad': 1})
+        self.assertEqual(periodo['por_curso'][str(self.curso.id)]['total'], '75.00')
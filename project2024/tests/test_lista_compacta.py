@@ -0,0 +1,31 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .utils import crear_docente, crear_estudiante
+
+
+class ListaCompactaTests(TestCase):
+    def test_listado_de_estudiantes_compacto(self):
+        estudiante = crear_estudiante(direccion='Calle 1')
+
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get('/api/estudiantes/')
+
+        [fila] = respuesta.json()['results']
+        self.assertEqual(set(fila), {'id', 'nombre_completo', 'correo', 'estado', 'matricula'})
+        self.assertEqual(fila['id'], estudiante.id)
+        sql = consultas.captured_queries[0]['sql']
+        self.assertNotIn('"direccion"', sql)
+        self.assertNotIn('"password"', sql)
+
+    def test_detalle_de_estudiante_completo(self):
+        estudiante = crear_estudiante(direccion='Calle 1')
+        respuesta = self.client.get(f'/api/estudiantes/{estudiante.id}/')
+        self.assertEqual(respuesta.json()['direccion'], 'Calle 1')
+
+    def test_listado_de_docentes_compacto(self):
+        crear_docente()
+        [fila] = self.client.get('/api/docentes/').json()['results']
+        self.assertNotIn('password', fila)
+        self.assertIn('codigo_doc', fila)
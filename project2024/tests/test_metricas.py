@@ -0,0 +1,39 @@
+from django.test import TestCase, override_settings
+
+from project2024 import metricas
+from .utils import crear_curso, crear_estudiante, crear_inscripcion
+
+
+class MetricasTests(TestCase):
+    def setUp(self):
+        for histograma in metricas.HISTOGRAMAS:
+            histograma.reiniciar()
+        self.estudiante = crear_estudiante()
+        crear_inscripcion(self.estudiante, crear_curso())
+
+    @override_settings(METRICAS_CABECERAS_DB=True)
+    def test_cabeceras_con_consultas_y_tiempo(self):
+        respuesta = self.client.get(f'/estudiante/{self.estudiante.id}/verificar/')
+        self.assertEqual(respuesta['X-DB-Queries'], '2')
+        self.assertTrue(respuesta['X-DB-Time'].endswith('ms'))
+
+    @override_settings(METRICAS_CABECERAS_DB=False)
+    def test_sin_cabeceras_si_estan_desactivadas(self):
+        respuesta = self.client.get(f'/estudiante/{self.estudiante.id}/verificar/')
+        self.assertNotIn('X-DB-Queries', respuesta)
+
+    def test_endpoint_en_formato_prometheus(self):
+        self.client.get(f'/estudiante/{self.estudiante.id}/verificar/')
+        self.client.get(f'/estudiante/{self.estudiante.id}/verificar/')
+
+        respuesta = self.client.get('/metrics')
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta['Content-Type'].startswith('text/plain; version=0.0.4'))
+        texto = respuesta.content.decode()
+        etiquetas = 'method="GET",route="estudiante/<int:estudiante_id>/verificar/"'
+        self.assertIn('# TYPE http_request_duration_seconds histogram', texto)
+        self.assertIn(f'http_request_duration_seconds_count{{{etiquetas}}} 2', texto)
+        self.assertIn(f'http_request_db_queries_bucket{{{etiquetas},le="2"}} 2', texto)
+        self.assertIn(f'http_request_db_queries_sum{{{etiquetas}}} 4', texto)
+        self.assertIn('catalogo_cache_hits_total', texto)
@@ -0,0 +1,181 @@
+import datetime
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from project2024 import notificaciones
+from project2024.models import Estudiante, MarcaRecordatorio, Notificacion
+from .utils import crear_curso, crear_estudiante, crear_inscripcion, crear_pago
+
+
+class BackendDePrueba(locmem.EmailBackend):
+    """Backend locmem que cuenta las conexiones abiertas y rechaza los destinatarios de `rechazar`."""
+    aperturas = 0
+    rechazar = set()
+
+    def open(self):
+        BackendDePrueba.aperturas += 1
+        return super().open()
+
+    def send_messages(self, mensajes):
+        for mensaje in mensajes:
+            if set(mensaje.to) & self.rechazar:
+                raise ConnectionResetError('El servidor cerró la conexión')
+        return super().send_messages(mensajes)
+
+
+@override_settings(
+    EMAIL_BACKEND='project2024.tests.test_notificaciones.BackendDePrueba',
+    NOTIFICACIONES_LOTE=10, NOTIFICACIONES_MAX_INTENTOS=3, NOTIFICACIONES_ESPERA_BASE=60,
+)
+class DespachadorTests(TestCase):
+    def setUp(self):
+        BackendDePrueba.aperturas = 0
+        BackendDePrueba.rechazar = set()
+        self.estudiantes = [crear_estudiante() for _ in range(5)]
+        self.notificaciones = [
+            Notificacion.objects.create(usuario=estudiante, tipo_notificacion='recordatorio_pago', mensaje='Pague')
+            for estudiante in self.estudiantes for _ in range(5)
+        ]
+
+    def test_envia_todo_por_una_conexion_y_marca_con_un_update(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = notificaciones.despachar()
+
+        self.assertEqual(resultado['enviadas'], 25)
+        self.assertEqual(resultado['lotes'], 3)
+        self.assertEqual(len(mail.outbox), 25)
+        self.assertEqual(mail.outbox[0].subject, 'Recordatorio de Pago')
+        self.assertEqual(BackendDePrueba.aperturas, 1)
+        self.assertFalse(Notificacion.objects.filter(estado='pendiente').exists())
+        # Por lote: un SELECT ... FOR UPDATE y un UPDATE para todas las enviadas
+        updates = [c['sql'] for c in consultas if c['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), resultado['lotes'])
+
+    def test_un_fallo_se_reintenta_con_espera_creciente(self):
+        rechazado = self.estudiantes[0]
+        BackendDePrueba.rechazar = {rechazado.correo}
+        antes = timezone.now()
+
+        self.assertEqual(notificaciones.despachar_lote(), (5, 5))
+        fallidas = Notificacion.objects.filter(usuario=rechazado)
+        self.assertEqual({(n.estado, n.intentos) for n in fallidas}, {('pendiente', 1)})
+        self.assertTrue(all(n.proximo_intento >= antes + datetime.timedelta(seconds=60) for n in fallidas))
+        self.assertIn('cerró la conexión', fallidas[0].ultimo_error)
+
+        # Hasta que venza la espera no se vuelven a tomar
+        self.assertEqual(notificaciones.despachar_lote(), (10, 0))
+        self.assertEqual(notificaciones.despachar_lote(), (5, 0))
+        self.assertEqual(notificaciones.despachar_lote(), (0, 0))
+
+        fallidas.update(proximo_intento=timezone.now())
+        notificaciones.despachar_lote()
+        segundo = fallidas.first()
+        self.assertEqual(segundo.intentos, 2)
+        self.assertGreaterEqual(segundo.proximo_intento, timezone.now() + datetime.timedelta(seconds=110))
+
+        fallidas.update(proximo_intento=timezone.now())
+        notificaciones.despachar_lote()
+        self.assertEqual(set(fallidas.values_list('estado', flat=True)), {'fallido'})
+
+    def test_sin_correo_no_se_reintenta(self):
+        Estudiante.objects.filter(pk=self.estudiantes[0].pk).update(correo='')
+        notificaciones.despachar()
+        self.assertEqual(
+            set(Notificacion.objects.filter(usuario=self.estudiantes[0]).values_list('estado', 'intentos')),
+            {('fallido', 1)},
+        )
+
+    def test_espera_con_tope(self):
+        with self.settings(NOTIFICACIONES_ESPERA_MAXIMA=300):
+            self.assertEqual([notificaciones.espera(n) for n in range(1, 5)], [60, 120, 240, 300])
+
+    def test_comando_informa_el_rendimiento(self):
+        salida = StringIO()
+        call_command('despachar_notificaciones', '--lote', '7', stdout=salida)
+        self.assertIn('Enviadas: 25, fallidas: 0, lotes: 4', salida.getvalue())
+        self.assertIn('/s)', salida.getvalue())
+
+
+class RecordatoriosTests(TestCase):
+    hoy = datetime.date(2024, 5, 1)
+
+    def setUp(self):
+        self.estudiante = crear_estudiante()
+        self.inscripcion = crear_inscripcion(self.estudiante, crear_curso(nombre='Álgebra'))
+
+    def pago(self, dias, **kwargs):
+        return crear_pago(self.inscripcion, fecha_vencimiento=self.hoy + datetime.timedelta(days=dias), **kwargs)
+
+    def programar(self, dias=0):
+        return notificaciones.programar_recordatorios(self.hoy + datetime.timedelta(days=dias), [7, 3, 1])
+
+    def recordatorios(self):
+        return set(Notificacion.objects.filter(tipo_notificacion='recordatorio_pago').values_list('pago_id', 'dias_antes'))
+
+    def test_cada_pago_recibe_el_horizonte_mas_cercano(self):
+        lejano, a_siete, a_cinco, a_dos, hoy = (self.pago(d) for d in (10, 7, 5, 2, 0))
+        self.pago(6, estado_pago='completado')
+        self.pago(-1)
+
+        self.assertEqual(self.programar(), {7: 2, 3: 1, 1: 1})
+        self.assertEqual(self.recordatorios(), {(a_siete.id, 7), (a_cinco.id, 7), (a_dos.id, 3), (hoy.id, 1)})
+        notificacion = Notificacion.objects.get(pago=hoy)
+        self.assertEqual(notificacion.usuario_id, self.estudiante.id)
+        self.assertEqual(notificacion.estado, 'pendiente')
+        self.assertEqual(notificacion.mensaje, 'Su pago de 50.00 del curso Álgebra vence hoy (01/05/2024).')
+
+        # Con el paso de los días cada pago entra en los horizontes siguientes
+        self.assertEqual(self.programar(1), {7: 0, 3: 0, 1: 1})
+        self.assertIn((a_dos.id, 1), self.recordatorios())
+        self.assertEqual(self.programar(3), {7: 1, 3: 1, 1: 0})
+        self.assertTrue({(lejano.id, 7), (a_cinco.id, 3)} <= self.recordatorios())
+
+    def test_una_segunda_corrida_no_relee_lo_revisado(self):
+        self.pago(5)
+        self.programar()
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.programar(), {7: 0, 3: 0, 1: 0})
+        # Solo los pagos del tramo modificados después de la corrida anterior
+        sql = [c['sql'] for c in consultas if 'FROM "project2024_pago"' in c['sql']]
+        self.assertEqual(len(sql), 3)
+        self.assertTrue(all('"project2024_pago"."fecha_modificacion" >' in consulta for consulta in sql))
+
+    def test_pago_nuevo_dentro_de_un_tramo_ya_revisado(self):
+        self.programar()
+        tardio = self.pago(2)
+        self.assertEqual(self.programar(), {7: 0, 3: 1, 1: 0})
+        self.assertEqual(self.recordatorios(), {(tardio.id, 3)})
+
+    def test_vencimiento_movido_a_un_tramo_ya_revisado(self):
+        pago, otro = self.pago(20), self.pago(30)
+        self.programar()
+        en_dos, en_cinco = (str(self.hoy + datetime.timedelta(days=dias)) for dias in (2, 5))
+        # Por save() y por el PATCH masivo, que usa bulk_update
+        respuesta = self.client.patch(f'/api/historial-pagos/{pago.id}/', {'fecha_vencimiento': en_dos},
+                                      content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200)
+        respuesta = self.client.patch('/api/historial-pagos/bulk/', [{'id': otro.id, 'fecha_vencimiento': en_cinco}],
+                                      content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200)
+
+        self.assertEqual(self.programar(), {7: 1, 3: 1, 1: 0})
+        self.assertEqual(self.recordatorios(), {(pago.id, 3), (otro.id, 7)})
+
+    def test_reiniciar_no_duplica(self):
+        self.pago(5)
+        self.pago(1)
+        call_command('programar_recordatorios', '--hoy', self.hoy.isoformat(), '--dias', '7,3,1', stdout=StringIO())
+        salida = StringIO()
+        call_command(
+            'programar_recordatorios', '--hoy', self.hoy.isoformat(), '--dias', '7,3,1', '--reiniciar', stdout=salida,
+        )
+        self.assertIn('Recordatorios creados: 0', salida.getvalue())
+        self.assertEqual(Notificacion.objects.count(), 2)
+        self.assertEqual(MarcaRecordatorio.objects.count(), 3)
@@ -0,0 +1,24 @@
+from django.test import TestCase
+
+from .utils import crear_curso
+
+
+class IdCursorPaginationTests(TestCase):
+    def setUp(self):
+        self.cursos = [crear_curso() for _ in range(5)]
+
+    def test_recorre_todas_las_paginas_sin_repetir(self):
+        ids = []
+        url = '/api/cursos/?page_size=2'
+        while url:
+            datos = self.client.get(url).json()
+            self.assertLessEqual(len(datos['results']), 2)
+            ids.extend(c['id'] for c in datos['results'])
+            url = datos['next']
+
+        self.assertEqual(ids, sorted((c.id for c in self.cursos), reverse=True))
+
+    def test_page_size_mayor_al_maximo_no_falla(self):
+        datos = self.client.get('/api/cursos/?page_size=100000').json()
+        self.assertEqual(len(datos['results']), 5)
+        self.assertIsNone(datos['next'])
@@ -0,0 +1,46 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import OperationalError, connections
+from django.test import TestCase, override_settings
+
+from project2024 import routers
+from project2024.models import Curso
+from .utils import crear_curso
+
+
+@override_settings(DATABASE_REPLICA='replica')
+class ReplicaRouterTests(TestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        routers._replica_caida_hasta = 0.0
+        # La réplica tiene un curso que la primaria no tiene, para saber de dónde se leyó
+        crear_curso(nombre='En primaria')
+        Curso.objects.using('replica').create(
+            nombre='En réplica', tipo='curso', tarifa='1.00', fecha_inicio='2024-01-01', fecha_fin='2024-02-01',
+            modulos=1, horas=1, codigo='R1', profesor='P', facultad='F', telefono='1',
+        )
+
+    def nombres(self, respuesta):
+        return [c['nombre'] for c in respuesta.json()['results']]
+
+    def test_get_lee_de_la_replica(self):
+        self.assertEqual(self.nombres(self.client.get('/api/cursos/')), ['En réplica'])
+
+    def test_despues_de_escribir_lee_de_la_primaria(self):
+        respuesta = self.client.post('/api/reportes/', {'tipo_reporte': 'asistencia'}, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertIn(routers.COOKIE_PRIMARIA, respuesta.cookies)
+
+        self.assertEqual(self.nombres(self.client.get('/api/cursos/')), ['En primaria'])
+
+    def test_replica_caida_usa_la_primaria(self):
+        with mock.patch.object(connections['replica'], 'ensure_connection', side_effect=OperationalError):
+            self.assertEqual(self.nombres(self.client.get('/api/cursos/')), ['En primaria'])
+        # Mientras dure la espera de reintento no se vuelve a probar la réplica
+        self.assertEqual(self.nombres(self.client.get('/api/cursos/?page_size=10')), ['En primaria'])
+
+    def test_fuera_de_una_peticion_lee_de_la_primaria(self):
+        self.assertEqual(list(Curso.objects.values_list('nombre', flat=True)), ['En primaria'])
@@ -0,0 +1,109 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from project2024 import reportes
+from project2024.models import IngresoDiario, Pago, Reporte
+from .utils import crear_curso, crear_estudiante, crear_inscripcion, crear_pago
+
+
+def en_fecha(pago, fecha):
+    momento = timezone.make_aware(datetime.datetime.combine(fecha, datetime.time(12)))
+    Pago.objects.filter(pk=pago.pk).update(fecha_pago=momento)
+    # QuerySet.update no pasa por Pago.save: el resumen de ingresos se recalcula aparte
+    IngresoDiario.reconstruir()
+
+
+class ReporteIngresosTests(TestCase):
+    def setUp(self):
+        self.curso = crear_curso()
+        self.inscripcion = crear_inscripcion(crear_estudiante(), self.curso)
+        en_fecha(crear_pago(self.inscripcion, estado_pago='completado', monto='100.00'), datetime.date(2024, 1, 15))
+        en_fecha(crear_pago(self.inscripcion, estado_pago='parcial', monto='25.00', metodo_pago='manual'),
+                 datetime.date(2024, 1, 20))
+        en_fecha(crear_pago(self.inscripcion, estado_pago='completado', monto='40.00'), datetime.date(2024, 2, 3))
+        en_fecha(crear_pago(self.inscripcion, estado_pago='pendiente', monto='999.00'), datetime.date(2024, 2, 3))
+
+    def test_crear_reporte_calcula_el_resultado(self):
+        respuesta = self.client.post('/api/reportes/', {'tipo_reporte': 'ingresos'}, content_type='application/json')
+
+        self.assertEqual(respuesta.status_code, 201)
+        resultado = respuesta.json()['resultado']
+        self.assertEqual(resultado['total'], '165.00')
+        self.assertEqual(resultado['periodos']['2024-01']['total'], '125.00')
+        self.assertEqual(resultado['periodos']['2024-01']['por_metodo']['manual']['total'], '25.00')
+        self.assertEqual(resultado['periodos']['2024-02']['por_curso'][str(self.curso.id)]['cantidad'], 1)
+        self.assertEqual(respuesta.json()['descripcion'], 'Ingresos')
+
+    def test_regenerar_solo_recalcula_la_ventana(self):
+        reporte = Reporte.objects.create(tipo_reporte='ingresos', resultado=reportes.generar('ingresos'))
+        # Un pago nuevo en enero no debe aparecer si solo se regenera febrero
+        en_fecha(crear_pago(self.inscripcion, estado_pago='completado', monto='10.00'), datetime.date(2024, 1, 2))
+        en_fecha(crear_pago(self.inscripcion, estado_pago='completado', monto='5.00'), datetime.date(2024, 2, 28))
+
+        respuesta = self.client.post(f'/api/reportes/{reporte.id}/regenerar/',
+                                     {'fecha_desde': '2024-02-10', 'fecha_hasta': '2024-02-10'},
+                                     content_type='application/json')
+
+        self.assertEqual(respuesta.status_code, 200)
+        resultado = respuesta.json()['resultado']
+        self.assertEqual(resultado['periodos']['2024-01']['total'], '125.00')
+        self.assertEqual(resultado['periodos']['2024-02']['total'], '45.00')
+        self.assertEqual(resultado['total'], '170.00')
+        self.assertIsNone(respuesta.json()['fecha_desde'])
+
+    def test_regenerar_una_ventana_separada_calcula_los_meses_intermedios(self):
+        respuesta = self.client.post('/api/reportes/', {'tipo_reporte': 'ingresos', 'fecha_desde': '2024-01-01',
+                                                        'fecha_hasta': '2024-01-31'}, content_type='application/json')
+        reporte_id = respuesta.json()['id']
+        self.assertNotIn('2024-02', respuesta.json()['resultado']['periodos'])
+        en_fecha(crear_pago(self.inscripcion, estado_pago='completado', monto='7.00'), datetime.date(2024, 3, 5))
+
+        respuesta = self.client.post(f'/api/reportes/{reporte_id}/regenerar/',
+                                     {'fecha_desde': '2024-03-01', 'fecha_hasta': '2024-03-31'},
+                                     content_type='application/json')
+
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.json()
+        self.assertEqual((datos['fecha_desde'], datos['fecha_hasta']), ('2024-01-01', '2024-03-31'))
+        # Febrero queda dentro de la cobertura, así que se calculó
+        self.assertEqual({clave: p['total'] for clave, p in datos['resultado']['periodos'].items()},
+                         {'2024-01': '125.00', '2024-02': '40.00', '2024-03': '7.00'})
+
+
+class ReportePagosPendientesTests(TestCase):
+    def test_tramos_de_vencimiento(self):
+        hoy = timezone.localdate()
+        inscripcion = crear_inscripcion(crear_estudiante(), crear_curso())
+        crear_pago(inscripcion, monto='10.00', fecha_vencimiento=hoy + datetime.timedelta(days=3))
+        crear_pago(inscripcion, monto='20.00', fecha_vencimiento=hoy - datetime.timedelta(days=10))
+        crear_pago(inscripcion, monto='30.00', fecha_vencimiento=hoy - datetime.timedelta(days=45))
+        crear_pago(inscripcion, monto='40.00', fecha_vencimiento=hoy - datetime.timedelta(days=200))
+        crear_pago(inscripcion, monto='50.00', fecha_vencimiento=None)
+        crear_pago(inscripcion, monto='60.00', estado_pago='completado')
+
+        with self.assertNumQueries(1):
+            resultado = reportes.generar('pagos_pendientes')
+
+        tramos = resultado['tramos']
+        self.assertEqual(tramos['por_vencer']['total'], '10.00')
+        self.assertEqual(tramos['1_30']['total'], '20.00')
+        self.assertEqual(tramos['31_60']['total'], '30.00')
+        self.assertEqual(tramos['61_90']['cantidad'], 0)
+        self.assertEqual(tramos['mas_90']['total'], '40.00')
+        self.assertEqual(tramos['sin_vencimiento']['total'], '50.00')
+        self.assertEqual(resultado['cantidad'], 5)
+
+
+class ReporteAsistenciaTests(TestCase):
+    def test_ocupacion_por_curso(self):
+        curso = crear_curso(capacidad=4)
+        crear_inscripcion(crear_estudiante(), curso)
+        crear_inscripcion(crear_estudiante(), curso, estado='pendiente')
+
+        resultado = reportes.generar('asistencia')
+
+        self.assertEqual(resultado['cursos'][str(curso.id)]['inscritos'], 1)
+        self.assertEqual(resultado['cursos'][str(curso.id)]['pendientes'], 1)
+        self.assertEqual(resultado['cursos'][str(curso.id)]['porcentaje_ocupacion'], 25.0)
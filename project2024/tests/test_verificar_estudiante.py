@@ -0,0 +1,59 @@
+from django.test import TestCase
+
+from project2024.models import HistorialPago
+from .utils import crear_curso, crear_estudiante, crear_inscripcion, crear_pago
+
+
+class VerificarEstudianteTests(TestCase):
+    def setUp(self):
+        self.estudiante = crear_estudiante()
+
+    def crear_cursos_con_pagos(self, cantidad):
+        for _ in range(cantidad):
+            curso = crear_curso(capacidad=4)
+            inscripcion = crear_inscripcion(self.estudiante, curso)
+            crear_inscripcion(crear_estudiante(), curso)
+            pago = crear_pago(inscripcion)
+            HistorialPago.objects.create(pago=pago, estado_pago_anterior='parcial', estado_pago_nuevo='pendiente')
+            crear_pago(inscripcion, estado_pago='completado')
+            crear_pago(inscripcion)
+
+    def test_sin_inscripciones_devuelve_404(self):
+        respuesta = self.client.get(f'/estudiante/{self.estudiante.id}/verificar/')
+        self.assertEqual(respuesta.status_code, 404)
+
+    def test_respuesta_incluye_ocupacion_y_ultimo_historial(self):
+        curso = crear_curso(capacidad=4)
+        inscripcion = crear_inscripcion(self.estudiante, curso)
+        crear_inscripcion(crear_estudiante(), curso)
+        pago = crear_pago(inscripcion)
+        HistorialPago.objects.create(pago=pago, estado_pago_anterior='parcial', estado_pago_nuevo='pendiente',
+                                     comentario='primero')
+        HistorialPago.objects.create(pago=pago, estado_pago_anterior='completado', estado_pago_nuevo='pendiente',
+                                     comentario='último')
+        sin_historial = crear_pago(inscripcion)
+        crear_pago(inscripcion, estado_pago='completado')
+
+        respuesta = self.client.get(f'/estudiante/{self.estudiante.id}/verificar/')
+
+        self.assertEqual(respuesta.status_code, 200)
+        [curso_data] = respuesta.json()
+        self.assertEqual(curso_data['inscritos_actuales'], 2)
+        self.assertEqual(curso_data['capacidad_curso'], 4)
+        self.assertEqual(curso_data['porcentaje_ocupacion'], 50.0)
+        pagos = {p['id']: p for p in curso_data['pagos_pendientes']}
+        self.assertEqual(set(pagos), {pago.id, sin_historial.id})
+        self.assertEqual(pagos[pago.id]['comentario'], 'último')
+        self.assertEqual(pagos[pago.id]['estado_pago_anterior'], 'completado')
+        self.assertEqual(pagos[sin_historial.id]['comentario'], 'Sin cambios recientes')
+        self.assertIsNone(pagos[sin_historial.id]['estado_pago_anterior'])
+
+    def test_cantidad_de_consultas_no_depende_de_cursos_ni_pagos(self):
+        self.crear_cursos_con_pagos(1)
+        with self.assertNumQueries(2):
+            self.client.get(f'/estudiante/{self.estudiante.id}/verificar/')
+
+        self.crear_cursos_con_pagos(10)
+        with self.assertNumQueries(2):
+            respuesta = self.client.get(f'/estudiante/{self.estudiante.id}/verificar/')
+        self.assertEqual(len(respuesta.json()), 11)
@@ -0,0 +1,77 @@
+import datetime
+import itertools
+
+from project2024.models import Curso, Docente, Estudiante, Inscripcion, Pago
+
+
+# Contador para generar cédulas, correos y códigos únicos en cada registro de prueba
+_secuencia = itertools.count(1)
+
+
+def crear_estudiante(**kwargs):
+    n = next(_secuencia)
+    datos = {
+        'nombre_completo': f'Estudiante {n}',
+        'cedula': f'E{n:08d}',
+        'correo': f'estudiante{n}@example.com',
+        'password': 'clave123',
+        'matricula': f'M{n:06d}',
+    }
+    datos.update(kwargs)
+    return Estudiante.objects.create(**datos)
+
+
+def crear_docente(**kwargs):
+    n = next(_secuencia)
+    datos = {
+        'nombre_completo': f'Docente {n}',
+        'cedula': f'D{n:08d}',
+        'correo': f'docente{n}@example.com',
+        'password': 'clave123',
+        'especialidad': 'Matemáticas',
+        'fecha_contratacion': datetime.date(2020, 1, 1),
+        'facultad': 'Ciencias',
+        'escuela': 'Matemáticas',
+        'campus': 'Central',
+        'codigo_doc': f'DOC{n:05d}',
+        'codigo': 'oficial',
+    }
+    datos.update(kwargs)
+    return Docente.objects.create(**datos)
+
+
+def crear_curso(**kwargs):
+    n = next(_secuencia)
+    datos = {
+        'nombre': f'Curso {n}',
+        'tipo': 'curso',
+        'tarifa': '100.00',
+        'fecha_inicio': datetime.date(2024, 1, 10),
+        'fecha_fin': datetime.date(2024, 6, 10),
+        'capacidad': 10,
+        'modulos': 4,
+        'horas': 40,
+        'codigo': f'C{n:05d}',
+        'profesor': 'Profesor',
+        'facultad': 'Ciencias',
+        'telefono': '8090000000',
+    }
+    datos.update(kwargs)
+    return Curso.objects.create(**datos)
+
+
+def crear_inscripcion(estudiante, curso, **kwargs):
+    datos = {'estado': 'inscrito'}
+    datos.update(kwargs)
+    return Inscripcion.objects.create(estudiante=estudiante, curso=curso, **datos)
+
+
+def crear_pago(inscripcion, **kwargs):
+    datos = {
+        'metodo_pago': 'transferencia',
+        'monto': '50.00',
+        'estado_pago': 'pendiente',
+        'fecha_vencimiento': datetime.date(2024, 2, 1),
+    }
+    datos.update(kwargs)
+    return Pago.objects.create(inscripcion=inscripcion, **datos)
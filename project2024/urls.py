@@ -4,7 +4,7 @@ from .views import (
     CursoViewSet, PagoViewSet, InscripcionViewSet, 
     EstudianteViewSet, DocenteViewSet, AdministrativoViewSet, 
     AccesoUsuarioView, HistorialPagoViewSet, ReembolsoViewSet,
-    NotificacionViewSet, ReporteViewSet
+    NotificacionViewSet, ReporteViewSet, BusquedaView
 )
 
 router = DefaultRouter()
@@ -23,4 +23,5 @@ router.register(r'reportes', ReporteViewSet)
 urlpatterns = [
     path('', include(router.urls)),
     path('acceso/usuario/', AccesoUsuarioView.as_view(), name='acceso-usuario'),
+    path('busqueda/', BusquedaView.as_view(), name='busqueda'),
 ]
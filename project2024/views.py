@@ -1,95 +1,225 @@
+import datetime
+
 from django.shortcuts import render
-from rest_framework import viewsets, filters
+from django.http import Http404
+from rest_framework import viewsets, filters, serializers
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
-from django.core.mail import send_mail  # Si quieres notificaciones por correo
+from django.db.models import Case, ExpressionWrapper, F, FloatField, OuterRef, Prefetch, Subquery, Value, When
 from .models import *
 from .serializers import *
+from .mixins import BulkCreateUpdateMixin, EstadosPagoMixin, ExportMixin, FormaDinamicaMixin, ListaCompactaMixin
+from django_filters.rest_framework import DjangoFilterBackend
+from .filtros import (
+    AdministrativoFilter, BusquedaIndexadaFilter, CursoFilter, DocenteFilter, EstudianteFilter, HistorialPagoFilter,
+    InscripcionFilter, NotificacionFilter, PagoFilter, ReembolsoFilter, ReporteFilter,
+)
+from . import reportes
+from . import cache as catalogo_cache
+from . import routers
 
 
 # Create your views here.
 
 # ViewSet para gestionar las vistas, utilizando las operaciones CRUD
 
-class DocenteViewSet(viewsets.ModelViewSet):
+class DocenteViewSet(ListaCompactaMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar los docentes. Permite realizar operaciones CRUD (crear, leer, actualizar y eliminar)
     sobre los registros de docentes en el sistema.
+    El listado devuelve una representación compacta; el detalle devuelve todos los campos.
     """
     queryset = Docente.objects.all()
     serializer_class = DocenteSerializer
+    serializer_lista_class = DocenteListaSerializer
+    filterset_class = DocenteFilter
+
+    # ?search= busca por nombre, cédula o correo en el índice de búsqueda
+    busqueda_campos = {'usuario': 'pk'}
 
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class EstudianteViewSet(viewsets.ModelViewSet):
+class EstudianteViewSet(ListaCompactaMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar los estudiantes. Proporciona las operaciones CRUD para los registros
     de estudiantes, que incluyen su creación, visualización, actualización y eliminación.
+    El listado devuelve una representación compacta; el detalle devuelve todos los campos.
     """
     queryset = Estudiante.objects.all()
     serializer_class = EstudianteSerializer
+    serializer_lista_class = EstudianteListaSerializer
+    filterset_class = EstudianteFilter
+
+    # ?search= busca por nombre, cédula o correo en el índice de búsqueda
+    busqueda_campos = {'usuario': 'pk'}
 
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class AdministrativoViewSet(viewsets.ModelViewSet):
+class AdministrativoViewSet(ListaCompactaMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar el personal administrativo. Permite el manejo completo de los registros 
     administrativos a través de operaciones CRUD.
+    El listado devuelve una representación compacta; el detalle devuelve todos los campos.
     """
     queryset = Administrativo.objects.all()
     serializer_class = AdministrativoSerializer
+    serializer_lista_class = AdministrativoListaSerializer
+    filterset_class = AdministrativoFilter
+
+    # ?search= busca por nombre, cédula o correo en el índice de búsqueda
+    busqueda_campos = {'usuario': 'pk'}
 
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
-class InscripcionViewSet(viewsets.ModelViewSet):
+class InscripcionViewSet(FormaDinamicaMixin, BulkCreateUpdateMixin, ExportMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar las inscripciones. Este endpoint permite crear nuevas inscripciones,
     ver detalles de inscripciones existentes, así como actualizarlas o eliminarlas.
+    También acepta lotes de inscripciones en `bulk/` (POST para crear, PATCH para actualizar)
+    y exporta la tabla en `export/`.
     """
     queryset = Inscripcion.objects.all()
     serializer_class = InscripcionSerializer
+    bulk_clave_padre = 'curso'  # Para releer los ids del lote en MySQL (eventos con id)
+
+    # Columnas y filtros de la exportación en CSV/NDJSON
+    export_campos = ['id', 'estudiante_id', 'curso_id', 'fecha_inscripcion', 'estado']
+    export_campo_fecha = 'fecha_inscripcion'
+    export_filtros = {'curso': 'curso_id', 'estudiante': 'estudiante_id', 'estado': 'estado'}
 
     # Agregar opciones de filtrado y búsqueda
-    filter_backends = [filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, BusquedaIndexadaFilter, filters.OrderingFilter]
+    filterset_class = InscripcionFilter
     ordering_fields = ['fecha_inscripcion', 'estado']  # Permite ordenar por estos campos
-    search_fields = ['estado', 'curso__nombre', 'estudiante__nombre']  # Permite buscar por estado, nombre del curso o nombre del estudiante
+    busqueda_campos = {'curso': 'curso_id', 'usuario': 'estudiante_id'}  # Busca por el curso o por el estudiante
 
     def perform_create(self, serializer):
-        # Personalización para agregar lógica durante la creación de una inscripción, si es necesario
-        serializer.save()
+        # Inscripcion.save reserva el cupo; con "lista_espera" un curso lleno deja la inscripción en espera
+        try:
+            serializer.save()
+        except CursoLleno:
+            if self.request.data.get('lista_espera') not in (True, 'true', 'True', '1', 1):
+                raise
+            serializer.save(estado='espera')
+
+    def perform_bulk_create(self, objetos):
+        # bulk_create no pasa por Inscripcion.save: los cupos se reservan antes, todos o ninguno
+        cupos = {}
+        for inscripcion in objetos:
+            if inscripcion.ocupa_cupo:
+                cupos[inscripcion.curso_id] = cupos.get(inscripcion.curso_id, 0) + 1
+        reservar_cupos(cupos)
+        super().perform_bulk_create(objetos)
+        publicar_inscripciones(objetos, 'creado')
+
+    def perform_bulk_update(self, objetos, campos):
+        # Cambios de curso o de/hacia la lista de espera: se reserva lo nuevo antes de escribir
+        # y se libera lo anterior después. Los pagos de las que cambian de curso se mueven en el
+        # resumen de ingresos
+        reservas, liberados, a_espera, cursos_anteriores = {}, {}, [], {}
+        for inscripcion in objetos:
+            ocupaba, ocupa = inscripcion._ocupaba_cupo, inscripcion.ocupa_cupo
+            if (ocupaba, inscripcion._curso_id_original) == (ocupa, inscripcion.curso_id):
+                continue
+            if ocupaba:
+                liberados[inscripcion._curso_id_original] = liberados.get(inscripcion._curso_id_original, 0) + 1
+            if ocupa:
+                reservas[inscripcion.curso_id] = reservas.get(inscripcion.curso_id, 0) + 1
+            else:
+                a_espera.append(inscripcion.pk)
+            if inscripcion._curso_id_original != inscripcion.curso_id:
+                cursos_anteriores[inscripcion.pk] = inscripcion._curso_id_original
+            inscripcion._curso_id_original, inscripcion._ocupaba_cupo = inscripcion.curso_id, ocupa
+        reservar_cupos(reservas)
+        super().perform_bulk_update(objetos, campos)
+        publicar_inscripciones(objetos, 'actualizado')
+        if liberados:
+            liberar_cupos(liberados, excluir=a_espera)
+        if cursos_anteriores:
+            IngresoDiario.trasladar(cursos_anteriores)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, CursoLleno):
+            return Response({'error': str(exc), 'cursos': exc.cursos}, status=status.HTTP_409_CONFLICT)
+        return super().handle_exception(exc)
 
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class CursoViewSet(viewsets.ModelViewSet):
+class CursoViewSet(FormaDinamicaMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar los cursos. Proporciona las operaciones CRUD necesarias para manejar
     los cursos ofrecidos en el sistema, lo cual incluye crear, ver, actualizar y eliminar cursos.
+    El listado y el detalle se sirven desde la caché del catálogo (ver cache.py).
     """
     queryset = Curso.objects.all()
     serializer_class = CursoSerializer
 
+    filterset_class = CursoFilter
+
+    # ?search= busca por nombre, código o descripción en el índice de búsqueda
+    busqueda_campos = {'curso': 'pk'}
+
+    def list(self, request, *args, **kwargs):
+        return self._desde_cache(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._desde_cache(request, super().retrieve, *args, **kwargs)
+
+    # Método para consultar los contadores de la caché del catálogo
+    @action(detail=False, methods=['get'], url_path='cache')
+    def cache_stats(self, request):
+        """
+        Devuelve la versión actual del catálogo y los aciertos y fallos acumulados de la caché.
+        """
+        return Response(catalogo_cache.estadisticas())
+
+    def _desde_cache(self, request, vista, *args, **kwargs):
+        # Un cliente que acaba de escribir lee de la primaria sin pasar por la caché
+        if routers.COOKIE_PRIMARIA in request.COOKIES:
+            return vista(request, *args, **kwargs)
+
+        ruta = request.get_full_path()
+        datos = catalogo_cache.obtener(ruta)
+        if datos is not None:
+            return Response(datos, headers={'X-Cache': 'HIT'})
+
+        respuesta = vista(request, *args, **kwargs)
+        if respuesta.status_code == 200:
+            catalogo_cache.guardar(ruta, respuesta.data)
+        respuesta['X-Cache'] = 'MISS'
+        return respuesta
+
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class PagoViewSet(viewsets.ModelViewSet):
+class PagoViewSet(EstadosPagoMixin, FormaDinamicaMixin, BulkCreateUpdateMixin, ExportMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar los pagos. Permite realizar operaciones CRUD sobre los registros
-    de pagos y tiene acciones adicionales para obtener pagos por inscripción y cambiar el estado del pago.
+    de pagos y tiene acciones adicionales para obtener pagos por inscripción, cambiar el estado del pago,
+    crear o actualizar lotes de pagos en `bulk/` y exportar la tabla en `export/`.
     """
     queryset = Pago.objects.all()
     serializer_class = PagoSerializer
+    filterset_class = PagoFilter
+    bulk_clave_padre = 'inscripcion'  # Para releer los ids del lote en MySQL (eventos con id)
+
+    # Columnas y filtros de la exportación en CSV/NDJSON
+    export_campos = ['id', 'inscripcion_id', 'inscripcion__curso_id', 'metodo_pago', 'monto',
+                     'estado_pago', 'fecha_pago', 'fecha_vencimiento']
+    export_campo_fecha = 'fecha_pago'
+    export_filtros = {'estado_pago': 'estado_pago', 'curso': 'inscripcion__curso_id'}
 
     def create(self, request, *args, **kwargs):
         """
@@ -127,41 +257,94 @@ class PagoViewSet(viewsets.ModelViewSet):
     def change_status(self, request, pk=None):
         """
         Endpoint para cambiar el estado de un pago. Recibe el nuevo estado en el campo `estado_pago`
-        del cuerpo de la solicitud. Actualiza el estado del pago y devuelve un mensaje de confirmación.
+        del cuerpo de la solicitud y, opcionalmente, `estado_anterior` (el estado que el cliente vio)
+        y `comentario`. El cambio es un UPDATE condicional más su registro en el historial, en una
+        transacción (ver Pago.cambiar_estados): una transición no permitida devuelve 400 y, si el
+        pago ya no estaba en el estado esperado porque otro usuario lo cambió antes, 409.
         """
-        pago = self.get_object()
         nuevo_estado = request.data.get('estado_pago')
-        if nuevo_estado:
-            pago.estado_pago = nuevo_estado
-            pago.save()
-            return Response({'status': 'estado de pago actualizado'})
-        return Response({'error': 'estado no proporcionado'}, status=400)
+        if not nuevo_estado:
+            return Response({'error': 'estado no proporcionado'}, status=400)
+        try:
+            historial = Pago.cambiar_estado(
+                pk, nuevo_estado, anterior=request.data.get('estado_anterior'), comentario=request.data.get('comentario'),
+            )
+        except Pago.DoesNotExist:
+            raise Http404
+        return Response({
+            'status': 'estado de pago actualizado',
+            'estado_anterior': historial.estado_pago_anterior,
+            'estado_pago': historial.estado_pago_nuevo,
+        })
+
+    def validar_bulk_update(self, instancia, datos):
+        if 'estado_pago' in datos and datos['estado_pago'] != instancia.estado_pago:
+            try:
+                Pago.validar_transicion(instancia.estado_pago, datos['estado_pago'])
+            except TransicionInvalida as exc:
+                raise serializers.ValidationError({'estado_pago': [str(exc)]})
+
+    def perform_bulk_create(self, objetos):
+        # bulk_create no pasa por Pago.save: el resumen de ingresos se ajusta aparte
+        super().perform_bulk_create(objetos)
+        IngresoDiario.aplicar({}, IngresoDiario.aportes_de(objetos))
+        publicar_pagos(objetos, 'creado')
+
+    def perform_bulk_update(self, objetos, campos):
+        # Los cambios de estado van con UPDATE condicional e historial; el resto de columnas, con bulk_update
+        cambios = [
+            (pago.pk, pago._estado_pago_original, pago.estado_pago)
+            for pago in objetos if pago.estado_pago != pago._estado_pago_original
+        ]
+        columnas = [campo for campo in campos if campo != 'estado_pago']
+        if {'inscripcion', 'metodo_pago', 'monto'} & set(columnas):
+            # Cambian las claves o los montos del resumen de ingresos: se lee antes y después
+            consulta = Pago.objects.filter(pk__in=[pago.pk for pago in objetos])
+            antes = IngresoDiario.aportes(consulta)
+            super().perform_bulk_update(objetos, columnas)
+            IngresoDiario.aplicar(antes, IngresoDiario.aportes(consulta))
+        else:
+            super().perform_bulk_update(objetos, columnas)
+        if columnas:
+            publicar_pagos(objetos, 'actualizado')
+        if cambios:
+            Pago.cambiar_estados(cambios)
+            for pago in objetos:
+                pago._estado_pago_original = pago.estado_pago
 
 
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class HistorialPagoViewSet(viewsets.ModelViewSet):
+class HistorialPagoViewSet(EstadosPagoMixin, FormaDinamicaMixin, ExportMixin, viewsets.ModelViewSet):
     """
     Vista para manejar el historial de pagos.
     Permite obtener todos los registros y crear nuevos registros de historial de pagos.
+    La tabla completa se puede exportar en `export/`.
     """
     queryset = HistorialPago.objects.all()  # Definir el queryset para el ModelViewSet
     serializer_class = HistorialPagoSerializer  # Usar el serializador adecuado
+    filterset_class = HistorialPagoFilter
+
+    # Columnas y filtros de la exportación en CSV/NDJSON
+    export_campos = ['id', 'pago_id', 'estado_pago_anterior', 'estado_pago_nuevo', 'fecha_cambio', 'comentario']
+    export_campo_fecha = 'fecha_cambio'
+    export_filtros = {'estado_pago': 'estado_pago_nuevo', 'curso': 'pago__inscripcion__curso_id'}
 
 
 
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class ReembolsoViewSet(viewsets.ModelViewSet):
+class ReembolsoViewSet(FormaDinamicaMixin, viewsets.ModelViewSet):
     """
     Vista para manejar las solicitudes de reembolso.
     Permite obtener, crear y actualizar solicitudes de reembolso.
     """
     queryset = Reembolso.objects.all()  # Obtener todas las solicitudes de reembolso
     serializer_class = ReembolsoSerializer  # Usar el serializador adecuado
+    filterset_class = ReembolsoFilter
 
     def perform_create(self, serializer):
         # Aquí podrías agregar lógica adicional, como notificar al usuario
@@ -176,13 +359,14 @@ class ReembolsoViewSet(viewsets.ModelViewSet):
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class NotificacionViewSet(viewsets.ModelViewSet):
+class NotificacionViewSet(FormaDinamicaMixin, viewsets.ModelViewSet):
     """
     Vista para manejar las notificaciones.
     Permite obtener todas las notificaciones, crear nuevas y actualizar su estado.
     """
     queryset = Notificacion.objects.all()
     serializer_class = NotificacionSerializer
+    filterset_class = NotificacionFilter
 
     def perform_create(self, serializer):
         # Puedes agregar lógica para el envío de notificaciones aquí, si es necesario
@@ -259,6 +443,7 @@ class AccesoUsuarioView(APIView):
     """
     Verifica el acceso de un usuario (Administrativo, Estudiante, Docente) basado en el código único (codigo_doc, codigo_adm, matricula) y password.
     Retorna el nivel de acceso si el identificador y contraseña están registrados en el sistema.
+    Las credenciales se resuelven en la tabla Credencial (ver models.py) con una búsqueda por llave primaria.
     """
     def post(self, request, *args, **kwargs):
         password = request.data.get('password')
@@ -272,50 +457,36 @@ class AccesoUsuarioView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Intentar obtener al usuario en cada uno de los modelos
-        usuario = None
-        modelo_usuario = None
-
-        # Buscar en el modelo Administrativo (solo por codigo_adm)
-        if codigo_adm:
-            try:
-                usuario = Administrativo.objects.get(
-                    password=password,
-                    codigo_adm=codigo_adm
-                )
-                modelo_usuario = 'administrativo'
-            except Administrativo.DoesNotExist:
-                pass
-
-        # Buscar en el modelo Estudiante (solo por matricula)
-        if not usuario and matricula:
-            try:
-                usuario = Estudiante.objects.get(
-                    password=password,
-                    matricula=matricula
-                )
-                modelo_usuario = 'estudiante'
-            except Estudiante.DoesNotExist:
-                pass
-
-        # Buscar en el modelo Docente (solo por codigo_doc)
-        if not usuario and codigo_doc:
-            try:
-                usuario = Docente.objects.get(
-                    password=password,
-                    codigo_doc=codigo_doc
-                )
-                modelo_usuario = 'docente'
-            except Docente.DoesNotExist:
-                pass
+        # Claves candidatas en el orden en que se prueban: administrativo, estudiante y docente
+        candidatas = [
+            Credencial.construir_clave(rol, identificador)
+            for rol, identificador in (
+                ('administrativo', codigo_adm),
+                ('estudiante', matricula),
+                ('docente', codigo_doc),
+            )
+            if identificador
+        ]
+
+        # Una sola búsqueda por llave primaria en el índice de credenciales; la contraseña
+        # se verifica contra el hash en Python, no se compara en SQL
+        credenciales = Credencial.objects.in_bulk(candidatas)
+        credencial = next(
+            (credenciales[clave] for clave in candidatas if clave in credenciales and credenciales[clave].verificar(password)),
+            None
+        )
 
         # Si no se encontró el usuario en ninguno de los modelos
-        if not usuario:
+        if not credencial:
             return Response(
                 {"error": "Credenciales inválidas."},
                 status=status.HTTP_404_NOT_FOUND
             )
 
+        modelo_usuario = credencial.rol
+        modelos = {'administrativo': Administrativo, 'estudiante': Estudiante, 'docente': Docente}
+        usuario = modelos[modelo_usuario].objects.get(pk=credencial.usuario_id)
+
         # Validar el nivel de acceso según el modelo de usuario
         if modelo_usuario == 'administrativo':
             if usuario.acceso in ['solo_ver', 'ver_agregar', 'superusuario']:
@@ -361,17 +532,63 @@ class AccesoUsuarioView(APIView):
 """"""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
 
 
-class ReporteViewSet(viewsets.ModelViewSet):
+class ReporteViewSet(FormaDinamicaMixin, viewsets.ModelViewSet):
     """
     Vista para manejar los reportes generados por el sistema.
-    Permite obtener todos los reportes y crear nuevos reportes.
+    Permite obtener todos los reportes y crear nuevos reportes. Al crear un reporte su contenido
+    se calcula con el motor de `reportes.py` para el tipo y la ventana de fechas indicados.
     """
     queryset = Reporte.objects.all()
     serializer_class = ReporteSerializer
+    filterset_class = ReporteFilter
 
     def perform_create(self, serializer):
-        # Aquí puedes agregar lógica adicional al crear un reporte si es necesario
-        serializer.save()
+        datos = serializer.validated_data
+        resultado = reportes.generar(datos['tipo_reporte'], datos.get('fecha_desde'), datos.get('fecha_hasta'))
+        serializer.save(resultado=resultado, descripcion=datos.get('descripcion') or self._descripcion(datos))
+
+    # Método para recalcular un reporte existente
+    @action(detail=True, methods=['post'])
+    def regenerar(self, request, pk=None):
+        """
+        Recalcula el reporte. Acepta `fecha_desde` y `fecha_hasta` opcionales en el cuerpo: en los
+        reportes de ingresos solo se recalculan los meses de esa ventana y se conservan los demás
+        periodos ya calculados, de modo que el cierre mensual no vuelve a recorrer todo el historial.
+        """
+        reporte = self.get_object()
+        serializer = self.get_serializer(reporte, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        desde = serializer.validated_data.get('fecha_desde', reporte.fecha_desde)
+        hasta = serializer.validated_data.get('fecha_hasta', reporte.fecha_hasta)
+
+        calculo_desde, calculo_hasta = desde, hasta
+        if reporte.tipo_reporte == 'ingresos':
+            # Si la ventana nueva no toca la ya calculada, también se calculan los días entre ambas:
+            # la cobertura guardada es un solo rango y no debe incluir meses que nunca se calcularon
+            un_dia = datetime.timedelta(days=1)
+            if desde is not None and reporte.fecha_hasta is not None and desde > reporte.fecha_hasta + un_dia:
+                calculo_desde = reporte.fecha_hasta + un_dia
+            if hasta is not None and reporte.fecha_desde is not None and hasta < reporte.fecha_desde - un_dia:
+                calculo_hasta = reporte.fecha_desde - un_dia
+
+        reporte.resultado = reportes.generar(
+            reporte.tipo_reporte, calculo_desde, calculo_hasta, anterior=reporte.resultado,
+        )
+        if reporte.tipo_reporte == 'ingresos':
+            # Los periodos conservados hacen que el reporte cubra la unión de ambas ventanas
+            desde = None if desde is None or reporte.fecha_desde is None else min(desde, reporte.fecha_desde)
+            hasta = None if hasta is None or reporte.fecha_hasta is None else max(hasta, reporte.fecha_hasta)
+        reporte.fecha_desde, reporte.fecha_hasta = desde, hasta
+        reporte.save(update_fields=['resultado', 'fecha_desde', 'fecha_hasta'])
+        return Response(self.get_serializer(reporte).data)
+
+    def _descripcion(self, datos):
+        descripcion = dict(Reporte.TIPO_CHOICES)[datos['tipo_reporte']]
+        if datos.get('fecha_desde'):
+            descripcion += f" desde {datos['fecha_desde'].isoformat()}"
+        if datos.get('fecha_hasta'):
+            descripcion += f" hasta {datos['fecha_hasta'].isoformat()}"
+        return descripcion
 
 
 
@@ -383,19 +600,44 @@ class VerificarEstudiante(APIView):
     Vista para verificar las inscripciones y pagos de un estudiante.
     Proporciona detalles sobre los cursos en los que el estudiante está inscrito,
     los pagos pendientes relacionados con esas inscripciones y el porcentaje de ocupación
-    de cada curso.
+    de cada curso. La consulta y el armado de la respuesta se comparten con la versión
+    asíncrona de async_views.py.
     """
     def get(self, request, estudiante_id):
+        inscripciones = list(self.get_inscripciones(estudiante_id))
+
         # Verifica si el estudiante tiene inscripciones
-        inscripciones = Inscripcion.objects.filter(estudiante_id=estudiante_id)
-        if not inscripciones.exists():
+        if not inscripciones:
             return Response({"detalle": "El estudiante no tiene inscripciones."}, status=404)
-        
+
+        return Response(self.serializar(inscripciones), status=200)
+
+    @staticmethod
+    def get_inscripciones(estudiante_id):
+        # Último cambio registrado en el historial de cada pago
+        ultimo_historial = HistorialPago.objects.filter(pago=OuterRef('pk')).order_by('-fecha_cambio', '-id')
+
+        # Pagos pendientes con los datos del último historial resueltos en la misma consulta
+        pagos_pendientes = Pago.objects.filter(estado_pago="pendiente").annotate(
+            ultimo_comentario=Subquery(ultimo_historial.values('comentario')[:1]),
+            ultimo_estado_anterior=Subquery(ultimo_historial.values('estado_pago_anterior')[:1]),
+            ultimo_estado_nuevo=Subquery(ultimo_historial.values('estado_pago_nuevo')[:1]),
+        ).order_by('id')
+
+        # Una consulta para las inscripciones (con su curso) y otra para todos sus pagos pendientes
+        return (
+            Inscripcion.objects.filter(estudiante_id=estudiante_id)
+            .select_related('curso')
+            .prefetch_related(Prefetch('pago_set', queryset=pagos_pendientes, to_attr='pagos_pendientes'))
+            .order_by('id')
+        )
+
+    @staticmethod
+    def serializar(inscripciones):
         resultado = []
         for inscripcion in inscripciones:
-            # Calcula la cantidad de inscritos en el curso
             curso = inscripcion.curso
-            cantidad_inscritos = Inscripcion.objects.filter(curso=curso).count()
+            cantidad_inscritos = curso.inscritos  # Contador mantenido por Inscripcion.save
             capacidad_curso = curso.capacidad
 
             # Evita división por cero y calcula el porcentaje de ocupación
@@ -403,30 +645,24 @@ class VerificarEstudiante(APIView):
                 porcentaje_ocupacion = round((cantidad_inscritos / capacidad_curso) * 100, 2)
             else:
                 porcentaje_ocupacion = 0.0
-            
-            # Busca pagos pendientes relacionados con la inscripción
-            pagos_pendientes = Pago.objects.filter(inscripcion=inscripcion, estado_pago="pendiente")
-            
-            pagos_pendientes_data = []
-            for pago in pagos_pendientes:
-                # Buscar el historial de cambios del pago
-                historial_pagos = HistorialPago.objects.filter(pago=pago).order_by('-fecha_cambio')
 
-                # Si existe historial, buscamos el último cambio
-                ultimo_historial = historial_pagos.first() if historial_pagos.exists() else None
+            pagos_pendientes_data = []
+            for pago in inscripcion.pagos_pendientes:
+                # estado_pago_nuevo nunca es nulo, así que indica si el pago tiene historial
+                tiene_historial = pago.ultimo_estado_nuevo is not None
 
                 # Agregar el pago a la lista
                 pagos_pendientes_data.append({
                     "id": pago.id,
                     "monto": str(pago.monto),  # Convertimos a string para evitar problemas de serialización
                     "estado_pago": pago.estado_pago,
-                    "fecha_vencimiento": pago.fecha_vencimiento.isoformat(),
-                    "comentario": ultimo_historial.comentario if ultimo_historial else "Sin cambios recientes",
-                    "estado_pago_anterior": ultimo_historial.estado_pago_anterior if ultimo_historial else None,
-                    "estado_pago_nuevo": ultimo_historial.estado_pago_nuevo if ultimo_historial else None,
+                    "fecha_vencimiento": pago.fecha_vencimiento.isoformat() if pago.fecha_vencimiento else None,
+                    "comentario": pago.ultimo_comentario if tiene_historial else "Sin cambios recientes",
+                    "estado_pago_anterior": pago.ultimo_estado_anterior,
+                    "estado_pago_nuevo": pago.ultimo_estado_nuevo,
                     "fecha_pago": pago.fecha_pago.isoformat() if pago.fecha_pago else None
                 })
-            
+
             # Agregar los resultados del curso con pagos pendientes
             resultado.append({
                 "curso": curso.nombre,
@@ -436,8 +672,7 @@ class VerificarEstudiante(APIView):
                 "capacidad_curso": capacidad_curso,
                 "inscritos_actuales": cantidad_inscritos
             })
-        
-        return Response(resultado, status=200)
+        return resultado
 
 
 
@@ -448,59 +683,18 @@ class DocenteCursoView(APIView):
     """
     Vista para obtener información de los cursos asignados a un docente.
     Proporciona detalles sobre la capacidad de los cursos, la cantidad de inscritos,
-    el porcentaje de ocupación, y los cupos disponibles. Envía una notificación
-    al docente si un curso alcanza el 50% de ocupación.
+    el porcentaje de ocupación, y los cupos disponibles. Es solo lectura: la activación del
+    curso al 50% de ocupación y el aviso al docente ocurren al inscribir (ver
+    models.activar_cursos). La consulta y el armado de la respuesta se comparten con la
+    versión asíncrona de async_views.py.
     """
     def get(self, request, docente_id):
         try:
             # Obtener el docente por su ID
             docente = Docente.objects.get(id=docente_id)
 
-            # Obtener todos los cursos del docente
-            cursos = Curso.objects.filter(docente_id=docente)
-
-            # Lista para almacenar la información de los cursos
-            cursos_data = []
-
-            for curso in cursos:
-                # Obtener inscripciones relacionadas con el curso
-                inscripciones = Inscripcion.objects.filter(curso=curso)
-
-                # Calcular la cantidad de alumnos inscritos
-                cantidad_inscritos = inscripciones.count()
-
-                # Calcular el porcentaje de ocupación
-                capacidad_curso = curso.capacidad
-                porcentaje_inscritos = (cantidad_inscritos / capacidad_curso) * 100 if capacidad_curso > 0 else 0
-                cupos_disponibles = capacidad_curso - cantidad_inscritos
-
-                # Notificación al docente si se alcanza el 50% de capacidad
-                if porcentaje_inscritos >= 50 and curso.estado == "inactivo":
-                    curso.estado = "activo"  # Activar el curso
-                    curso.save()
-                    # Enviar notificación por correo
-                    send_mail(
-                        subject=f"Curso {curso.nombre} listo para pagos",
-                        message=f"El curso {curso.nombre} ha alcanzado el 50% de su capacidad. "
-                                f"Cantidad de inscritos: {cantidad_inscritos}.",
-                        from_email="admin@cursos.com",
-                        recipient_list=[docente.correo],
-                        fail_silently=False,
-                    )
-
-                # Añadir información del curso a la lista
-                cursos_data.append({
-                    "id": curso.id,
-                    "nombre": curso.nombre,
-                    "descripcion": curso.descripcion,
-                    "capacidad": capacidad_curso,
-                    "cantidad_inscritos": cantidad_inscritos,
-                    "cupos_disponibles": cupos_disponibles,
-                    "tarifa": str(curso.tarifa),
-                    "estado": curso.estado,
-                    "docente": docente.nombre_completo,
-                    "porcentaje_ocupacion": round(porcentaje_inscritos, 2)  # Redondeado a 2 decimales
-                })
+            # Información de cada curso
+            cursos_data = [self.serializar_curso(curso, docente) for curso in self.get_cursos(docente)]
 
             # Devolver la información en la respuesta
             return Response(cursos_data, status=status.HTTP_200_OK)
@@ -510,4 +704,94 @@ class DocenteCursoView(APIView):
                 {"error": "El docente no existe."},
                 status=status.HTTP_404_NOT_FOUND
             )
-        
\ No newline at end of file
+
+    @staticmethod
+    def get_cursos(docente):
+        # Obtener todos los cursos del docente con la ocupación calculada a partir del contador de inscritos
+        return (
+            Curso.objects.filter(docente_id=docente)
+            .annotate(
+                cupos_disponibles=F('capacidad') - F('inscritos'),
+                porcentaje_inscritos=Case(
+                    When(capacidad__gt=0, then=ExpressionWrapper(
+                        F('inscritos') * 100.0 / F('capacidad'), output_field=FloatField()
+                    )),
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                ),
+            )
+            .order_by('id')
+        )
+
+    @staticmethod
+    def serializar_curso(curso, docente):
+        return {
+            "id": curso.id,
+            "nombre": curso.nombre,
+            "descripcion": curso.descripcion,
+            "capacidad": curso.capacidad,
+            "cantidad_inscritos": curso.inscritos,
+            "cupos_disponibles": curso.cupos_disponibles,
+            "tarifa": str(curso.tarifa),
+            "estado": curso.estado,
+            "docente": docente.nombre_completo,
+            "porcentaje_ocupacion": round(curso.porcentaje_inscritos, 2)  # Redondeado a 2 decimales
+        }
+
+
+""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""""
+
+
+class BusquedaView(APIView):
+    """
+    Búsqueda de cursos y usuarios ordenada por relevancia sobre el índice TerminoBusqueda.
+    Parámetros: `q` (texto a buscar), `tipo` (curso o usuario; por defecto ambos) y `limite`
+    (resultados por tipo, máximo 100). Las palabras se buscan como prefijos, sin importar
+    mayúsculas ni acentos, y deben aparecer todas.
+    """
+    LIMITE_MAXIMO = 100
+
+    def get(self, request):
+        consulta = request.query_params.get('q', '').strip()
+        tipos = [t for t, _ in TerminoBusqueda.TIPO_CHOICES]
+        tipo = request.query_params.get('tipo')
+        if tipo:
+            if tipo not in tipos:
+                return Response({"error": f"tipo debe ser uno de: {', '.join(tipos)}."}, status=status.HTTP_400_BAD_REQUEST)
+            tipos = [tipo]
+        try:
+            limite = min(int(request.query_params.get('limite', 20)), self.LIMITE_MAXIMO)
+        except ValueError:
+            return Response({"error": "limite debe ser un número entero."}, status=status.HTTP_400_BAD_REQUEST)
+        if limite < 1:
+            return Response({"error": "limite debe ser mayor que cero."}, status=status.HTTP_400_BAD_REQUEST)
+
+        respuesta = {}
+        if 'curso' in tipos:
+            respuesta['cursos'] = self.buscar_cursos(consulta, limite)
+        if 'usuario' in tipos:
+            respuesta['usuarios'] = self.buscar_usuarios(consulta, limite)
+        return Response(respuesta)
+
+    @staticmethod
+    def buscar_cursos(consulta, limite):
+        ranking = TerminoBusqueda.buscar('curso', consulta, limite)
+        cursos = Curso.objects.only('nombre', 'codigo', 'estado').in_bulk([pk for pk, _ in ranking])
+        return [
+            {"id": pk, "puntaje": puntaje, "nombre": cursos[pk].nombre, "codigo": cursos[pk].codigo,
+             "estado": cursos[pk].estado}
+            for pk, puntaje in ranking if pk in cursos
+        ]
+
+    @staticmethod
+    def buscar_usuarios(consulta, limite):
+        ranking = TerminoBusqueda.buscar('usuario', consulta, limite)
+        ids = [pk for pk, _ in ranking]
+        usuarios = Usuario.objects.only('nombre_completo', 'cedula', 'correo').in_bulk(ids)
+        # El rol de cada usuario sale de su credencial de inicio de sesión
+        roles = dict(Credencial.objects.filter(usuario_id__in=ids).values_list('usuario_id', 'rol'))
+        return [
+            {"id": pk, "puntaje": puntaje, "nombre_completo": usuarios[pk].nombre_completo,
+             "cedula": usuarios[pk].cedula, "correo": usuarios[pk].correo, "rol": roles.get(pk)}
+            for pk, puntaje in ranking if pk in usuarios
+        ]